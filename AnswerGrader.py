@@ -0,0 +1,219 @@
+"""
+Grading typed answers against a card's answer line
+
+An answer line such as
+
+    James Callaghan [or Leonard James Callaghan; accept Baron Callaghan]
+
+is compiled once, when its chain is created, into an answer key: the pair
+of the tuple of normalized answers it accepts and the tuple of those it
+rejects with "do not accept ...". Other directions in brackets, such as
+"prompt on ..." or "accept any equivalents", are left out. Words in
+capitals in a mixed case answer, as in "Franz Peter SCHUBERT", are the part
+a player must give, so they are accepted on their own. A typed answer is
+correct if it normalizes to one of the accepted answers, or, unless it is
+rejected, is within a few typos of one, see typo_limit. Answers that differ
+in a final numeral, as "World War I" and "World War II" do, are never
+within a typo of each other.
+"""
+from Constants import *
+from AnswerNormalizer import normalize_answer
+import re
+
+CLAUSE = re.compile(r"\[([^\]]*)\]|\(([^)]*)\)")
+DIRECTIVE_END = re.compile(r";|\.\s")
+ACCEPT = ("or ", "accept ", "also accept ", "and accept ")
+# longest first, as "do not accept " starts "do not accept or prompt on "
+REJECT = ("do not accept or prompt on ", "do not accept ", "don't accept ", "reject ")
+# alternatives described rather than given
+INSTRUCTION_WORDS = {"answer", "answers", "equivalent", "equivalents", "similar", "either",
+                     "any", "mentioning", "specific", "such", "underlined", "partial"}
+CONDITION = re.compile(r"\s+(?:until|if)\s+", re.IGNORECASE)
+ALTERNATIVE = re.compile(r"\s+(?:or|accept|also accept)\s+", re.IGNORECASE)
+CAPITAL_WORD = re.compile(r"^[A-Z][A-Z'\-]+$")
+ROMAN_NUMERAL = re.compile(r"^[IVXLCDM]+$")
+# a whole lower case numeral, such as the last word of a normalized "Henry VIII"
+NUMERAL = re.compile(r"[0-9]+|m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})")
+EMPTY_KEY = ((), ())
+
+
+def required_part(main):
+    """
+    Returns the words in capitals of a name such as "Franz Peter SCHUBERT",
+    joined, or None if [main] is not a name with some words in capitals
+    Acronyms in answers such as "DNA polymerase" and numerals such as the
+    IV of "Rama IV" do not count
+    """
+    words = main.split()
+    required = [word for word in words if CAPITAL_WORD.match(word) and not ROMAN_NUMERAL.match(word)]
+    if required == [] or len(required) == len(words):
+        return None
+    if not all(word[0].isupper() for word in words):
+        return None
+    return " ".join(required)
+
+
+def directive_answers(directive, prefixes):
+    """
+    Returns the answers [directive] names if it starts with one of
+    [prefixes], or None if it does not
+    """
+    lowered = directive.lower()
+    for prefix in prefixes:
+        if lowered.startswith(prefix):
+            # "or 1967 Arab-Israeli War until mentioned"
+            named = CONDITION.split(directive[len(prefix):])[0]
+            return [answer for answer in ALTERNATIVE.split(named)
+                    if INSTRUCTION_WORDS.isdisjoint(answer.lower().split())]
+    return None
+
+
+def clause_answers(clause):
+    """
+    Returns (answers accepted, answers rejected) by a bracketed clause of an
+    answer line
+    """
+    accepted = []
+    rejected = []
+    for directive in DIRECTIVE_END.split(clause):
+        directive = directive.strip()
+        answers = directive_answers(directive, REJECT)
+        if answers != None:
+            rejected.extend(answers)
+            continue
+        answers = directive_answers(directive, ACCEPT)
+        if answers != None:
+            accepted.extend(answers)
+    return (accepted, rejected)
+
+
+def normalized_answers(answers):
+    """
+    Returns the tuple of the distinct non empty normalized [answers], in order
+    """
+    normalized = []
+    for answer in answers:
+        answer = normalize_answer(answer)
+        if answer != "" and answer not in normalized:
+            normalized.append(answer)
+    return tuple(normalized)
+
+
+def answer_key(answerLine):
+    """
+    Returns the answer key of [answerLine]: (the tuple of normalized answers
+    it accepts, its main answer first, the tuple of those it rejects)
+    """
+    accepted = [answerLine]
+    rejected = []
+    for match in CLAUSE.finditer(answerLine):
+        clause = match.group(1) if match.group(1) != None else match.group(2)
+        answers = clause_answers(clause)
+        accepted.extend(answers[0])
+        rejected.extend(answers[1])
+    required = required_part(CLAUSE.sub(" ", answerLine))
+    if required != None:
+        accepted.append(required)
+    return (normalized_answers(accepted), normalized_answers(rejected))
+
+
+def merge_keys(key, other):
+    """
+    Returns [key] with the accepted and rejected answers of [other] it does
+    not have yet
+    """
+    accepted, rejected = key
+    return (accepted + tuple(answer for answer in other[0] if answer not in accepted),
+            rejected + tuple(answer for answer in other[1] if answer not in rejected))
+
+
+def typo_limit(length):
+    """
+    Returns how many typos an answer of [length] characters may have
+    """
+    if length <= EXACT_ANSWER_LENGTH:
+        return 0
+    if length <= ONE_TYPO_LENGTH:
+        return 1
+    return MAX_TYPOS
+
+
+def within_distance(first, second, limit):
+    """
+    True if the Levenshtein distance between [first] and [second] is at
+    most [limit]
+    Only the 2 * limit + 1 cells of each row within limit of the diagonal
+    are kept, in two rows reused from one row to the next, and the check
+    stops as soon as a whole row is over the limit, so it costs
+    O(limit * len(first))
+    """
+    if abs(len(first) - len(second)) > limit:
+        return False
+    if first == second:
+        return True
+    over = limit + 1
+    width = 2 * limit + 1
+    # slot k of the row for first[:i] holds the distance to second[:i - limit + k]
+    previous = [over] * width
+    current = [over] * width
+    for k in range(limit, min(width, limit + len(second) + 1)):
+        previous[k] = k - limit
+    for i in range(1, len(first) + 1):
+        character = first[i - 1]
+        rowMinimum = over
+        for k in range(width):
+            j = i - limit + k
+            if j < 0 or j > len(second):
+                current[k] = over
+                continue
+            if j == 0:
+                value = i
+            else:
+                value = previous[k] + (0 if character == second[j - 1] else 1)
+                if k + 1 < width and previous[k + 1] + 1 < value:
+                    value = previous[k + 1] + 1
+                if k > 0 and current[k - 1] + 1 < value:
+                    value = current[k - 1] + 1
+            if value > over:
+                value = over
+            current[k] = value
+            if value < rowMinimum:
+                rowMinimum = value
+        if rowMinimum > limit:
+            return False
+        previous, current = current, previous
+    return previous[len(second) - len(first) + limit] <= limit
+
+
+def numeral_differs(first, second):
+    """
+    True if normalized answers [first] and [second] end in different words
+    and one of them is a numeral, as "world war i" and "world war ii" do
+    """
+    firstWord = first.rsplit(" ", 1)[-1]
+    secondWord = second.rsplit(" ", 1)[-1]
+    if firstWord == secondWord:
+        return False
+    return NUMERAL.fullmatch(firstWord) != None or NUMERAL.fullmatch(secondWord) != None
+
+
+def grade(key, response):
+    """
+    True if the typed [response] matches one of the accepted answers of
+    [key], an answer_key, exactly once normalized, or, unless the key
+    rejects it, within typo_limit typos
+    """
+    accepted, rejected = key
+    normalized = normalize_answer(response)
+    if normalized == "":
+        return False
+    if normalized in accepted:
+        return True
+    if normalized in rejected:
+        return False
+    for answer in accepted:
+        if numeral_differs(normalized, answer):
+            continue
+        if within_distance(normalized, answer, typo_limit(len(answer))):
+            return True
+    return False
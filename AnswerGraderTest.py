@@ -0,0 +1,98 @@
+from AnswerGrader import *
+from Flashcard import *
+import random
+
+
+def levenshtein(first, second):
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i]
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost))
+        previous = current
+    return previous[-1]
+
+
+def test_answer_key():
+    print("Testing answer keys")
+    assert answer_key("James Callaghan [or Leonard James Callaghan; or Baron Callaghan of Cardiff]") == ((
+        "james callaghan", "leonard james callaghan", "baron callaghan of cardiff"), ())
+    assert answer_key("aphorisms [or maxims; accept adages or proverbs; prompt on sayings or similar answers]")[0] == (
+        "aphorisms", "maxims", "adages", "proverbs")
+    assert answer_key("volcanic eruption [Accept any equivalents mentioning volcanos. Accept phreatic eruption.]")[0] == (
+        "volcanic eruption", "phreatic eruption")
+    assert answer_key("Six-Day War [or June War; or 1967 Arab-Israeli War until mentioned]")[0] == (
+        "six day war", "june war", "1967 arab israeli war")
+    assert answer_key("Donald Knuth (k'NOOTH) [or Donald Ervin Knuth]")[0] == ("donald knuth", "donald ervin knuth")
+    assert answer_key("Franz Peter SCHUBERT")[0] == ("franz peter schubert", "schubert")
+    assert answer_key("DNA polymerase")[0] == ("dna polymerase",)
+    assert answer_key("Rama IV")[0] == ("rama iv",)
+    assert answer_key("World War II [or WWII; do not accept World War I]") == (("world war ii", "wwii"), ("world war i",))
+    assert answer_key("Thebes [accept Waset; do not accept or prompt on Luxor or Karnak]") == (
+        ("thebes", "waset"), ("luxor", "karnak"))
+    assert merge_keys((("a", "b"), ()), (("b", "c"), ("d",))) == (("a", "b", "c"), ("d",))
+    print("pass answer keys")
+
+
+def test_distance():
+    print("Testing bounded edit distance")
+    assert within_distance("schubert", "schubret", 2)
+    assert within_distance("schubert", "shubert", 1)
+    assert not within_distance("schubert", "mozart", 2)
+    generator = random.Random(4)
+    for i in range(2000):
+        first = "".join(generator.choice("abc") for j in range(generator.randint(0, 8)))
+        second = "".join(generator.choice("abc") for j in range(generator.randint(0, 8)))
+        limit = generator.randint(0, 3)
+        assert within_distance(first, second, limit) == (levenshtein(first, second) <= limit)
+    print("pass bounded edit distance")
+
+
+def test_grade():
+    print("Testing grading")
+    key = answer_key("Franz Peter Schubert [or Franz Schubert]")
+    assert grade(key, "Franz Schubert")
+    assert grade(key, "  the FRANZ peter schubert ")
+    assert grade(key, "franz schubret")
+    assert not grade(key, "schubert")
+    assert not grade(key, "Franz Liszt")
+    assert not grade(key, "")
+    key = answer_key("RNA [or ribonucleic acids]")
+    assert grade(key, "rna") and not grade(key, "dna")
+    assert grade(key, "ribonucleic acid")
+    # typos never reach an answer the line rejects, or another numeral
+    key = answer_key("World War II [or WWII; do not accept World War I]")
+    assert grade(key, "World War II") and grade(key, "Wrld War II")
+    assert not grade(key, "World War I")
+    key = answer_key("Henry VIII")
+    assert not grade(key, "Henry VII") and not grade(key, "Henry IX") and grade(key, "Hnery VIII")
+    assert not grade(answer_key("Symphony No. 5"), "Symphony No. 6")
+    print("pass grading")
+
+
+def test_deck_grading():
+    print("Testing deck grading")
+    d = Deck()
+    d.setAsAnswerGrouped()
+    d.text_to_cards([(["Trout clue."], "Franz Schubert [or Schubert]"),
+                     (["Winterreise clue."], "Franz Schubert [accept Franz Peter Schubert]")])
+    card = d.cardList[0]
+    assert card.getChainHeader().answerKey == (("franz schubert", "schubert", "franz peter schubert"), ())
+    d.setCurrentCard(card.getForward())
+    assert d.gradeAnswer("Franz Peter Schubert")
+    assert not d.gradeAnswer("Mozart")
+    assert card.getForward().statistics.correct == 1 and card.getForward().statistics.incorrect == 1
+    # once the appended question is removed its answers are no longer accepted
+    d.removeClues(card.getChainHeader(), card.getForward(), card.getForward())
+    assert card.getChainHeader().answerKey == (("franz schubert", "schubert"), ())
+    d.setCurrentCard(card)
+    assert not d.gradeAnswer("Franz Peter Schubert")
+    assert d.gradeAnswer("Schubert")
+    print("pass deck grading")
+
+
+test_answer_key()
+test_distance()
+test_grade()
+test_deck_grading()
@@ -0,0 +1,40 @@
+"""
+Normalized forms of answer lines, so that answers written differently for
+the same thing compare equal
+
+"Franz Peter Schubert [or Franz Schubert]", "FRANZ PETER SCHUBERT" and
+"Franz Peter Schubert (prompt on Schubert)" all normalize to
+"franz peter schubert".
+"""
+import re
+import unicodedata
+
+# [or ...], [accept ...], (prompt on ...) and other bracketed directions
+CLAUSE = re.compile(r"\[[^\]]*\]|\([^)]*\)|<[^>]*>")
+PUNCTUATION = re.compile(r"[^\w\s]|_")
+SPACES = re.compile(r"\s+")
+ARTICLES = ("the ", "a ", "an ")
+
+
+def strip_accents(text):
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(character for character in decomposed if not unicodedata.combining(character))
+
+
+def normalize_answer(answer):
+    """
+    Returns [answer] lower cased, without bracketed clauses, accents,
+    punctuation or a leading article, and with single spaces
+    May return "" for an answer that is only a clause or punctuation
+    """
+    text = CLAUSE.sub(" ", answer)
+    text = strip_accents(text.lower())
+    text = PUNCTUATION.sub(" ", text)
+    text = SPACES.sub(" ", text).strip()
+    for article in ARTICLES:
+        if text.startswith(article):
+            text = text[len(article):]
+            break
+    return text
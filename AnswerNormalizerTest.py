@@ -0,0 +1,72 @@
+from AnswerNormalizer import *
+from Flashcard import *
+
+
+def test_normalize():
+    print("Testing answer normalization")
+    assert normalize_answer("Franz Peter Schubert [or Franz Schubert]") == "franz peter schubert"
+    assert normalize_answer("FRANZ PETER SCHUBERT") == "franz peter schubert"
+    assert normalize_answer("  Franz  Peter Schubert (prompt on \"Schubert\") ") == "franz peter schubert"
+    assert normalize_answer("the Great Depression") == "great depression"
+    assert normalize_answer("Antonín Dvořák") == "antonin dvorak"
+    assert normalize_answer("Sir Winston Leonard Spencer-Churchill") == "sir winston leonard spencer churchill"
+    assert normalize_answer("[accept anything]") == ""
+    print("pass answer normalization")
+
+
+def test_grouping():
+    print("Testing answer grouping")
+    d = Deck()
+    d.setAsAnswerGrouped()
+    d.text_to_cards([(["Trout clue.", "Quintet clue."], "Franz Peter Schubert"),
+                     (["Hungarian clue."], "Imre Thokoly"),
+                     (["Unfinished clue."], "FRANZ PETER SCHUBERT [or Schubert]"),
+                     (["Winterreise clue.", "Lied clue."], "Franz Peter Schubert")])
+    assert d.numMainCards == 2
+    assert d.numCards == 8
+    schubert = d.cardList[0]
+    header = schubert.getChainHeader()
+    fronts = []
+    card = schubert
+    while card != None:
+        fronts.append(card.getFront())
+        card = card.getForward()
+    assert fronts == ["Trout clue.", "Quintet clue.", "Unfinished clue.", "Winterreise clue.", "Lied clue."]
+    assert header.tailCard.getFront() == "Lied clue."
+    assert header.tailCard.getChainHeader() is header
+    # every card keeps its own answer line
+    assert schubert.getForward().getForward().getBack() == "FRANZ PETER SCHUBERT [or Schubert]"
+    assert schubert.getRear().getFront() == "Trout clue.Quintet clue.Unfinished clue.Winterreise clue.Lied clue."
+    d.setAsNotAnswerGrouped()
+    d.text_to_cards([(["Another clue."], "Franz Peter Schubert")])
+    assert d.numMainCards == 3
+    print("pass answer grouping")
+
+
+def test_remove_clues():
+    print("Testing removing grouped questions")
+    d = Deck()
+    d.setAsAnswerGrouped()
+    first = d.add_question((["A1.", "A2."], "Answer"))
+    second = d.add_question((["B1."], "answer"))
+    third = d.add_question((["C1.", "C2."], "ANSWER"))
+    other = d.add_question((["D1."], "Other"))
+    assert d.numCards == 8
+    d.removeClues(*second)
+    assert [card.getFront() for card in d.allCards()] == ["A1.", "A1.A2.C1.C2.", "A2.", "C1.", "C2.", "D1.", "D1."]
+    assert d.numCards == 7
+    # removing the first question moves its chain's main card along
+    d.removeClues(*first)
+    assert d.numMainCards == 2 and d.numCards == 5
+    assert d.cardList[0].getFront() == "C1." and d.cardList[0].getMain()
+    assert [card.getFront() for card in d.allCards()] == ["C1.", "C1.C2.", "C2.", "D1.", "D1."]
+    d.removeClues(*third)
+    assert d.numMainCards == 1 and d.numCards == 2
+    assert d.add_question((["E1."], "answer"))[1].getMain()
+    assert d.numMainCards == 2
+    print("pass removing grouped questions")
+
+
+test_normalize()
+test_grouping()
+test_remove_clues()
@@ -0,0 +1,76 @@
+from Flashcard import *
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = [100000, 1000000]
+
+
+class DictCard:
+    """
+    The Card layout from before __slots__: a per instance __dict__ and both
+    the rating and statistics lists allocated up front
+    Only used as the baseline for this benchmark
+    """
+
+    def __init__(self, front, back):
+        self.cardName = None
+        self.frontText = front
+        self.backText = back
+        self.forwardChain = None
+        self.rearChain = None
+        self.nextCard = None
+        self.lastCard = None
+        self.mainChain = True
+        self.rateCard = []
+        self.statistics = []
+
+
+def build_dict_cards(n, front, back):
+    cards = [DictCard(front, back) for i in range(n)]
+    for i in range(n):
+        cards[i].nextCard = cards[(i + 1) % n]
+        cards[i].lastCard = cards[i - 1]
+    return cards
+
+
+def build_slotted_cards(n, front, back):
+    cards = [Card(front = front, back = back) for i in range(n)]
+    for i in range(n):
+        cards[i].setNext(cards[(i + 1) % n])
+        cards[i].setLast(cards[i - 1])
+    return cards
+
+
+def measure(build, n):
+    """
+    Returns (bytes allocated by [build] for [n] cards, seconds taken)
+    Every card shares the same front and back string, so only the per card
+    overhead is counted, not the question text
+    Both layouts are built the same way, as a list of cards linked in a
+    ring, so the difference is the cards themselves
+    """
+    front = "This city is the capital of Maine."
+    back = "Augusta"
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(n, front, back)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (size, elapsed)
+
+
+def run(sizes):
+    print("cards".rjust(10) + "layout".rjust(10) + "total MB".rjust(12) + "bytes/card".rjust(12) + "seconds".rjust(10))
+    for n in sizes:
+        for name, build in [("dict", build_dict_cards), ("slots", build_slotted_cards)]:
+            size, elapsed = measure(build, n)
+            print(str(n).rjust(10) + name.rjust(10) + ("%.1f" % (size / 2 ** 20)).rjust(12)
+                  + ("%.1f" % (size / n)).rjust(12) + ("%.2f" % elapsed).rjust(10))
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    run(sizes)
@@ -0,0 +1,283 @@
+"""
+Topic clustering of card text, used to suggest the next card
+
+Card texts are turned into a sparse TF-IDF matrix held in flat arrays
+(compressed rows: indptr, indices, data) and grouped with mini-batch
+spherical k-means. Centroids are kept sparse, trimmed to their strongest
+CENTROID_TERMS terms, and scored through a term -> cluster index, so a
+document is only compared against the clusters it shares terms with.
+"""
+from Constants import *
+from array import array
+import hashlib
+import math
+import os
+import pickle
+import random
+import re
+
+WORD = re.compile(r"[a-z][a-z0-9']+")
+
+STOP_WORDS = frozenset("""
+a about after also an and any are as at be been before being but by can did do does
+during each for from had has have he her his how if in into is it its itself no not of
+on one or other over she so some such than that the their them then there these they
+this those through to two under up was were what when where which while who whom whose
+why will with would for points name ftp identify answer give
+""".split())
+
+
+def tokenize(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+class TfidfMatrix:
+    """
+    Sparse document-term matrix in compressed row form
+    Row i holds the term ids indices[indptr[i]:indptr[i + 1]] with their
+    weights at the same positions of data; every row has unit length
+    Terms that appear in fewer than minDocuments documents are dropped
+    """
+
+    def __init__(self, texts, minDocuments=2):
+        vocabulary = {}
+        documentFrequency = array('I')
+        indptr = array('L', [0])
+        indices = array('I')
+        counts = array('I')
+        for text in texts:
+            termCounts = {}
+            for word in tokenize(text):
+                termCounts[word] = termCounts.get(word, 0) + 1
+            for word in termCounts:
+                termId = vocabulary.get(word)
+                if termId == None:
+                    termId = len(vocabulary)
+                    vocabulary[word] = termId
+                    documentFrequency.append(0)
+                documentFrequency[termId] += 1
+                indices.append(termId)
+                counts.append(termCounts[word])
+            indptr.append(len(indices))
+        self.numRows = len(indptr) - 1
+
+        numDocuments = max(1, self.numRows)
+        idf = array('d', [0.0]) * len(documentFrequency)
+        for termId in range(len(documentFrequency)):
+            if documentFrequency[termId] >= minDocuments:
+                idf[termId] = math.log(numDocuments / documentFrequency[termId]) + 1
+        self.terms = [None] * len(vocabulary)
+        for word in vocabulary:
+            self.terms[vocabulary[word]] = word
+
+        self.indptr = array('L', [0])
+        self.indices = array('I')
+        self.data = array('d')
+        for row in range(self.numRows):
+            start = len(self.data)
+            for j in range(indptr[row], indptr[row + 1]):
+                weight = idf[indices[j]]
+                if weight > 0:
+                    self.indices.append(indices[j])
+                    self.data.append((1 + math.log(counts[j])) * weight)
+            norm = math.sqrt(sum(value * value for value in self.data[start:]))
+            for j in range(start, len(self.data)):
+                self.data[j] /= norm
+            self.indptr.append(len(self.data))
+
+    def row(self, i):
+        start = self.indptr[i]
+        end = self.indptr[i + 1]
+        return (self.indices[start:end], self.data[start:end])
+
+
+def centroid_index(centroids):
+    """
+    Returns a dict from term id to the list of (cluster, weight) pairs of
+    every centroid that contains the term
+    """
+    index = {}
+    for cluster in range(len(centroids)):
+        centroid = centroids[cluster]
+        for termId in centroid:
+            pair = (cluster, centroid[termId])
+            postings = index.get(termId)
+            if postings == None:
+                index[termId] = [pair]
+            else:
+                postings.append(pair)
+    return index
+
+
+def nearest_cluster(index, numClusters, termIds, weights):
+    """
+    Returns the cluster with the highest cosine similarity to the row, or -1
+    if the row shares no term with any centroid
+    """
+    scores = [0.0] * numClusters
+    for j in range(len(termIds)):
+        postings = index.get(termIds[j])
+        if postings != None:
+            weight = weights[j]
+            for cluster, centroidWeight in postings:
+                scores[cluster] += weight * centroidWeight
+    best = max(range(numClusters), key=scores.__getitem__)
+    return best if scores[best] > 0 else -1
+
+
+def trim_centroid(raw, scale, numTerms):
+    """
+    Materializes scale * raw, keeps its [numTerms] largest terms and
+    normalizes the result to unit length
+    """
+    top = sorted(raw.items(), key=lambda item: item[1], reverse=True)[:numTerms]
+    norm = math.sqrt(sum(value * value for termId, value in top)) * scale
+    if norm == 0:
+        return {}
+    return {termId: value * scale / norm for termId, value in top}
+
+
+def minibatch_kmeans(matrix, numClusters, rng, batchSize=CLUSTER_BATCH_SIZE,
+                     iterations=CLUSTER_ITERATIONS, numTerms=CENTROID_TERMS):
+    """
+    Spherical mini-batch k-means over the rows of [matrix]
+    Returns an array of one cluster label per row (-1 for rows with no
+    usable terms)
+    Each centroid is updated as a running mean of the rows assigned to it;
+    the shrinking of old weights is folded into one scale factor per
+    centroid, so an update only touches the terms of the row being added
+    """
+    numRows = matrix.numRows
+    numClusters = min(numClusters, numRows)
+    centroids = []
+    for seed in rng.sample(range(numRows), numClusters):
+        termIds, weights = matrix.row(seed)
+        centroids.append(dict(zip(termIds, weights)))
+    counts = [0] * numClusters
+    for iteration in range(iterations):
+        index = centroid_index(centroids)
+        batch = [matrix.row(rng.randrange(numRows)) for i in range(batchSize)]
+        labels = [nearest_cluster(index, numClusters, termIds, weights) for termIds, weights in batch]
+        raws = [dict(centroid) for centroid in centroids]
+        scales = [1.0] * numClusters
+        for (termIds, weights), label in zip(batch, labels):
+            if label == -1:
+                continue
+            counts[label] += 1
+            rate = 1.0 / counts[label]
+            scales[label] *= 1 - rate
+            if scales[label] == 0:
+                # first row of a cluster replaces its seed outright
+                raws[label] = {}
+                scales[label] = 1.0
+            raw = raws[label]
+            share = rate / scales[label]
+            for j in range(len(termIds)):
+                raw[termIds[j]] = raw.get(termIds[j], 0.0) + share * weights[j]
+        centroids = [trim_centroid(raws[c], scales[c], numTerms) for c in range(numClusters)]
+
+    index = centroid_index(centroids)
+    labels = array('i')
+    for row in range(numRows):
+        termIds, weights = matrix.row(row)
+        labels.append(nearest_cluster(index, numClusters, termIds, weights))
+    return labels
+
+
+class TopicClusters:
+    """
+    Groups of related main chain cards for studying by cluster
+    members [list of list of Card] holds each cluster's cards in deck order;
+    removed cards are left as None
+    positions maps each clustered card to its (cluster, position in members)
+    deckVersion is the deck's nextCardId when it was clustered and settings
+    the (cachePath, numClusters) it was clustered with, set by
+    Deck.setAsClustered, so cards added since are clustered again with it
+    """
+
+    def __init__(self, cards, labels):
+        self.deckVersion = None
+        self.settings = None
+        numClusters = max(labels) + 1 if len(labels) > 0 else 0
+        # cards too short to cluster are studied together at the end
+        self.members = [[] for i in range(numClusters + 1)]
+        self.positions = {}
+        for card, label in zip(cards, labels):
+            if label == -1:
+                label = numClusters
+            self.positions[card] = (label, len(self.members[label]))
+            self.members[label].append(card)
+
+    def __len__(self):
+        return len(self.members)
+
+    def getCluster(self, card):
+        position = self.positions.get(card)
+        return None if position == None else position[0]
+
+    def removeCard(self, card):
+        position = self.positions.pop(card, None)
+        if position != None:
+            self.members[position[0]][position[1]] = None
+
+    def nextCard(self, card):
+        """
+        Returns the card after [card] in its cluster, moving on to the first
+        card of the next cluster once this one is finished
+        A card that is not clustered starts from the first cluster
+        Returns None if no clustered card is left
+        """
+        position = self.positions.get(card)
+        cluster, index = (0, -1) if position == None else position
+        for step in range(len(self.members) + 1):
+            members = self.members[(cluster + step) % len(self.members)]
+            start = index + 1 if step == 0 else 0
+            for candidate in members[start:]:
+                if candidate != None:
+                    return candidate
+        return None
+
+
+def chain_text(card):
+    header = card.getChainHeader()
+    if header != None:
+        return header.entireQuestion()
+    return card.getFront()
+
+
+def cluster_key(texts, numClusters, seed):
+    digest = hashlib.sha1((str(numClusters) + ":" + str(seed)).encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cluster_deck(cards, cachePath=CLUSTER_CACHE_FILE, numClusters=None, seed=0):
+    """
+    Clusters [cards] by the text of their whole chain and returns TopicClusters
+    By default there are CLUSTER_COUNT clusters, fewer for small decks so
+    clusters average at least CLUSTER_MIN_SIZE cards
+    Labels are cached at [cachePath] (no caching if None) under a hash of
+    the card texts, so an unchanged deck is not clustered again on the next
+    launch
+    """
+    if numClusters == None:
+        numClusters = min(CLUSTER_COUNT, max(1, len(cards) // CLUSTER_MIN_SIZE))
+    texts = [chain_text(card) for card in cards]
+    key = cluster_key(texts, numClusters, seed)
+    if cachePath != None and os.path.exists(cachePath):
+        fileObject = open(cachePath, 'rb')
+        cached = pickle.load(fileObject)
+        fileObject.close()
+        if cached[0] == key:
+            return TopicClusters(cards, cached[1])
+    if texts == []:
+        labels = array('i')
+    else:
+        labels = minibatch_kmeans(TfidfMatrix(texts), numClusters, random.Random(seed))
+    if cachePath != None:
+        fileObject = open(cachePath, 'wb')
+        pickle.dump((key, labels), fileObject)
+        fileObject.close()
+    return TopicClusters(cards, labels)
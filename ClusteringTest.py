@@ -0,0 +1,95 @@
+from Clustering import *
+from Flashcard import *
+import os
+import random
+import tempfile
+
+MUSIC = ["This composer wrote a string quintet and a symphony in C major.",
+         "This composer wrote a piano quintet and an unfinished symphony.",
+         "A symphony by this composer uses a clarinet and a piano in the quintet.",
+         "This composer of a symphony wrote lieder for piano and a string quartet."]
+CHEMISTRY = ["This element has the highest electronegativity of any element.",
+             "This element forms an acid with hydrogen and reacts with every element.",
+             "Electronegativity of this element exceeds oxygen, and its acid etches glass.",
+             "This halogen element is the most reactive element and forms hydrogen fluoride acid."]
+
+
+def test_tfidf():
+    print("Testing tfidf matrix")
+    matrix = TfidfMatrix(MUSIC + CHEMISTRY)
+    assert matrix.numRows == 8
+    assert "composer" in matrix.terms and "the" not in matrix.terms
+    for row in range(matrix.numRows):
+        termIds, weights = matrix.row(row)
+        assert len(termIds) > 0
+        assert abs(sum(weight * weight for weight in weights) - 1) < 1e-9
+        # hapax terms are dropped
+        assert all(matrix.terms[termId] != "glass" for termId in termIds)
+    print("pass tfidf matrix")
+
+
+def test_kmeans():
+    print("Testing mini batch k means")
+    matrix = TfidfMatrix(MUSIC + CHEMISTRY)
+    labels = minibatch_kmeans(matrix, 2, random.Random(1), batchSize=8, iterations=10)
+    assert len(set(labels[:4])) == 1
+    assert len(set(labels[4:])) == 1
+    assert labels[0] != labels[4]
+    print("pass mini batch k means")
+
+
+def test_topic_clusters():
+    print("Testing topic clusters")
+    cards = [Card() for i in range(5)]
+    clusters = TopicClusters(cards, [1, 0, 1, -1, 0])
+    assert clusters.getCluster(cards[0]) == 1
+    assert clusters.getCluster(cards[3]) == 2
+    assert clusters.nextCard(cards[1]) == cards[4]
+    assert clusters.nextCard(cards[4]) == cards[0]
+    assert clusters.nextCard(cards[0]) == cards[2]
+    assert clusters.nextCard(cards[2]) == cards[3]
+    assert clusters.nextCard(cards[3]) == cards[1]
+    assert clusters.nextCard(None) == cards[1]
+    clusters.removeCard(cards[4])
+    assert clusters.nextCard(cards[1]) == cards[0]
+    print("pass topic clusters")
+
+
+def test_deck_clusters():
+    print("Testing study by cluster")
+    cachePath = os.path.join(tempfile.mkdtemp(), "deck.clusters")
+    questions = []
+    for i in range(4):
+        questions.append(([MUSIC[i]], "Schubert"))
+        questions.append(([CHEMISTRY[i]], "Fluorine"))
+    d = Deck()
+    d.text_to_cards(questions)
+    d.setAsClustered(cachePath, 2)
+    assert os.path.exists(cachePath)
+    d.setCurrentCard(d.cardList[0])
+    answers = []
+    for i in range(8):
+        d.clusterCard()
+        answers.append(d.getCurrentCard().getBack())
+    # the three other music cards come back to back, then the chemistry ones
+    assert answers[:3] == ["Schubert"] * 3
+    assert answers[3:7] == ["Fluorine"] * 4
+    cached = d.clusters.members
+    d.setAsClustered(cachePath, 2)
+    assert d.clusters.members == cached
+    # a question added after clustering is clustered with its topic
+    d.text_to_cards([(["This composer wrote a piano quintet and a string symphony."], "Schubert")])
+    d.setCurrentCard(d.cardList[0])
+    clustered = []
+    for i in range(9):
+        d.clusterCard()
+        clustered.append(d.getCurrentCard())
+    assert d.cardList[-1] in clustered
+    assert d.clusters.getCluster(d.cardList[-1]) == d.clusters.getCluster(d.cardList[0])
+    print("pass study by cluster")
+
+
+test_tfidf()
+test_kmeans()
+test_topic_clusters()
+test_deck_clusters()
@@ -9,6 +9,9 @@ SKIP = 'skip'
 QUESTION = 'QUESTION:'
 ANSWER = 'ANSWER:'
 END = 'END'
+STREAM_CHUNK_SIZE = 1 << 16  # characters read at a time when streaming a text file
+BLOCK_FORMAT = "blocks"  # QUESTION: ... ANSWER: ... END || blocks
+QUIZDB_FORMAT = "quizdb"
 
 RATE_SCALE_LIST = [0, 1, 2, 3, 4, 5]
 QUIT = 'quit'
@@ -22,6 +25,92 @@ INVALID_COMMAND = "You did not enter a valid command. Trying again. "
 
 SEPARATOR = "###########################"
 
+################# SCHEDULER RELATED CONSTANTS #############
+
+SECONDS_PER_DAY = 86400
+DEFAULT_EASINESS = 2.5
+MIN_EASINESS = 1.3
+PASSING_QUALITY = 3
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 1
+SKIP_DELAY = 600  # seconds a skipped card is pushed back in the queue
+
+################# SAMPLER RELATED CONSTANTS #############
+
+WEIGHT_WINDOW = 10  # how many recent ratings and answers decide a card's weight
+DEFAULT_DIFFICULTY = 2.5
+DEFAULT_MISS_RATE = 0.5
+MISS_WEIGHT = 4
+
+################# JOURNAL RELATED CONSTANTS #############
+
+SNAPSHOT_FILE = "CurrentDeck.snapshot"
+JOURNAL_FILE = "CurrentDeck.journal"
+JOURNAL_BATCH_SIZE = 16  # events written per fsync
+SNAPSHOT_INTERVAL = 1000  # events between snapshots
+JOURNAL_RATE = "rate"
+JOURNAL_CORRECT = "correct"
+JOURNAL_RESET = "reset"
+
+################# CLUSTERING RELATED CONSTANTS #############
+
+CLUSTER_CACHE_FILE = "CurrentDeck.clusters"
+CLUSTER_COUNT = 40
+CLUSTER_MIN_SIZE = 10
+CLUSTER_BATCH_SIZE = 500  # rows per mini-batch
+CLUSTER_ITERATIONS = 40
+CENTROID_TERMS = 200  # terms kept per centroid
+
+################# QUIZDB RELATED CONSTANTS #############
+
+TOSSUP = "tossup"
+BONUS = "bonus"
+QUIZDB_TOSSUP = "TOSSUP:"
+QUIZDB_BONUS = "BONUS:"
+QUIZDB_ID = "ID:"
+QUIZDB_TOURNAMENT = "Tournament:"
+QUIZDB_HEADER = "Number tossups found:"
+POWER_MARK = "(*)"
+
+################# PARALLEL INGEST RELATED CONSTANTS #############
+
+PARALLEL_MIN_BYTES = 16 << 20  # smaller files are parsed in this process
+PARALLEL_CHUNK_BYTES = 4 << 20  # target size of the byte range one worker parses
+BOUNDARY_WINDOW = 1 << 16  # bytes scanned at a time looking for a record boundary
+
+################# TEXT STORE RELATED CONSTANTS #############
+
+TEXT_STORE_FILE = "CurrentDeck.text"
+OFFSET_FILE = "CurrentDeck.offsets"
+COMPRESSED_BLOCK_BYTES = 1 << 13  # text compressed together in one block of a CompressedTextStore
+TRAINING_BYTES = 1 << 18  # text sampled to build the shared dictionary
+DICTIONARY_BYTES = 1 << 15  # zlib only looks back this far
+CACHE_BLOCKS = 64  # decompressed blocks kept in the LRU cache
+
+################# NEAR DUPLICATE RELATED CONSTANTS #############
+
+SHINGLE_WORDS = 3
+MINHASH_SIZE = 64  # values per signature, a power of two
+LSH_BANDS = 16  # MINHASH_SIZE / LSH_BANDS values per band
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity of a near duplicate
+
+################# SEARCH RELATED CONSTANTS #############
+
+SEARCH = "search"
+SEARCH_RESULTS = 10  # matching cards listed by a search
+QUERY = "query"
+COMPLETE = "complete"
+COMPLETIONS = 10  # words listed by a completion
+SKIP_INTERVAL = 64  # ids in each block of a saved posting list
+MERGE_RATIO = 8  # batches of at least 1/MERGE_RATIO as many words as the index are merged in by a rebuild
+
+################# ANSWER GRADING RELATED CONSTANTS #############
+
+TYPED = "typed"
+EXACT_ANSWER_LENGTH = 4  # answers this short must be typed exactly
+ONE_TYPO_LENGTH = 8  # answers up to this long may have one typo
+MAX_TYPOS = 2
+
 
 RIGHT = "right"
 LEFT = "left"
@@ -3,33 +3,41 @@ from TextReader import *
 from Parser import *
 from Flashcard import *
 from Constants import *
+from ReviewJournal import ReviewJournal
+from IncrementalImport import importDriver, refreshDriver
+from TextStore import MappedTextStore
+from TermIndex import TermIndex
 import pickle
 import json
 
 
 def run():
-    processedText = textReaderDriver()
-    d = Deck()
-    d.text_to_cards(processedText)
-
-    file_Name = "CurrentDeck.txt"
-    fileObject = open(file_Name, 'wb')
-    pickle.dump(d, fileObject)
-    fileObject.close()
-
-    parser_driver(d)
+    journal = ReviewJournal()
+    d = journal.load()
+    if d == None:
+        d = Deck()
+        d.setTextStore(MappedTextStore())
+        d.setAsAnswerGrouped()
+        d.setAsDuplicateChecked()
+        d.setTermIndex(TermIndex())
+        if not importDriver(d):
+            return
+        if d.duplicates.reported != []:
+            d.duplicates.report()
+        journal.writeSnapshot(d)
+    else:
+        print("Loaded your saved deck and its review history.")
+        if refreshDriver(d):
+            journal.writeSnapshot(d)
+    journal.attach(d)
+
+    try:
+        parser_driver(d)
+    finally:
+        journal.close()
 
 
 if __name__ == '__main__':
-    processedText = textReaderDriver()
-    d = Deck()
-    d.text_to_cards(processedText)
-
-    file_Name = "CurrentDeck.txt"
-    fileObject = open(file_Name, 'wb')
-    pickle.dump(d, fileObject)
-    fileObject.close()
-
-    parser_driver(d)
+    run()
 
     # TODO: add parser for user experience
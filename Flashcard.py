@@ -1,4 +1,13 @@
 from Constants import *
+from array import array
+import sys
+from Scheduler import Scheduler
+from Sampler import WeightedSampler, card_weight
+from Statistics import AnswerHistory, DeckStatistics
+from Clustering import cluster_deck
+from AnswerNormalizer import normalize_answer
+from AnswerGrader import answer_key, merge_keys, grade, EMPTY_KEY
+from NearDuplicates import DuplicateIndex
 import random
 
 
@@ -103,6 +112,9 @@ class Deck:
             return False
         currentCard = self.getCurrentCard()
         currentCard.setRate(rating)
+        self.recordReview(currentCard, rating=rating)
+        if self.journal != None:
+            self.journal.record(currentCard, JOURNAL_RATE, rating)
         return True
     
     def getRate(self):
@@ -115,14 +127,49 @@ class Deck:
         print(ratings)
         return True
     
+    def gradeAnswer(self, response):
+        """
+        grades the typed response against the current card's answer key,
+        compiled when its chain was created, and records the result as
+        correctCard does
+        returns True if the response was correct, False if not or if the
+        deck is empty
+        """
+        if self.numCards == 0:
+            print("The deck is currently empty.")
+            return False
+        currentCard = self.getCurrentCard()
+        header = currentCard.getChainHeader()
+        key = header.answerKey if header != None else answer_key(currentCard.getBack())
+        result = grade(key, response)
+        print(("Correct." if result else "Incorrect.") + " The answer was: " + currentCard.getBack())
+        self.correctCard(result)
+        return result
+    
     def correctCard(self, answer):
         if self.numCards == 0:
             print("The deck is currently empty.")
             return False
         currentCard = self.getCurrentCard()
         currentCard.addStatistic(answer)
+        self.statistics.addAnswer(answer)
+        self.recordReview(currentCard, answer=answer)
+        if self.journal != None:
+            self.journal.record(currentCard, JOURNAL_CORRECT, answer)
         return True
     
+    def recordReview(self, card, answer=None, rating=None):
+        """
+        passes a rating or correctness answer given for card on to the
+        scheduler and the weighted sampler, which both work per chain
+        """
+        mainCard = self.find_main_card(card)
+        if self.scheduler != None:
+            self.scheduler.reviewCard(mainCard, answer, rating)
+        if self.sampler != None:
+            # the chain's weight follows its most recently reviewed card
+            self.sampler.updateCard(mainCard, card_weight(card))
+    
     def getCorrect(self):
         if self.numCards == 0:
             print("The deck is currently empty.")
@@ -136,8 +183,26 @@ class Deck:
             print("The deck is currently empty.")
             return False
         currentCard = self.getCurrentCard()
+        self.statistics.removeHistory(currentCard.statistics)
         currentCard.resetStatistic()
         currentCard.resetRate()
+        if self.journal != None:
+            self.journal.record(currentCard, JOURNAL_RESET)
+        return True
+    
+    def getDeckCorrect(self):
+        """
+        prints the accuracy over every answer recorded through correctCard
+        in this deck, without looking at any card's history
+        """
+        total = self.statistics.getTotal()
+        if total == 0:
+            print("No Statistics associated yet")
+            return False
+        print("Number of answers recorded in this deck: " + str(total) + ".")
+        print("The percentage correct is " + str(100 * self.statistics.correct/total) + "%.")
+        print("The percentage incorrect is " + str(100 * self.statistics.incorrect/total) + "%.")
+        print("The percentage skipped is " + str(100 * self.statistics.skip/total) + "%.")
         return True
     
     def entireCard(self):
@@ -145,6 +210,10 @@ class Deck:
             print("The deck is currently empty.")
             return False
         currentCard = self.getCurrentCard()
+        header = currentCard.getChainHeader()
+        if header != None:
+            self.setCurrentCard(header.entireCard)
+            return True
         mainCard = self.find_main_card(currentCard)
         rearCard = mainCard.getRear()
         self.setCurrentCard(rearCard)
@@ -159,14 +228,223 @@ class Deck:
         
     def getIsRandom(self):
         return self.randomCard
+
+    def setAsScheduled(self, clock=None):
+        """
+        switches on spaced repetition for every card in the main chain
+        clock is a function returning the time in seconds, time.time if None
+        """
+        if clock == None:
+            self.scheduler = Scheduler()
+        else:
+            self.scheduler = Scheduler(clock)
+        for card in self.cardList:
+            self.scheduler.addCard(card)
+
+    def setAsNotScheduled(self):
+        self.scheduler = None
+
+    def getIsScheduled(self):
+        return self.scheduler != None
+
+    def getDueCard(self):
+        """
+        sets the main chain card due soonest under spaced repetition as current
+        scheduling is switched on the first time this is called
+        ratings and correctness answers then decide when each card comes back
+        returns the card, or None if the deck is empty
+        """
+        if self.numCards == 0:
+            print("The deck is currently empty.")
+            return None
+        if self.scheduler == None:
+            self.setAsScheduled()
+        dueCard = self.scheduler.nextDueCard()
+        if not self.scheduler.isDue(dueCard):
+            print("No cards are due right now. This is the next card coming due.")
+        self.setCurrentCard(dueCard)
+        return dueCard
+    
+    def setAsWeighted(self):
+        """
+        switches getRandomCard to drawing cards weighted by their difficulty
+        ratings and recent misses
+        """
+        self.sampler = WeightedSampler()
+        for card in self.cardList:
+            self.sampler.addCard(card)
+    
+    def setAsNotWeighted(self):
+        self.sampler = None
+    
+    def getIsWeighted(self):
+        return self.sampler != None
+    
+    def setAsClustered(self, cachePath=CLUSTER_CACHE_FILE, numClusters=None):
+        """
+        groups the main chain cards into topic clusters by the text of their
+        chains, reusing the labels cached at cachePath if the deck is unchanged
+        cards added later are clustered again with them by clusterCard
+        """
+        self.clusters = cluster_deck(self.cardList, cachePath, numClusters)
+        self.clusters.deckVersion = self.nextCardId
+        self.clusters.settings = (cachePath, numClusters)
+    
+    def setAsAnswerGrouped(self):
+        """
+        questions added from now on whose normalized answer matches an existing
+        chain are appended to that chain instead of starting their own, see
+        add_question and AnswerNormalizer
+        chains already in the deck are indexed, but not merged with each other
+        """
+        self.answerIndex = {}
+        for mainCard in self.cardList:
+            header = mainCard.getChainHeader()
+            if header != None:
+                key = normalize_answer(mainCard.getBack())
+                if key != "" and key not in self.answerIndex:
+                    self.answerIndex[key] = header
+    
+    def setAsNotAnswerGrouped(self):
+        self.answerIndex = None
+    
+    def getIsAnswerGrouped(self):
+        return self.answerIndex != None
+    
+    def setAsDuplicateChecked(self, merge = False):
+        """
+        questions added from now on are checked against every question in the
+        deck for near duplicates, see NearDuplicates; duplicates found are
+        listed in self.duplicates.reported, and dropped instead of added if merge
+        """
+        self.duplicates = DuplicateIndex(merge)
+        for mainCard in self.cardList:
+            header = mainCard.getChainHeader()
+            text = mainCard.getFront() if header == None else header.entireQuestion()
+            self.duplicates.add(text, mainCard)
+    
+    def setAsNotDuplicateChecked(self):
+        self.duplicates = None
+    
+    def setInvertedIndex(self, index):
+        """
+        answers queryCards from index, an InvertedIndex.InvertedIndex, which
+        is built from the deck now
+        """
+        index.build(self)
+        self.invertedIndex = index
+    
+    def setTermIndex(self, index):
+        """
+        indexes every card in the deck, and the cards added from now on, by
+        the words on them in index, a TermIndex.TermIndex, see searchCard
+        the deck's cards go in as one batch, so a new index is built in O(n)
+        """
+        self.termIndex = index
+        index.addCards(self.allCards())
+    
+    def indexSegments(self, segments):
+        """
+        adds the cards of segments, (header, first card, last card) tuples as
+        add_question returns them, to the term index as one batch; None
+        segments, for dropped questions, are skipped
+        """
+        if self.termIndex == None:
+            return
+        self.termIndex.addCards(card for segment in segments if segment != None
+                                for card in self.segmentCards(segment[1], segment[2]))
+    
+    def setAsNotClustered(self):
+        self.clusters = None
+    
+    def clusterCard(self):
+        """
+        study by cluster: sets the next card in the current card's topic
+        cluster as current, so related cards come up back to back, and moves on
+        to the next cluster once this one is done
+        clusters are built the first time this is called, and built again if
+        cards were added since, so new cards are studied with their topic
+        """
+        if self.numCards == 0:
+            print("The deck is currently empty.")
+            return False
+        if self.clusters == None:
+            self.setAsClustered()
+        elif self.clusters.deckVersion != self.nextCardId:
+            self.setAsClustered(*self.clusters.settings)
+        currentCard = self.getCurrentCard()
+        mainCard = None if currentCard == None else self.find_main_card(currentCard)
+        nextCard = self.clusters.nextCard(mainCard)
+        if nextCard == None:
+            print("There are no clustered cards left.")
+            return False
+        self.setCurrentCard(nextCard)
+        return True
+    
+    def searchCard(self, query):
+        """
+        lists the cards holding every word of query and sets the first of them
+        as current, looking each word up in O(log n) in the term index
+        """
+        if self.termIndex == None:
+            print("The deck has no term index to search.")
+            return False
+        return self.showFoundCards(self.termIndex.search(query), query)
+    
+    def completeTerm(self, prefix):
+        """
+        lists the words in the term index starting with prefix, with the
+        number of cards holding each, such as "schubert" for "schub"
+        """
+        if self.termIndex == None:
+            print("The deck has no term index to complete from.")
+            return False
+        completions = self.termIndex.complete(prefix)
+        if completions == []:
+            print("No words start with " + prefix + ".")
+            return False
+        for word, count in completions:
+            print(SPACE + word + " (" + str(count) + " cards)")
+        return True
+    
+    def queryCards(self, query):
+        """
+        lists the cards matching the boolean query, such as
+        "schubert AND quintet NOT trout", and sets the first of them as
+        current, see InvertedIndex
+        the inverted index is built again first if cards were added or
+        removed since it was built
+        """
+        if self.invertedIndex == None:
+            print("The deck has no inverted index to query.")
+            return False
+        if self.invertedIndex.deckVersion != (self.nextCardId, self.numCards):
+            self.invertedIndex.build(self)
+        return self.showFoundCards(self.invertedIndex.query(query), query)
+    
+    def showFoundCards(self, cards, query):
+        if cards == []:
+            print("No cards match " + query + ".")
+            return False
+        print("Found " + str(len(cards)) + " cards matching " + query + ":")
+        for card in cards[:SEARCH_RESULTS]:
+            print(SPACE + card.getFront()[:80])
+        self.setCurrentCard(cards[0])
+        return True
     
     def getRandomCard(self):
         """
         current implementation just selects a randomly generated carf
-        Next phase implementation will create some sort of clustering algorithm to
-        suggest the next card for use
+        suggestions by topic come from clusterCard instead
         the random card will always be on the main chain
+        in weighted mode the card is drawn in O(log n) with probability
+        proportional to its weight, see setAsWeighted
         """
+        if self.sampler != None:
+            randomCard = self.sampler.sample()
+            if randomCard != None:
+                self.setCurrentCard(randomCard)
+            return randomCard
         total = len(self.cardList)
         randomIndex = random.randint(0, total - 1)
         randomCard = self.getCard(randomIndex)
@@ -186,6 +464,9 @@ class Deck:
     def removeCard(self, positionNum):
         """
         only removes cards form the main line
+        positionNum is the index of the card in cardList
+        removing by position needs an up to date cardList, so when removing
+        many cards prefer removeMainCard, which takes the card itself
         """
         # TODO need to deal with Main cards removal and chain cards removal
         
@@ -193,114 +474,376 @@ class Deck:
         if num == 0:
             print("No cards to remove")
             return
-        if num == 1:
-            self.cardList.remove(self.cardList[positionNum])
+        self.removeMainCard(self.getCard(positionNum))
+    
+    def removeMainCard(self, card):
+        """
+        unlinks card from the main chain in O(1)
+        the current card moves to the new head if card was the head, to the
+        new tail if card was the tail, and to the following card if card was
+        current
+        cardList is rebuilt lazily the next time it is used
+        """
+        assert type(card) == Card and card.getMain()
+        if self.scheduler != None:
+            self.scheduler.removeCard(card)
+        if self.sampler != None:
+            self.sampler.removeCard(card)
+        if self.clusters != None:
+            self.clusters.removeCard(card)
+        self.numMainCards -= 1
+        self.numCards -= 1
+        self.cardListValid = False
+        if self.numMainCards == 0:
+            self.headCard = None
             self.setCurrentCard(None)
-        elif positionNum == 0:
-            tail = self.getCard(num - 1)
-            head = self.getCard(1)
-            tail.setNext(head)
-            head.setLast(tail)
-            self.cardList.remove(self.cardList[positionNum])
-            self.setCurrentCard(head)
-        elif positionNum == num - 1:
-            tail = self.getCard(num - 2)
-            head = self.getCard(0)
-            tail.setNext(head)
-            head.setLast(tail)
-            self.cardList.remove(self.cardList[positionNum])
-            self.setCurrentCard(tail)
+            return
+        last = card.getLast()
+        nextCard = card.getNext()
+        last.setNext(nextCard)
+        nextCard.setLast(last)
+        if card is self.headCard:
+            self.headCard = nextCard
+            self.setCurrentCard(nextCard)
+        elif nextCard is self.headCard:
+            self.setCurrentCard(last)
+        elif self.getCurrentCard() is card:
+            self.setCurrentCard(nextCard)
+    
+    def removeClues(self, header, firstCard, lastCard):
+        """
+        removes the cards firstCard to lastCard, going forward, from header's
+        chain, as add_question returned them
+        if firstCard is the main card, the card after lastCard takes its place
+        on the main chain; if nothing would be left the whole chain is removed
+        the chain's answer key is compiled again from the answer lines left
+        """
+        if firstCard is header.mainCard and lastCard is header.tailCard:
+            self.removeChain(header)
+            return
+        header.removeSegment(firstCard, lastCard.getForward())
+        removed = 0
+        card = firstCard
+        while True:
+            self.statistics.removeHistory(card.statistics)
+            self.unindexCard(card)
+            if self.getCurrentCard() is card:
+                self.setCurrentCard(header.entireCard)
+            removed += 1
+            if card is lastCard:
+                break
+            card = card.getForward()
+        nextCard = lastCard.getForward()
+        if firstCard is header.mainCard:
+            nextCard.setRear(header.entireCard)
+            header.entireCard.setForward(nextCard)
+            nextCard.setMain(True)
+            self.insertCardAfter(firstCard, nextCard)
+            # nextCard was already counted as a side card
+            self.numCards -= 1
+            self.removeMainCard(firstCard)
+            header.mainCard = nextCard
+            removed -= 1
         else:
-            last = self.getCard(positionNum - 1)
-            nextCard = self.getCard(positionNum + 1)
-            last.setNext(nextCard)
-            nextCard.setLast(last)
-            self.cardList.remove(self.cardList[positionNum])
-        self.numCards -= 1
+            previousCard = firstCard.getRear()
+            previousCard.setForward(nextCard)
+            if nextCard == None:
+                header.tailCard = previousCard
+            else:
+                nextCard.setRear(previousCard)
+        self.numCards -= removed
+        header.compileAnswerKey()
+    
+    def removeChain(self, header):
+        """
+        removes the whole chain of header: its main card leaves the main chain
+        through removeMainCard and its side cards go with it, taking their
+        answers out of the deck statistics
+        if the current card is in the chain it moves as if the main card were
+        current, see removeMainCard
+        """
+        mainCard = header.mainCard
+        if self.answerIndex != None:
+            key = normalize_answer(mainCard.getBack())
+            if self.answerIndex.get(key) is header:
+                del self.answerIndex[key]
+        sideCards = 0
+        for direction in (Card.getRear, Card.getForward):
+            card = direction(mainCard)
+            while card != None:
+                self.statistics.removeHistory(card.statistics)
+                self.unindexCard(card)
+                sideCards += 1
+                card = direction(card)
+        self.statistics.removeHistory(mainCard.statistics)
+        self.unindexCard(mainCard)
+        currentCard = self.getCurrentCard()
+        if currentCard != None and currentCard.getChainHeader() is header:
+            # removeMainCard moves the current card off the main card only
+            self.setCurrentCard(mainCard)
+        self.removeMainCard(mainCard)
+        self.numCards -= sideCards
+    
+    def segmentCards(self, firstCard, lastCard):
+        """
+        generator over the cards firstCard to lastCard of a chain, going forward
+        """
+        card = firstCard
+        while True:
+            yield card
+            if card is lastCard:
+                break
+            card = card.getForward()
+    
+    def unindexCard(self, card):
+        """
+        takes card out of the near duplicate and term indexes the deck keeps
+        """
+        if self.duplicates != None:
+            self.duplicates.removeCard(card)
+        if self.termIndex != None:
+            self.termIndex.removeCard(card)
     
     def addCard(self, card):
+        """
+        appends card to the end of the main chain
+        """
         assert type(card) == Card
-        newCard = card
-        numCards1 = len(self.cardList)
-        self.cardList.append(newCard)
-        
-        if numCards1 == 1:
-            firstCard = self.cardList[0]
-            newCard.setLast(firstCard)
-            newCard.setNext(firstCard)
-            firstCard.setNext(newCard)
-            firstCard.setLast(newCard)
-        elif numCards1 > 1: #ALREADY MORE THAN ONE CARD IN DECK
-            lastCard = self.cardList[numCards1 - 1 ] 
-            firstCard = self.cardList[0]
-            lastCard.setNext(newCard)
-            newCard.setLast(lastCard)
-            newCard.setNext(firstCard)
-            firstCard.setLast(newCard)
-        elif numCards1 == 0:
-            newCard.setLast(newCard)
-            newCard.setNext(newCard)
+        if self.numMainCards == 0:
+            card.setLast(card)
+            card.setNext(card)
+            self.headCard = card
+            self.linkMainCard(card)
+        else:
+            self.insertCardAfter(self.headCard.getLast(), card)
+    
+    def insertCardAfter(self, card, newCard):
+        """
+        links newCard into the main chain right after card in O(1)
+        card must already be in the main chain
+        """
+        assert type(card) == Card and type(newCard) == Card
+        nextCard = card.getNext()
+        newCard.setLast(card)
+        newCard.setNext(nextCard)
+        card.setNext(newCard)
+        nextCard.setLast(newCard)
+        if nextCard is not self.headCard:
+            self.cardListValid = False
+        self.linkMainCard(newCard)
+    
+    def insertCardBefore(self, card, newCard):
+        """
+        links newCard into the main chain right before card in O(1)
+        inserting before the head makes newCard the new head
+        card must already be in the main chain
+        """
+        assert type(card) == Card and type(newCard) == Card
+        if card is self.headCard:
+            self.headCard = newCard
+            self.cardListValid = False
+        self.insertCardAfter(card.getLast(), newCard)
+    
+    def linkMainCard(self, card):
+        """
+        bookkeeping for a card that was just linked into the main chain
+        """
+        if self.cardListValid:
+            self._cardList.append(card)
+        self.numMainCards += 1
+        self.registerCard(card)
+        if self.scheduler != None:
+            self.scheduler.addCard(card)
+        if self.sampler != None:
+            self.sampler.addCard(card)
+    
+    def registerCard(self, card):
+        """
+        counts card as part of the deck and gives it an id unique in the deck,
+        which stays the same when the deck is saved and loaded
+        """
+        if card.getId() == None:
+            card.setId(self.nextCardId)
+            self.nextCardId += 1
         self.numCards += 1
+    
+    def allCards(self):
+        """
+        generator over every card in the deck: each main chain card in order,
+        followed by the cards of its side chain to the rear, then to the front
+        """
+        mainCard = self.headCard
+        for i in range(self.numMainCards):
+            yield mainCard
+            card = mainCard.getRear()
+            while card != None:
+                yield card
+                card = card.getRear()
+            card = mainCard.getForward()
+            while card != None:
+                yield card
+                card = card.getForward()
+            mainCard = mainCard.getNext()
+    
+    @property
+    def cardList(self):
+        """
+        the main chain in order as a list, starting from headCard
+        insertions and removals in the middle of the chain only mark the list
+        out of date, it is rebuilt from the links here the next time it is read
+        """
+        if not self.cardListValid:
+            cards = []
+            card = self.headCard
+            for i in range(self.numMainCards):
+                cards.append(card)
+                card = card.getNext()
+            self._cardList = cards
+            self.cardListValid = True
+        return self._cardList
             
             
-    def create_card_chain(self, questionsList, answer):
+    def create_card_chain(self, questionsList, answer, metadata = None):
+        """
+        builds one chain: the first question goes on the main chain, the entire
+        question card goes to its rear and the remaining questions follow it
+        forward; every card in the chain shares one ChainHeader
+        the answer is interned so equal answers share one string across chains,
+        and the entire question card has no text of its own: its front is put
+        together from the chain's clues when it is read
+        metadata is kept on the ChainHeader, with the answer key gradeAnswer uses
+        if the deck has a text store, the cards get refs into it instead of their text
+        returns the ChainHeader
+        """
+        key = answer_key(answer)
+        store = self.textStore
+        if store != None:
+            answer = store.add(answer)
+            questionsList = [store.add(question) for question in questionsList]
+        else:
+            answer = sys.intern(answer)
         firstQuestion = questionsList[0]
         firstCard = self.createCardHelper(firstQuestion, answer)
         firstCard.setMain(True) # part of main chain of cards
         self.setCurrentCard(firstCard)
         
-        entireQuestion = self.createEntireQuestion(questionsList)
         newCard = Card()
-        newCard.setFront(entireQuestion)
-        newCard.setBack(answer)
+        newCard.addBack(answer)
         firstCard.setRear(newCard)
         newCard.setForward(firstCard)
         newCard.setMain(False)
-        self.numCards += 1
+        self.registerCard(newCard)
+        
+        header = ChainHeader(firstCard, newCard, answer, metadata, store)
+        header.answerKey = key
+        firstCard.setChainHeader(header)
+        newCard.setChainHeader(header)
         
         remainingQuestions = questionsList[1:]
-        previousCard = firstCard
-        for question in remainingQuestions:
+        self.linkClues(header, remainingQuestions, answer)
+        return header
+    
+    def linkClues(self, header, questionsList, answer):
+        """
+        appends a card for every question to the forward end of header's chain
+        returns the first card added, or None if questionsList is empty
+        """
+        previousCard = header.tailCard
+        firstCard = None
+        for question in questionsList:
             #newCard = self.createCardHelper(question, answer)
             newCard = Card()
             newCard.addFront(question)
             newCard.addBack(answer)
             newCard.setMain(False)
-            self.numCards += 1
+            newCard.setChainHeader(header)
+            self.registerCard(newCard)
             previousCard.addForward(newCard)
             newCard.addRear(previousCard)
             previousCard = newCard
+            if firstCard == None:
+                firstCard = newCard
+        header.tailCard = previousCard
+        return firstCard
+    
+    def appendQuestion(self, header, questionsList, answer, metadata = None):
+        """
+        adds the clues of another question to the end of header's chain, each
+        card keeping its own answer line and the question its metadata, see
+        ChainHeader.questionMetadata
+        returns (header, first card added, last card added)
+        """
+        header.answerKey = merge_keys(header.answerKey, answer_key(answer))
+        store = header.textStore
+        if store != None:
+            answer = store.add(answer)
+            questionsList = [store.add(question) for question in questionsList]
+        else:
+            answer = sys.intern(answer)
+        firstCard = self.linkClues(header, questionsList, answer)
+        if firstCard != None:
+            header.addSegment(firstCard, metadata)
+        return (header, firstCard, header.tailCard)
         
             
     def text_to_cards(self, processed_text_list):
-        assert type(processed_text_list) == list
+        """
+        processed_text_list is a list, or any iterable such as the generator from
+        TextReader.stream_text, of (questions list, answer) tuples; it is consumed
+        one tuple at a time
+        a tuple may carry the chain's metadata as a third element, as the ones
+        from QuizdbReader.read_quizdb do
+        """
         for qaTuple in processed_text_list:
-            questionsList = qaTuple[0]
-            answer = qaTuple[1]
-            if len(questionsList) == 1:
-                question = questionsList[0]
-                newCard = self.createCardHelper(question, answer)
-                newCard.setMain(True) # main chain card
-                self.setCurrentCard(newCard)
-                
-                entireQuestion = self.createEntireQuestion(questionsList)
-                entireCard = Card()
-                entireCard.setFront(entireQuestion)
-                entireCard.setBack(answer)
-                newCard.setRear(entireCard)
-                entireCard.setForward(newCard)
-                entireCard.setMain(False)
-                self.numCards += 1
-                
-            else: 
-                self.create_card_chain(questionsList, answer)
+            self.add_question(qaTuple)
+    
+    def add_question(self, qaTuple):
+        """
+        adds one (questions list, answer[, metadata]) tuple to the deck: as a
+        new chain, or, when grouping by answer and a chain with the same
+        normalized answer exists, as clues appended to that chain in O(1)
+        returns (ChainHeader, first card added, last card added), which
+        removeClues takes to remove the question again, or None if the question
+        was dropped as a near duplicate, see setAsDuplicateChecked
+        """
+        questionsList = qaTuple[0]
+        answer = qaTuple[1]
+        metadata = qaTuple[2] if len(qaTuple) > 2 else None
+        signature = None
+        if self.duplicates != None:
+            match, signature = self.duplicates.check(questionsList, answer)
+            if match != None and self.duplicates.merge:
+                return None
+        key = ""
+        header = None
+        if self.answerIndex != None:
+            key = normalize_answer(answer)
+            header = self.answerIndex.get(key)
+        if header != None:
+            added = self.appendQuestion(header, questionsList, answer, metadata)
+        else:
+            # a single question is a chain of just the main and entire cards
+            header = self.create_card_chain(questionsList, answer, metadata)
+            if key != "":
+                self.answerIndex[key] = header
+            added = (header, header.mainCard, header.tailCard)
+        if self.duplicates != None:
+            self.duplicates.addSignature(signature, added[1])
+        if self.termIndex != None:
+            self.termIndex.addCards(self.segmentCards(added[1], added[2]))
+        return added
                 
     
+    def setTextStore(self, store):
+        """
+        cards of chains created from now on keep their front and back text in
+        store, such as a TextStore.MappedTextStore or
+        TextStore.CompressedTextStore, and only hold refs into it
+        """
+        self.textStore = store
+    
     def createEntireQuestion(self, questionsList):
-        entireQuestion = ""
-        for element in questionsList:
-            entireQuestion += element
-        return entireQuestion
+        return "".join(questionsList)
             
             
     def createCardHelper(self, question, answer):
@@ -324,30 +867,31 @@ class Deck:
         # TODO
         
     def find_main_card(self, card):
+        """
+        O(1) through the chain header; cards built without one fall back to
+        walking the side chain in both directions
+        """
         assert type(card) == Card or type(card) == None
         if card.getMain():
             return card
+        header = card.getChainHeader()
+        if header != None:
+            return header.mainCard
         forward = self.search_forward_chain(card)
         backward = self.search_rear_chain(card)
         return forward if forward != None else backward #one forward or backward must be on the main chain
         
     def search_forward_chain(self, card):
         assert type(card) == Card or card == None
-        if card == None:
-            return None
-        if card.getMain():
-            return card
-        newCard = card.getForward()
-        return self.search_forward_chain(newCard)
+        while card != None and not card.getMain():
+            card = card.getForward()
+        return card
 
     def search_rear_chain(self, card):
         assert type(card) == Card or card == None
-        if card == None:
-            return None
-        if card.getMain():
-            return card
-        newCard = card.getRear()
-        return self.search_rear_chain(newCard)
+        while card != None and not card.getMain():
+            card = card.getRear()
+        return card
     
     def custom_main_card_creation(self, question, answer):
         newCard = self.createCardHelper(question, answer)
@@ -364,10 +908,58 @@ class Deck:
     
     def __init__(self, name = None, isRandom = False):
         self.currentCard = None
-        self.cardList = []
+        self.headCard = None
+        self._cardList = []
+        self.cardListValid = True
+        self.numMainCards = 0
         self.numCards = 0
         self.deckName = name
         self.randomCard = isRandom
+        self.scheduler = None
+        self.sampler = None
+        self.clusters = None
+        self.statistics = DeckStatistics()
+        self.nextCardId = 0
+        self.journal = None
+        self.textStore = None
+        # what the deck was imported from, see IncrementalImport
+        self.sourcePath = None
+        self.sourceStamp = None
+        self.sourceChains = {}
+        self.answerIndex = None
+        self.duplicates = None
+        self.termIndex = None
+        self.invertedIndex = None
+        
+    def __getstate__(self):
+        """
+        pickles the cards as one flat list with their links as ids, instead of
+        letting pickle follow the links card by card, which would recurse once
+        per card and fail on large decks
+        the journal is never pickled with the deck
+        """
+        state = self.__dict__.copy()
+        state["journal"] = None
+        # rebuilt from the cards on the first query after loading
+        state["invertedIndex"] = None
+        cards = list(self.allCards())
+        positions = {}
+        for i in range(len(cards)):
+            positions[cards[i]] = i
+        links = array('i')
+        for card in cards:
+            for link in card.getLinks():
+                links.append(-1 if link == None else positions[link])
+        state["_cards"] = cards
+        state["_links"] = links
+        return state
+    
+    def __setstate__(self, state):
+        cards = state.pop("_cards")
+        links = state.pop("_links")
+        self.__dict__.update(state)
+        for i in range(len(cards)):
+            cards[i].setLinks([None if link == -1 else cards[link] for link in links[4 * i: 4 * i + 4]])
         
     def __str__(self):
         return self.deckName 
@@ -376,15 +968,126 @@ class Deck:
         return self.deckName
     
 
+class ChainHeader:
+    """
+    One record per chain, shared by every card in it, so the main card and the
+    entire question card of a chain are found in O(1) from any of its cards
+    mainCard [Card] is the chain's card on the main chain
+    entireCard [Card] is the card holding the whole question, at the rear of mainCard
+    answer [str]/[int]/[None] is the one answer shared by the chain's cards, a ref
+        into textStore if the chain's text is kept there
+    metadata is where the chain's first question came from, such as
+        QuizdbReader.QuestionMetadata, or None
+    textStore is the store holding the text of the chain's cards, see TextStore, or None
+    tailCard [Card] is the last card forward of mainCard, where more clues are appended
+    answerKey [(tuple of str, tuple of str)] is every answer accepted and rejected for the
+        chain's cards, see AnswerGrader
+    segments [list of (Card, metadata)] is the first card and metadata of each
+        question appended to the chain when grouping by answer, in chain order,
+        or None if there are none
+    """
+    __slots__ = ("mainCard", "entireCard", "answer", "metadata", "textStore", "tailCard", "answerKey",
+                 "segments")
+    
+    def __init__(self, mainCard, entireCard, answer = None, metadata = None, textStore = None):
+        self.mainCard = mainCard
+        self.entireCard = entireCard
+        self.answer = answer
+        self.metadata = metadata
+        self.textStore = textStore
+        self.tailCard = mainCard
+        self.answerKey = EMPTY_KEY
+        self.segments = None
+    
+    def compileAnswerKey(self):
+        """
+        sets answerKey from the answer lines of the chain's clue cards, for
+        when clues are removed; each distinct line is compiled once
+        """
+        key = EMPTY_KEY
+        lines = set()
+        card = self.mainCard
+        while card != None:
+            line = card.getBack()
+            if line not in lines:
+                lines.add(line)
+                key = merge_keys(key, answer_key(line))
+            card = card.getForward()
+        self.answerKey = key
+    
+    def addSegment(self, firstCard, metadata):
+        """
+        records the metadata of the question appended from firstCard on
+        """
+        if self.segments == None:
+            self.segments = []
+        self.segments.append((firstCard, metadata))
+    
+    def removeSegment(self, firstCard, nextCard):
+        """
+        forgets the question from firstCard on, which is being removed; if it
+        is the chain's first question, the one from nextCard on takes its place
+        """
+        if self.segments == None:
+            return
+        if firstCard is self.mainCard:
+            firstCard = nextCard
+            self.metadata = self.segments[0][1]
+        self.segments = [segment for segment in self.segments if segment[0] is not firstCard]
+        if self.segments == []:
+            self.segments = None
+    
+    def questionMetadata(self, card):
+        """
+        the metadata of the question card came from, card being one of the
+        chain's clue cards; the entire question card gives the first question's
+        """
+        metadata = self.metadata
+        if self.segments == None:
+            return metadata
+        starts = dict(self.segments)
+        clue = self.mainCard
+        while clue != None:
+            metadata = starts.get(clue, metadata)
+            if clue is card:
+                return metadata
+            clue = clue.getForward()
+        return self.metadata
+        
+    def entireQuestion(self):
+        """
+        the text of every clue card from the main card forward, joined
+        """
+        fronts = []
+        card = self.mainCard
+        while card != None:
+            fronts.append(card.getFront())
+            card = card.getForward()
+        return "".join(fronts)
+    
+
 class Card:
+    # no per card __dict__: a deck built from a full quizdb dump holds
+    # hundreds of thousands of these
+    __slots__ = ("cardName", "frontText", "backText", "forwardChain", "rearChain",
+                 "nextCard", "lastCard", "mainChain", "rateCard", "statistics",
+                 "chainHeader", "cardId")
+    # links to other cards, left out when a card is pickled, see Deck.__getstate__
+    LINK_SLOTS = ("forwardChain", "rearChain", "nextCard", "lastCard")
     
     def getName(self):
         return self.cardName
     
     def getFront(self):
+        if self.frontText == None and self.chainHeader != None and self.chainHeader.entireCard is self:
+            return self.chainHeader.entireQuestion()
+        if type(self.frontText) == int:
+            return self.chainHeader.textStore.text(self.frontText)
         return self.frontText
     
     def getBack(self):
+        if type(self.backText) == int:
+            return self.chainHeader.textStore.text(self.backText)
         return self.backText
     
     def getForward(self):
@@ -402,7 +1105,18 @@ class Card:
     def getMain(self):
         return self.mainChain
     
+    def getChainHeader(self):
+        return self.chainHeader
+    
+    def getId(self):
+        return self.cardId
+    
+    def getLinks(self):
+        return [self.forwardChain, self.rearChain, self.nextCard, self.lastCard]
+    
     def getRate(self):
+        if self.rateCard == None:
+            return []
         return self.rateCard
     
     def setName(self, name):
@@ -418,11 +1132,11 @@ class Card:
         self.backText = text
         
     def setForward(self, card):
-        assert type(card) == Card
+        assert card == None or type(card) == Card
         self.forwardChain = card
         
     def setRear(self, card):
-        assert type(card) == Card
+        assert card == None or type(card) == Card
         self.rearChain = card
         
     def setNext(self, card):
@@ -437,13 +1151,35 @@ class Card:
         assert type(main) == bool
         self.mainChain = main
         
+    def setChainHeader(self, header):
+        assert type(header) == ChainHeader or header == None
+        self.chainHeader = header
+        
+    def setId(self, cardId):
+        assert type(cardId) == int
+        self.cardId = cardId
+        
+    def setLinks(self, links):
+        self.forwardChain, self.rearChain, self.nextCard, self.lastCard = links
+        
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in Card.__slots__ if slot not in Card.LINK_SLOTS}
+    
+    def __setstate__(self, state):
+        for slot in Card.LINK_SLOTS:
+            setattr(self, slot, None)
+        for slot in state:
+            setattr(self, slot, state[slot])
+        
     def setRate(self, rate):
         assert type(rate) == int
+        if self.rateCard == None:
+            self.rateCard = []
         self.rateCard.append(rate)
         
     def resetRate(self):
         print("All ratings for this current card are reset. ")
-        self.ratecard = []
+        self.rateCard = None
 
     """
     Creates a new instance of a flash card 
@@ -456,9 +1192,13 @@ class Card:
     following [Card]/[None] is the next card in the the pile of flashcards
     last [Card]/[None] is the previous card in the pile of flashcards
     main [bool] is whether the card is the main chain - the command main will take you from any card in the chain to the main card in the chain
+    chainHeader [ChainHeader]/[None] is shared by every card of the chain this card belongs to
+    cardId [int]/[None] is given by the Deck the card is added to
     
-    statistics [List of [bool]] - list with each time card is answered correctly or not,
-        where True is answered correctly, False is not
+    statistics [AnswerHistory]/[None] - each time card is answered correctly or not,
+        where True is answered correctly, False is not, packed with running counts
+    rateCard [List of [int]]/[None] - every rating given to this card
+        both are only allocated once the first entry is added
     
     Class invariants:
     After every single time the card is seen, the user must enter a statistic, or skip
@@ -485,8 +1225,10 @@ class Card:
         
         self.mainChain = main
         
-        self.rateCard = []
-        self.statistics = []
+        self.rateCard = None
+        self.statistics = None
+        self.chainHeader = None
+        self.cardId = None
         
     def editCard(self, card_face, edits):
         """
@@ -510,20 +1252,25 @@ class Card:
         self.forwardChain = forwardCard
         
     def addFront(self, text):
-        assert type(text) == str
+        """
+        text is a [str], or an [int] ref into the text store of the card's chain
+        """
+        assert type(text) == str or type(text) == int
         self.frontText = text
         
     def addBack(self, text):
-        assert type(text) == str
+        assert type(text) == str or type(text) == int
         self.backText = text
         
     def resetStatistic(self):
         print("All Statistics for this current card are about to be cleared. ")
-        self.statistics = []
+        self.statistics = None
     
     
     def addStatistic(self, boolean):
         assert (type(boolean) == bool or boolean == SKIP)
+        if self.statistics == None:
+            self.statistics = AnswerHistory()
         self.statistics.append(boolean)
         
     def calculateStatistic(self):
@@ -533,20 +1280,13 @@ class Card:
         returns NONE
         """
         statistics = self.statistics
-        total = len(statistics)
+        total = 0 if statistics == None else len(statistics)
         if total == 0:
             print("No Statistics associated yet")
             return
-        correct = 0
-        incorrect = 0
-        skip = 0
-        for i in range(total):
-            if statistics[i] == True:
-                correct += 1
-            elif statistics[i] == False:
-                incorrect += 1
-            else:
-                skip += 1
+        correct = statistics.correct
+        incorrect = statistics.incorrect
+        skip = statistics.skip
         print("Number of times this card has been seen: " + str(total) + ".")
         print("The percentage correct is " + str(100 * correct/total) + "%.")
         print("The percentage incorrect is " + str(100 * incorrect/total) + "%.")
@@ -98,6 +98,94 @@ def initializeDeck():
     assert d.cardList == []
     print("Pass deck")
     
+def insertRemoveCards():
+    print("testing O(1) insert and remove")
+    d = Deck()
+    cards = [Card() for i in range(6)]
+    d.addCard(cards[0])
+    d.insertCardBefore(cards[0], cards[1])
+    d.insertCardAfter(cards[1], cards[2])
+    d.insertCardAfter(cards[0], cards[3])
+    assert d.headCard == cards[1]
+    assert d.cardList == [cards[1], cards[2], cards[0], cards[3]]
+    assert d.numMainCards == 4
+    assert cards[3].getNext() == cards[1]
+    assert cards[1].getLast() == cards[3]
+    
+    d.setCurrentCard(cards[2])
+    d.removeMainCard(cards[2])
+    assert d.getCurrentCard() == cards[0]
+    assert d.cardList == [cards[1], cards[0], cards[3]]
+    d.removeMainCard(cards[1])
+    assert d.headCard == cards[0]
+    assert d.getCurrentCard() == cards[0]
+    d.removeMainCard(cards[3])
+    assert d.getCurrentCard() == cards[0]
+    assert d.cardList == [cards[0]]
+    assert cards[0].getNext() == cards[0] and cards[0].getLast() == cards[0]
+    d.removeMainCard(cards[0])
+    assert d.cardList == []
+    assert d.getCurrentCard() == None
+    assert d.numCards == 0
+    
+    d.addCard(cards[4])
+    d.addCard(cards[5])
+    assert d.cardList == [cards[4], cards[5]]
+    
+    big = Deck()
+    many = [Card() for i in range(2000)]
+    for card in many:
+        big.addCard(card)
+    for card in many[::2]:
+        big.removeMainCard(card)
+    assert big.cardList == many[1::2]
+    assert big.numMainCards == 1000
+    print("Pass insert and remove")
+    
+def chainHeaders():
+    print("testing chain headers")
+    d = Deck()
+    clues = ["Clue number " + str(i) + "." for i in range(6)]
+    header = d.create_card_chain(clues, "Answer")
+    mainCard = d.getCurrentCard()
+    assert header.mainCard == mainCard
+    assert header.entireCard == mainCard.getRear()
+    card = mainCard
+    while card.getForward() != None:
+        card = card.getForward()
+        assert card.getChainHeader() == header
+        assert d.find_main_card(card) == mainCard
+    d.setCurrentCard(card)
+    d.entireCard()
+    assert d.getCurrentCard() == header.entireCard
+    d.mainCard()
+    assert d.getCurrentCard() == mainCard
+    
+    # very long chains no longer recurse, even without a header
+    long = Deck()
+    long.create_card_chain(["Clue."] * 5000, "Answer")
+    card = long.getCurrentCard()
+    while card.getForward() != None:
+        card = card.getForward()
+        card.setChainHeader(None)
+    assert long.find_main_card(card) == long.getCurrentCard()
+    print("Pass chain headers")
+    
+def lazyEntireQuestion():
+    print("testing shared answers and lazy entire question")
+    d = Deck()
+    clues = ["First clue. ", "Second clue. ", "Third clue."]
+    header = d.create_card_chain(clues, "Franz " + "Peter Schubert")
+    other = d.create_card_chain(["Another clue."], "Franz Peter " + "Schubert")
+    assert header.answer is other.answer
+    assert header.mainCard.getBack() is header.mainCard.getForward().getBack()
+    assert header.entireCard.frontText == None
+    assert header.entireCard.getFront() == "First clue. Second clue. Third clue."
+    assert other.entireCard.getFront() == "Another clue."
+    header.mainCard.getForward().editCard(True, "Edited clue. ")
+    assert header.entireCard.getFront() == "First clue. Edited clue. Third clue."
+    print("Pass shared answers and lazy entire question")
+    
 def initializeQuestions():
     print("Initialize questions")
     d = Deck()
@@ -177,4 +265,7 @@ def initializeQuestions():
 
 initializeCard()
 initializeDeck
+insertRemoveCards()
+chainHeaders()
+lazyEntireQuestion()
 initializeQuestions()
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Imports a question file into a deck, and re-imports it after it is edited
+
+Every record of the file (a '||' block or a quizdb record) is hashed, and
+deck.sourceChains keeps, under each hash, the (header, first card, last
+card) of every question added from that record, see Deck.add_question. On a
+re-import, records the deck already has keep their cards and review history
+and are not parsed again; new or edited records are parsed and added, and
+the cards of records that are gone are removed. Only the edited records are
+parsed, so the cost of a re-import beyond reading and hashing the file
+follows the size of the edit.
+"""
+from Constants import *
+from TextReader import enterFileName, sourceFormat, source_records, parse_record, record_digest
+from ParallelIngest import parallel_records
+import os
+
+
+def source_stamp(filename):
+    status = os.stat(filename)
+    return (status.st_size, status.st_mtime_ns)
+
+
+def serial_records(filename, fileFormat):
+    """
+    Generator of (record_digest, raw record) pairs over filename, in order
+    """
+    with open(filename, 'r', encoding = 'utf-8') as fileObject:
+        for record in source_records(fileObject, fileFormat):
+            yield (record_digest(record), record)
+
+
+def import_source(deck, filename, convertToSentences = True, workers = None):
+    """
+    Brings deck up to date with the question file at filename, see the module
+    docstring; a deck with no chains from a file yet imports all of it, in
+    parallel for files of at least PARALLEL_MIN_BYTES
+    Returns (added, kept, removed), counts of records
+    Raises: IOError if the file cannot be read
+    """
+    fileFormat = sourceFormat(filename)
+    known = deck.sourceChains
+    parallel = known == {} and os.path.getsize(filename) >= PARALLEL_MIN_BYTES and (os.cpu_count() or 1) > 1
+    if parallel:
+        records = parallel_records(filename, convertToSentences, workers)
+    else:
+        records = serial_records(filename, fileFormat)
+    # the cards added are indexed by their words in one batch at the end
+    termIndex = deck.termIndex
+    deck.termIndex = None
+    segments = []
+    chains = {}
+    added = 0
+    kept = 0
+    try:
+        for digest, record in records:
+            groups = known.get(digest)
+            if groups:
+                # the same text as before: keep its chains as they are
+                group = groups.pop(0)
+                kept += 1
+            else:
+                qaTuples = record if parallel else parse_record(record, fileFormat, convertToSentences)
+                group = [deck.add_question(qaTuple) for qaTuple in qaTuples]
+                segments.extend(group)
+                added += 1
+            chains.setdefault(digest, []).append(group)
+    finally:
+        deck.termIndex = termIndex
+        deck.indexSegments(segments)
+    removed = 0
+    for groups in known.values():
+        for group in groups:
+            for segment in group:
+                # None for a question dropped as a near duplicate
+                if segment != None:
+                    deck.removeClues(*segment)
+            removed += 1
+    deck.sourceChains = chains
+    deck.sourcePath = os.path.abspath(filename)
+    deck.sourceStamp = source_stamp(filename)
+    return (added, kept, removed)
+
+
+def sourceChanged(deck):
+    """
+    True if the file deck was imported from was edited since
+    """
+    if deck.sourcePath == None or not os.path.exists(deck.sourcePath):
+        return False
+    return source_stamp(deck.sourcePath) != deck.sourceStamp
+
+
+def importDriver(deck):
+    """
+    Asks for a question file and imports it into deck
+    Returns False if the file could not be read
+    """
+    try:
+        filename = enterFileName()
+        import_source(deck, filename)
+        return True
+    except IOError as e:
+        print("IO ERROR - no such txt file in your current directory - quitting program")
+        return False
+
+
+def refreshDriver(deck):
+    """
+    Re-imports deck's question file if it was edited since the last import
+    Returns True if it was
+    """
+    if not sourceChanged(deck):
+        return False
+    added, kept, removed = import_source(deck, deck.sourcePath)
+    print("Your question file changed: " + str(added) + " new or edited, " + str(removed)
+          + " removed, " + str(kept) + " unchanged. Reviews of unchanged questions are kept.")
+    return True
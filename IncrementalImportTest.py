@@ -0,0 +1,112 @@
+from IncrementalImport import *
+from Flashcard import *
+import os
+import tempfile
+
+
+def block(i, answer = None):
+    return "QUESTION: Clue " + str(i) + " one. Clue " + str(i) + " two. ANSWER: " + (answer or "Answer " + str(i)) + " END ||\n"
+
+
+def write_file(path, text):
+    with open(path, 'w') as fileObject:
+        fileObject.write(text)
+
+
+def test_reimport():
+    print("Testing incremental re-import")
+    path = os.path.join(tempfile.mkdtemp(), "questions.txt")
+    write_file(path, "".join(block(i) for i in range(6)))
+    d = Deck()
+    assert import_source(d, path) == (6, 0, 0)
+    assert d.numMainCards == 6 and d.numCards == 6 * 3
+    for i in range(3):
+        d.setCurrentCard(d.cardList[i])
+        d.correctCard(True)
+        d.rateCard(i)
+    assert not sourceChanged(d)
+
+    # block 1 is edited, block 2 removed, block 6 added; 0, 3, 4 and 5 stay
+    write_file(path, block(0) + block(1, "Edited") + "".join(block(i) for i in range(3, 7)))
+    os.utime(path, ns = (0, 0))
+    assert sourceChanged(d)
+    assert import_source(d, path) == (2, 4, 2)
+    assert not sourceChanged(d)
+    backs = [card.getBack() for card in d.cardList]
+    assert backs == ["Answer 0", "Answer 3", "Answer 4", "Answer 5", "Edited", "Answer 6"]
+    assert d.numMainCards == 6 and d.numCards == 6 * 3
+    assert len(list(d.allCards())) == d.numCards
+    # the unchanged first chain kept its history; the removed ones left the deck totals
+    assert d.cardList[0].getRate() == [0]
+    assert list(d.cardList[0].statistics) == [True]
+    assert d.statistics.getTotal() == 1
+    assert import_source(d, path) == (0, 6, 0)
+    print("pass incremental re-import")
+
+
+def test_reimport_current_card():
+    print("Testing re-import from a removed side card")
+    path = os.path.join(tempfile.mkdtemp(), "questions.txt")
+    write_file(path, "".join(block(i) for i in range(3)))
+    d = Deck()
+    import_source(d, path)
+    d.setCurrentCard(d.cardList[1].getForward())
+    write_file(path, block(0) + block(2))
+    os.utime(path, ns = (0, 0))
+    assert import_source(d, path) == (0, 2, 1)
+    # the current card moved to the card after the removed main card
+    assert d.getCurrentCard() is d.cardList[1]
+    assert d.getCurrentCard().getBack() == "Answer 2"
+    d.mainCard()
+    d.correctCard(True)
+    assert list(d.cardList[1].statistics) == [True]
+    assert d.statistics.getTotal() == 1
+    write_file(path, "")
+    os.utime(path, ns = (0, 0))
+    d.setCurrentCard(d.cardList[0].getRear())
+    import_source(d, path)
+    assert d.numCards == 0 and d.getCurrentCard() == None
+    print("pass re-import from a removed side card")
+
+
+def test_grouped_reimport():
+    print("Testing re-import grouped by answer")
+    path = os.path.join(tempfile.mkdtemp(), "questions.txt")
+    write_file(path, block(0, "Schubert") + block(1, "Liszt") + block(2, "SCHUBERT"))
+    d = Deck()
+    d.setAsAnswerGrouped()
+    import_source(d, path)
+    assert d.numMainCards == 2 and d.numCards == 8
+    write_file(path, block(1, "Liszt") + block(2, "SCHUBERT") + block(3, "Schubert [or Franz Schubert]"))
+    os.utime(path, ns = (0, 0))
+    assert import_source(d, path) == (1, 2, 1)
+    assert d.numMainCards == 2 and d.numCards == 8
+    schubert = [card for card in d.cardList if card.getBack() == "SCHUBERT"][0]
+    assert schubert.getFront() == "Clue 2 one."
+    assert schubert.getChainHeader().tailCard.getFront() == "Clue 3 two."
+    print("pass re-import grouped by answer")
+
+
+def test_quizdb_reimport():
+    print("Testing quizdb re-import")
+    with open("quizdb-20190909035459.txt", encoding = 'utf-8') as fileObject:
+        lines = fileObject.read().split("\n")
+    path = os.path.join(tempfile.mkdtemp(), "quizdb.txt")
+    write_file(path, "\n".join(lines))
+    d = Deck()
+    added, kept, removed = import_source(d, path)
+    assert (added, kept, removed) == (1500, 0, 0)
+    numMainCards = d.numMainCards
+    # drop the first tossup: the numbers of every later record change, their text does not
+    start = lines.index("1.")
+    end = lines.index("2.")
+    write_file(path, "\n".join(lines[:start] + lines[end:]))
+    assert import_source(d, path) == (0, 1499, 1)
+    assert d.numMainCards == numMainCards - 1
+    print("pass quizdb re-import")
+
+
+test_reimport()
+test_reimport_current_card()
+test_grouped_reimport()
+test_quizdb_reimport()
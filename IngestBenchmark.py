@@ -0,0 +1,234 @@
+"""
+Throughput and memory benchmark of the ingest pipeline
+
+Every input goes through the stages a deck import runs:
+    format     TextReader.format_text (QuizdbReader.read_quizdb for quizdb exports)
+    sentences  SentenceSplitter.split_sentences over every question body
+    cards      Deck.text_to_cards over the formatted tuples
+    pickle     pickling the resulting deck, as ReviewJournal.writeSnapshot does
+and each stage is reported as seconds, MB/s of input text and peak traced
+memory. Stages are timed without tracemalloc, which slows Python down
+several times, taking the best of a few runs for fast stages, and run once
+more under it for the peak.
+
+The generated inputs come in several sizes, and the scaling exponent of a
+stage is the slope of log(seconds) against log(questions) over them: about
+1 for a linear stage, 2 for a quadratic one.
+
+    python IngestBenchmark.py [--sizes 1000 10000 ...] [--save FILE] [--compare FILE]
+
+IngestBaseline.json holds the results of the default sizes.
+
+--save writes the results as JSON; --compare reads such a file back and
+prints how each stage changed against it.
+"""
+from Constants import *
+from Flashcard import Deck
+from TextReader import format_text, convert_text_to_block, question_answer
+from SentenceSplitter import split_sentences
+from QuizdbReader import read_quizdb
+import argparse
+import io
+import json
+import math
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+REAL_INPUTS = ["Test.txt", "quizdb-20190909035459.txt"]
+STAGES = ["format", "sentences", "cards", "pickle"]
+SYLLABLES = ["ka", "ro", "mi", "te", "sun", "lo", "ver", "an", "is", "pol", "du", "gra", "ne", "tho", "ly", "br"]
+SLOWER = 1.5  # --compare flags stages at least this many times slower than the baseline
+TIMED_SECONDS = 0.5  # a fast stage is run again until this much time has gone by
+MAX_RUNS = 5
+NOISE_SECONDS = 0.05  # stages faster than this are left out of --compare
+
+
+def random_word(generator):
+    return "".join(generator.choice(SYLLABLES) for i in range(generator.randint(1, 4)))
+
+
+def generate_text(n, seed = 0):
+    """
+    Returns the text of [n] made up questions in the QUESTION: ... ANSWER:
+    ... END || format, each of 2 to 6 sentences, the same for the same seed
+    """
+    generator = random.Random(seed)
+    # a fixed vocabulary, as in real questions most words repeat
+    vocabulary = [random_word(generator) for i in range(5000)]
+    blocks = []
+    for i in range(n):
+        sentences = []
+        for j in range(generator.randint(2, 6)):
+            words = [generator.choice(vocabulary) for k in range(generator.randint(6, 24))]
+            sentences.append(" ".join(words).capitalize() + generator.choice([".", ".", ".", "?"]))
+        answer = " ".join(generator.choice(vocabulary) for k in range(generator.randint(1, 3))).upper()
+        blocks.append("QUESTION: " + " ".join(sentences) + " ANSWER: " + answer + " END || ")
+    return "".join(blocks)
+
+
+def stage_functions(text, quizdb):
+    """
+    Returns the list of (stage name, function) pairs for [text]; each
+    function takes the result of the stage before it
+    """
+    def format_stage(previous):
+        if quizdb:
+            return list(read_quizdb(io.StringIO(text)))
+        return format_text(text, True)
+
+    def sentence_stage(previous):
+        # the question bodies on their own, so the splitter is measured apart
+        # from the block parsing around it in format
+        if quizdb:
+            bodies = [" ".join(qaTuple[0]) for qaTuple in previous]
+        else:
+            bodies = [question_answer(block)[0] for block in convert_text_to_block(text)]
+        for body in bodies:
+            split_sentences(body)
+        return previous
+
+    def card_stage(previous):
+        d = Deck()
+        d.text_to_cards(previous)
+        return d
+
+    def pickle_stage(previous):
+        return len(pickle.dumps(previous))
+
+    return [("format", format_stage), ("sentences", sentence_stage), ("cards", card_stage), ("pickle", pickle_stage)]
+
+
+def run_stages(text, quizdb):
+    """
+    Returns {stage: {"seconds", "mb_per_s", "peak_mb"}} for one input
+    """
+    megabytes = len(text.encode("utf-8")) / 2 ** 20
+    results = {}
+    previous = None
+    for name, function in stage_functions(text, quizdb):
+        # the best of a few runs, so short stages are not all noise
+        times = []
+        while times == [] or (sum(times) < TIMED_SECONDS and len(times) < MAX_RUNS):
+            start = time.perf_counter()
+            function(previous)
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        tracemalloc.start()
+        result = function(previous)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {"seconds": seconds,
+                         "mb_per_s": megabytes / seconds if seconds > 0 else float("inf"),
+                         "peak_mb": peak / 2 ** 20}
+        previous = result
+    return results
+
+
+def scaling_exponent(sizes, values):
+    """
+    Returns the least squares slope of log(values) against log(sizes), or
+    None with fewer than two usable points
+    """
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2:
+        return None
+    meanX = sum(x for x, y in points) / len(points)
+    meanY = sum(y for x, y in points) / len(points)
+    spread = sum((x - meanX) ** 2 for x, y in points)
+    if spread == 0:
+        return None
+    return sum((x - meanX) * (y - meanY) for x, y in points) / spread
+
+
+def print_results(name, megabytes, results):
+    print(name + " (" + ("%.2f" % megabytes) + " MB)")
+    for stage in STAGES:
+        result = results[stage]
+        print(SPACE + stage.ljust(12) + ("%.3f s" % result["seconds"]).rjust(12)
+              + ("%.2f MB/s" % result["mb_per_s"]).rjust(16) + ("%.1f MB peak" % result["peak_mb"]).rjust(16))
+
+
+def run(sizes, realInputs = REAL_INPUTS):
+    """
+    Benchmarks the generated inputs of every size in [sizes] and the files
+    in [realInputs] that exist
+    Returns the results as a JSON ready dict
+    """
+    report = {"python": sys.version.split()[0], "inputs": {}, "exponents": {}}
+    for n in sizes:
+        text = generate_text(n)
+        name = "generated-" + str(n)
+        report["inputs"][name] = run_stages(text, False)
+        print_results(name, len(text) / 2 ** 20, report["inputs"][name])
+    for filename in realInputs:
+        if not os.path.exists(filename):
+            print("Skipping " + filename + ", it does not exist.")
+            continue
+        with open(filename, 'r', encoding = 'utf-8') as fileObject:
+            text = fileObject.read()
+        quizdb = text.startswith(QUIZDB_HEADER)
+        report["inputs"][filename] = run_stages(text, quizdb)
+        print_results(filename, len(text) / 2 ** 20, report["inputs"][filename])
+    names = ["generated-" + str(n) for n in sizes]
+    for stage in STAGES:
+        seconds = [report["inputs"][name][stage]["seconds"] for name in names]
+        memory = [report["inputs"][name][stage]["peak_mb"] for name in names]
+        report["exponents"][stage] = {"seconds": scaling_exponent(sizes, seconds),
+                                      "peak_mb": scaling_exponent(sizes, memory)}
+    if len(sizes) > 1:
+        print("Scaling exponents over " + ", ".join(str(n) for n in sizes) + " questions")
+        for stage in STAGES:
+            exponents = report["exponents"][stage]
+            print(SPACE + stage.ljust(12) + ("time %.2f" % exponents["seconds"]).rjust(12)
+                  + ("memory %.2f" % exponents["peak_mb"]).rjust(16))
+    return report
+
+
+def compare(report, baseline):
+    """
+    Prints how each stage of [report] changed against [baseline], a report
+    from an earlier run, for the inputs both have
+    Returns the list of (input, stage) pairs that got SLOWER times slower
+    """
+    regressions = []
+    print("Against the baseline (time and peak memory, new / old)")
+    for name in report["inputs"]:
+        if name not in baseline["inputs"]:
+            continue
+        for stage in STAGES:
+            new = report["inputs"][name][stage]
+            old = baseline["inputs"][name].get(stage)
+            if old == None or old["seconds"] < NOISE_SECONDS:
+                continue
+            ratio = new["seconds"] / old["seconds"]
+            memoryRatio = new["peak_mb"] / old["peak_mb"] if old["peak_mb"] > 0 else 1.0
+            flag = ""
+            if ratio >= SLOWER:
+                flag = "  SLOWER"
+                regressions.append((name, stage))
+            print(SPACE + name.ljust(32) + stage.ljust(12) + ("%.2fx" % ratio).rjust(8)
+                  + ("%.2fx" % memoryRatio).rjust(8) + flag)
+    return regressions
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description = "Benchmark the ingest pipeline")
+    argumentParser.add_argument("--sizes", type = int, nargs = "+", default = DEFAULT_SIZES,
+                                help = "numbers of generated questions, up to 1000000")
+    argumentParser.add_argument("--save", help = "write the results to this JSON file")
+    argumentParser.add_argument("--compare", help = "compare against a JSON file written by --save")
+    arguments = argumentParser.parse_args()
+    report = run(arguments.sizes)
+    if arguments.save != None:
+        with open(arguments.save, 'w') as fileObject:
+            json.dump(report, fileObject, indent = 2)
+    if arguments.compare != None:
+        with open(arguments.compare, 'r') as fileObject:
+            regressions = compare(report, json.load(fileObject))
+        if regressions != []:
+            sys.exit(1)
@@ -0,0 +1,440 @@
+"""
+Inverted index over the text of a deck, answering boolean queries such as
+"schubert AND quintet NOT trout"
+
+Every word maps to its posting list: the sorted ids (Card.getId) of the
+cards with that word, as an array('I'). A query is parsed into a tree of
+AND, OR and NOT nodes; an AND starts from its shortest posting list and
+keeps the ids also in the others, galloping forward through each of them,
+so it costs about the length of the shortest list times the log of the
+others. Words next to each other are ANDed, and AND binds tighter than OR.
+
+save writes the index to disk with every posting list delta and varint
+encoded in blocks of SKIP_INTERVAL ids. Each list starts with a skip table
+holding the first id and byte offset of every block. A DiskIndex opened on
+that file answers the same queries while decoding only the blocks a query
+reaches into.
+"""
+from Constants import *
+from TermIndex import terms, card_terms
+from array import array
+from bisect import bisect_left, bisect_right
+import re
+
+TOKEN = re.compile(r"\(|\)|[^\s()]+")
+MAGIC = b"FCINDEX1\n"
+GALLOP_RATIO = 16  # ids per candidate above which filter_sorted gallops
+
+
+def encode_varint(value, out):
+    """
+    Appends [value], a non negative int, to the bytearray [out], 7 bits a byte
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, position):
+    """
+    Returns (the varint at byte [position] of [data], the position after it)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, position)
+        shift += 7
+
+
+def encode_postings(ids):
+    """
+    Returns (skip table, data) for the sorted posting list [ids]: data has
+    the deltas of every block of SKIP_INTERVAL ids after its first, and the
+    skip table the first id and offset into data of each block, as deltas
+    from the block before
+    """
+    skips = bytearray()
+    data = bytearray()
+    lastFirst = 0
+    lastOffset = 0
+    for start in range(0, len(ids), SKIP_INTERVAL):
+        first = ids[start]
+        encode_varint(first - lastFirst, skips)
+        encode_varint(len(data) - lastOffset, skips)
+        lastFirst = first
+        lastOffset = len(data)
+        previous = first
+        for cardId in ids[start + 1:start + SKIP_INTERVAL]:
+            encode_varint(cardId - previous, data)
+            previous = cardId
+    return (bytes(skips), bytes(data))
+
+
+def gallop(ids, target, low):
+    """
+    Returns the first position at or after [low] of the sorted [ids] holding
+    a value >= target, probing 1, 2, 4, ... places ahead before bisecting
+    """
+    size = len(ids)
+    step = 1
+    while low + step < size and ids[low + step] < target:
+        step *= 2
+    return bisect_left(ids, target, low + step // 2, min(low + step + 1, size))
+
+
+def filter_sorted(candidates, ids, keep):
+    """
+    Returns the array('I') of [candidates], sorted, that are in the sorted
+    [ids] if keep, or not in them otherwise
+    Galloping pays off when there are far fewer candidates than ids; for
+    lists of about the same length a set lookup per candidate is faster
+    """
+    if len(candidates) * GALLOP_RATIO > len(ids):
+        members = set(ids)
+        if keep:
+            return array('I', [cardId for cardId in candidates if cardId in members])
+        return array('I', [cardId for cardId in candidates if cardId not in members])
+    result = array('I')
+    position = 0
+    size = len(ids)
+    for cardId in candidates:
+        position = gallop(ids, cardId, position)
+        if (position < size and ids[position] == cardId) == keep:
+            result.append(cardId)
+        if position >= size and keep:
+            break
+    return result
+
+
+def union_sorted(lists):
+    merged = set()
+    for ids in lists:
+        merged.update(ids)
+    return array('I', sorted(merged))
+
+
+def parse_query(query):
+    """
+    Returns the tree of [query]: ("term", word), ("not", node), ("and",
+    [nodes]) or ("or", [nodes]), or None for a query with no words
+    Operators are not case sensitive; a NOT or an AND missing its operand
+    is left out
+    """
+    tokens = []
+    depth = 0
+    for token in TOKEN.findall(query):
+        # a ")" closing nothing would end the query early
+        if token == ")":
+            if depth == 0:
+                continue
+            depth -= 1
+        elif token == "(":
+            depth += 1
+        tokens.append(token)
+    node, position = parse_or(tokens, 0)
+    return node
+
+
+def parse_or(tokens, position):
+    branches = []
+    while position < len(tokens) and tokens[position] != ")":
+        node, position = parse_and(tokens, position)
+        if node != None:
+            branches.append(node)
+        if position < len(tokens) and tokens[position].lower() == "or":
+            position += 1
+    if branches == []:
+        return (None, position)
+    return (branches[0] if len(branches) == 1 else ("or", branches), position)
+
+
+def parse_and(tokens, position):
+    factors = []
+    while position < len(tokens) and tokens[position] != ")" and tokens[position].lower() != "or":
+        if tokens[position].lower() == "and":
+            position += 1
+            continue
+        node, position = parse_not(tokens, position)
+        if node != None:
+            factors.append(node)
+    if factors == []:
+        return (None, position)
+    return (factors[0] if len(factors) == 1 else ("and", factors), position)
+
+
+def parse_not(tokens, position):
+    token = tokens[position]
+    if token.lower() == "not":
+        if position + 1 >= len(tokens) or tokens[position + 1] == ")":
+            return (None, position + 1)
+        node, position = parse_not(tokens, position + 1)
+        return (None if node == None else ("not", node), position)
+    if token == "(":
+        node, position = parse_or(tokens, position + 1)
+        if position < len(tokens) and tokens[position] == ")":
+            position += 1
+        return (node, position)
+    # a token such as "Dvořák's" holds more than one word
+    words = sorted(terms(token))
+    position += 1
+    if words == []:
+        return (None, position)
+    if len(words) == 1:
+        return (("term", words[0]), position)
+    return (("and", [("term", word) for word in words]), position)
+
+
+def evaluate(index, node):
+    """
+    Returns the sorted array('I') of the ids of the cards of [index]
+    matching the query tree [node]
+    index has count(word), ids(word), filter(candidates, word, keep) and
+    universe(), as InvertedIndex and DiskIndex do
+    """
+    kind = node[0]
+    if kind == "term":
+        return index.ids(node[1])
+    if kind == "not":
+        return filter_sorted(index.universe(), evaluate(index, node[1]), False)
+    if kind == "or":
+        return union_sorted([evaluate(index, branch) for branch in node[1]])
+    words = [factor[1] for factor in node[1] if factor[0] == "term"]
+    excluded = [factor[1] for factor in node[1] if factor[0] == "not"]
+    others = [factor for factor in node[1] if factor[0] not in ("term", "not")]
+    # shortest lists first, so every step has as few candidates as possible
+    words.sort(key = index.count)
+    if words != [] and index.count(words[0]) == 0:
+        return array('I')
+    result = None
+    if words != []:
+        result = index.ids(words[0])
+        words = words[1:]
+    for other in others:
+        ids = evaluate(index, other)
+        result = ids if result == None else filter_sorted(result, ids, True)
+    if result == None:
+        result = index.universe()
+    for word in words:
+        result = index.filter(result, word, True)
+    for factor in excluded:
+        if factor[0] == "term":
+            result = index.filter(result, factor[1], False)
+        else:
+            result = filter_sorted(result, evaluate(index, factor), False)
+    return result
+
+
+class InvertedIndex:
+    """
+    postings maps every word to the sorted array('I') of the ids of the
+    cards with it; cards maps those ids back to the cards
+    deckVersion is (nextCardId, numCards) of the deck when it was built, so
+    Deck.queryCards can tell when to build it again
+    """
+
+    def __init__(self, deck = None):
+        self.postings = {}
+        self.cards = {}
+        self.allIds = array('I')
+        self.deckVersion = None
+        if deck != None:
+            self.build(deck)
+
+    def build(self, deck):
+        """
+        Indexes every card of [deck]: the main chain and the side chains,
+        leaving out entire question cards as TermIndex does, and cards with
+        no words, so not even NOT queries give them
+        """
+        self.cards = {}
+        lists = {}
+        for card in deck.allCards():
+            words = card_terms(card)
+            if words == set():
+                continue
+            cardId = card.getId()
+            self.cards[cardId] = card
+            for word in words:
+                ids = lists.get(word)
+                if ids == None:
+                    lists[word] = ids = array('I')
+                ids.append(cardId)
+        # ids are handed out in the order cards are created, which is not the
+        # order allCards goes through chains grouped by answer
+        self.postings = {word: array('I', sorted(ids)) for word, ids in lists.items()}
+        self.allIds = array('I', sorted(self.cards))
+        self.deckVersion = (deck.nextCardId, deck.numCards)
+
+    def count(self, word):
+        ids = self.postings.get(word)
+        return 0 if ids == None else len(ids)
+
+    def ids(self, word):
+        return self.postings.get(word, array('I'))
+
+    def filter(self, candidates, word, keep):
+        return filter_sorted(candidates, self.ids(word), keep)
+
+    def universe(self):
+        return self.allIds
+
+    def query(self, query):
+        """
+        Returns the list of cards matching [query], in id order
+        """
+        node = parse_query(query)
+        if node == None:
+            return []
+        return [self.cards[cardId] for cardId in evaluate(self, node)]
+
+    def save(self, path):
+        """
+        Writes the index to [path], see DiskIndex; all cards are kept under
+        the empty word, which no text has
+        """
+        out = bytearray(MAGIC)
+        encode_varint(len(self.postings) + 1, out)
+        for word in [""] + sorted(self.postings):
+            ids = self.allIds if word == "" else self.postings[word]
+            key = word.encode("utf-8")
+            skips, data = encode_postings(ids)
+            for value in (len(key), len(ids), len(skips), len(data)):
+                encode_varint(value, out)
+            out += key
+            out += skips
+            out += data
+        with open(path, 'wb') as fileObject:
+            fileObject.write(out)
+
+
+class DiskIndex:
+    """
+    An index written by InvertedIndex.save, answering queries from its
+    compressed posting lists
+    directory maps every word to (number of ids, offset of its skip table,
+    length of the skip table, length of its data); the skip tables are
+    decoded the first time a word is used, into skips [array of the first id
+    of every block] and offsets [array of where each block starts in data]
+    cards maps ids to the cards of the deck the index was written from
+    """
+
+    def __init__(self, path, deck):
+        with open(path, 'rb') as fileObject:
+            self.data = fileObject.read()
+        if not self.data.startswith(MAGIC):
+            raise ValueError(path + " is not an index file")
+        self.directory = {}
+        self.skipTables = {}
+        numWords, position = decode_varint(self.data, len(MAGIC))
+        for i in range(numWords):
+            keyLength, position = decode_varint(self.data, position)
+            count, position = decode_varint(self.data, position)
+            skipLength, position = decode_varint(self.data, position)
+            dataLength, position = decode_varint(self.data, position)
+            word = self.data[position:position + keyLength].decode("utf-8")
+            position += keyLength
+            self.directory[word] = (count, position, skipLength, dataLength)
+            position += skipLength + dataLength
+        self.cards = {}
+        for card in deck.allCards():
+            self.cards[card.getId()] = card
+
+    def count(self, word):
+        entry = self.directory.get(word)
+        return 0 if entry == None else entry[0]
+
+    def skipTable(self, word):
+        """
+        Returns (first ids, block offsets) of [word]'s blocks
+        """
+        table = self.skipTables.get(word)
+        if table == None:
+            count, start, skipLength, dataLength = self.directory[word]
+            skips = array('I')
+            offsets = array('I')
+            position = start
+            first = 0
+            offset = 0
+            while position < start + skipLength:
+                delta, position = decode_varint(self.data, position)
+                first += delta
+                delta, position = decode_varint(self.data, position)
+                offset += delta
+                skips.append(first)
+                offsets.append(offset)
+            table = self.skipTables[word] = (skips, offsets)
+        return table
+
+    def block(self, word, number):
+        """
+        Returns the ids of block [number] of [word]'s posting list
+        """
+        count, start, skipLength, dataLength = self.directory[word]
+        skips, offsets = self.skipTable(word)
+        dataStart = start + skipLength
+        end = offsets[number + 1] if number + 1 < len(offsets) else dataLength
+        cardId = skips[number]
+        ids = array('I', [cardId])
+        # decode_varint inlined, as this runs once per id
+        delta = 0
+        shift = 0
+        for byte in self.data[dataStart + offsets[number]:dataStart + end]:
+            delta |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                cardId += delta
+                ids.append(cardId)
+                delta = 0
+                shift = 0
+            else:
+                shift += 7
+        return ids
+
+    def ids(self, word):
+        if word not in self.directory:
+            return array('I')
+        ids = array('I')
+        for number in range(len(self.skipTable(word)[0])):
+            ids.extend(self.block(word, number))
+        return ids
+
+    def filter(self, candidates, word, keep):
+        """
+        filter_sorted against [word]'s posting list, decoding only the blocks
+        the skip table says could hold one of the candidates
+        """
+        if word not in self.directory:
+            return array('I') if keep else candidates
+        if len(candidates) * GALLOP_RATIO > self.count(word):
+            # most blocks would be decoded anyway
+            return filter_sorted(candidates, self.ids(word), keep)
+        skips = self.skipTable(word)[0]
+        result = array('I')
+        number = -1
+        ids = None
+        for cardId in candidates:
+            found = bisect_right(skips, cardId) - 1
+            if found < 0:
+                present = False
+            else:
+                if found != number:
+                    number = found
+                    ids = self.block(word, number)
+                position = bisect_left(ids, cardId)
+                present = position < len(ids) and ids[position] == cardId
+            if present == keep:
+                result.append(cardId)
+        return result
+
+    def universe(self):
+        return self.ids("")
+
+    def query(self, query):
+        node = parse_query(query)
+        if node == None:
+            return []
+        return [self.cards[cardId] for cardId in evaluate(self, node) if cardId in self.cards]
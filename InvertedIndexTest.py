@@ -0,0 +1,103 @@
+from InvertedIndex import *
+from Flashcard import *
+import os
+import tempfile
+
+
+def make_deck():
+    d = Deck()
+    d.text_to_cards([(["This composer wrote the Trout Quintet."], "Franz Schubert"),
+                     (["This composer wrote a String Quintet in C major."], "Franz Schubert"),
+                     (["This composer wrote the Unfinished Symphony."], "Franz Schubert"),
+                     (["This Hungarian rebel fought the Habsburgs."], "Imre Thokoly")])
+    return d
+
+
+def fronts(cards):
+    return [card.getFront() for card in cards]
+
+
+def test_encoding():
+    print("Testing posting list encoding")
+    out = bytearray()
+    for value in (0, 1, 127, 128, 300, 2 ** 32 - 1):
+        encode_varint(value, out)
+    position = 0
+    for value in (0, 1, 127, 128, 300, 2 ** 32 - 1):
+        decoded, position = decode_varint(out, position)
+        assert decoded == value
+    assert position == len(out)
+    ids = array('I', range(5, 5 + 3 * SKIP_INTERVAL * 7, 7))
+    skips, data = encode_postings(ids)
+    assert len(data) == len(ids) - 3
+    assert gallop(ids, 12, 0) == 1 and gallop(ids, 13, 0) == 2 and gallop(ids, 10 ** 6, 0) == len(ids)
+    assert filter_sorted(array('I', [5, 6, 12, 19, 10 ** 6]), ids, True) == array('I', [5, 12, 19])
+    assert filter_sorted(array('I', [5, 6, 12, 19, 10 ** 6]), ids, False) == array('I', [6, 10 ** 6])
+    print("pass posting list encoding")
+
+
+def test_parse():
+    print("Testing query parsing")
+    assert parse_query("schubert AND quintet NOT trout") == ("and", [("term", "schubert"), ("term", "quintet"), ("not", ("term", "trout"))])
+    assert parse_query("trout quintet or symphony") == ("or", [("and", [("term", "trout"), ("term", "quintet")]), ("term", "symphony")])
+    assert parse_query("(trout OR symphony) schubert") == ("and", [("or", [("term", "trout"), ("term", "symphony")]), ("term", "schubert")])
+    assert parse_query("Dvořák's") == ("and", [("term", "dvorak"), ("term", "s")])
+    assert parse_query("trout ) not") == ("term", "trout")
+    assert parse_query("and or ...") == None
+    print("pass query parsing")
+
+
+def test_query():
+    print("Testing inverted index queries")
+    d = make_deck()
+    index = InvertedIndex(d)
+    assert fronts(index.query("schubert AND quintet NOT trout")) == ["This composer wrote a String Quintet in C major."]
+    assert fronts(index.query("trout OR hungarian")) == ["This composer wrote the Trout Quintet.",
+                                                         "This Hungarian rebel fought the Habsburgs."]
+    assert fronts(index.query("the NOT (schubert OR habsburgs)")) == []
+    assert len(index.query("not schubert")) == 1
+    assert index.query("missing") == [] and index.query("") == []
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "deck.index")
+    index.save(path)
+    disk = DiskIndex(path, d)
+    for query in ("schubert AND quintet NOT trout", "trout OR hungarian", "not schubert", "composer wrote", "missing"):
+        assert disk.query(query) == index.query(query)
+    print("pass inverted index queries")
+
+
+def test_disk_blocks():
+    print("Testing saved posting list blocks")
+    d = Deck()
+    d.text_to_cards([(["Clue " + str(i) + (" even." if i % 2 == 0 else " odd.")], "Answer") for i in range(1000)])
+    index = InvertedIndex(d)
+    path = os.path.join(tempfile.mkdtemp(), "deck.index")
+    index.save(path)
+    disk = DiskIndex(path, d)
+    assert disk.count("even") == 500
+    assert disk.ids("even") == index.ids("even")
+    assert len(disk.skipTable("even")[0]) == (500 + SKIP_INTERVAL - 1) // SKIP_INTERVAL
+    assert disk.query("clue 998") == index.query("clue 998")
+    assert disk.query("odd not 3") == index.query("odd not 3")
+    print("pass saved posting list blocks")
+
+
+def test_deck_query():
+    print("Testing deck queries")
+    d = make_deck()
+    d.setInvertedIndex(InvertedIndex())
+    assert d.queryCards("schubert quintet")
+    assert d.getCurrentCard().getFront() == "This composer wrote the Trout Quintet."
+    assert not d.queryCards("beethoven")
+    # cards added after the index was built are found once it is rebuilt
+    d.text_to_cards([(["This composer wrote the Moonlight Sonata."], "Ludwig van Beethoven")])
+    assert d.queryCards("beethoven")
+    assert d.getCurrentCard().getFront() == "This composer wrote the Moonlight Sonata."
+    print("pass deck queries")
+
+
+test_encoding()
+test_parse()
+test_query()
+test_disk_blocks()
+test_deck_query()
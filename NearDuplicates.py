@@ -0,0 +1,230 @@
+"""
+Near duplicate question detection with MinHash signatures and LSH banding
+
+A question is reduced to the set of its word SHINGLE_WORDS-grams. Its
+signature is a one permutation MinHash: every shingle is hashed once, the
+hash picks one of MINHASH_SIZE bins and the bin keeps the smallest hash it
+is given; empty bins borrow from the next filled bin. The share of equal
+bins between two signatures estimates the Jaccard similarity of their
+shingle sets. Signatures are cut into LSH_BANDS bands and a question is
+only compared with questions that share a whole band with it, so adding a
+question does not compare it against the whole deck.
+
+Signatures live in one flat array('I'), MINHASH_SIZE entries per question,
+and the bands in one open addressing hash table of 64 bit entries, so the
+index costs a few hundred bytes per question.
+"""
+from Constants import *
+from AnswerNormalizer import normalize_answer
+from array import array
+import operator
+import re
+import zlib
+
+WORD = re.compile(r"\w+")
+MIX = 0x9E3779B1  # odd multiplier spreading crc32 values over all 32 bits
+DENSIFY_STEP = 0x61C88647
+BIN_BITS = MINHASH_SIZE.bit_length() - 1
+
+
+def shingles(text):
+    """
+    Returns the set of word SHINGLE_WORDS-grams of the lower cased text; a
+    text with fewer words is one shingle
+    """
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words != [] else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(text):
+    """
+    Returns the MinHash signature of text as an array('I') of MINHASH_SIZE
+    values, or None if text has no words
+    """
+    grams = shingles(text)
+    if not grams:
+        return None
+    empty = 0xFFFFFFFF
+    bins = [empty] * MINHASH_SIZE
+    for gram in grams:
+        value = (zlib.crc32(gram.encode("utf-8")) * MIX) & 0xFFFFFFFF
+        position = value >> (32 - BIN_BITS)
+        value &= (1 << (32 - BIN_BITS)) - 1
+        if value < bins[position]:
+            bins[position] = value
+    for position in range(MINHASH_SIZE):
+        if bins[position] == empty:
+            offset = 1
+            while bins[(position + offset) % MINHASH_SIZE] == empty:
+                offset += 1
+            # the high bit keeps borrowed values apart from real ones
+            borrowed = bins[(position + offset) % MINHASH_SIZE] & 0x7FFFFFFF
+            bins[position] = ((borrowed + offset * DENSIFY_STEP) & 0x7FFFFFFF) | 0x80000000
+    return array('I', bins)
+
+
+class BandTable:
+    """
+    Open addressing multimap from 32 bit band keys to question numbers
+    Each slot of slots [array of unsigned 64 bit int] is 0 if empty, else
+    key << 32 | (question + 1); the table is kept at most half full
+    """
+
+    def __init__(self):
+        self.slots = array('Q', [0]) * 1024
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, key, question):
+        if 2 * (self.count + 1) > len(self.slots):
+            self.grow()
+        self.insert(self.slots, (key << 32) | (question + 1))
+        self.count += 1
+
+    def insert(self, slots, entry):
+        mask = len(slots) - 1
+        position = (entry >> 32) & mask
+        while slots[position] != 0:
+            position = (position + 1) & mask
+        slots[position] = entry
+
+    def grow(self):
+        slots = array('Q', [0]) * (2 * len(self.slots))
+        for entry in self.slots:
+            if entry != 0:
+                self.insert(slots, entry)
+        self.slots = slots
+
+    def find(self, key):
+        """
+        Returns the list of questions added under key
+        """
+        slots = self.slots
+        mask = len(slots) - 1
+        position = key & mask
+        questions = []
+        while slots[position] != 0:
+            entry = slots[position]
+            if entry >> 32 == key:
+                questions.append((entry & 0xFFFFFFFF) - 1)
+            position = (position + 1) & mask
+        return questions
+
+
+def band_keys(bins):
+    """
+    Returns the LSH_BANDS keys of a signature, one crc32 per band that also
+    depends on the band's number
+    """
+    rows = MINHASH_SIZE // LSH_BANDS
+    return [zlib.crc32(bins[band * rows:(band + 1) * rows].tobytes(), band) for band in range(LSH_BANDS)]
+
+
+class DuplicateIndex:
+    """
+    LSH index over the signatures of the questions added to a deck
+    owners [list of Card/None] holds, for each question, the first card it
+    was added as, or None once it has been removed
+    reported [list of (str, Card)] holds each duplicate found: the first
+    clue of the new question and the first card of the question it repeats
+    With merge set, Deck.add_question drops duplicates instead of adding them
+    """
+
+    def __init__(self, merge = False, threshold = DUPLICATE_THRESHOLD):
+        self.merge = merge
+        self.threshold = threshold
+        self.signatures = array('I')
+        self.owners = []
+        self.positions = {}
+        self.bands = BandTable()
+        self.reported = []
+
+    def __len__(self):
+        return len(self.owners)
+
+    def similarity(self, bins, question):
+        start = question * MINHASH_SIZE
+        stored = self.signatures[start:start + MINHASH_SIZE]
+        return sum(map(operator.eq, bins, stored)) / MINHASH_SIZE
+
+    def find(self, text):
+        """
+        Returns (first card of the most similar earlier question, estimated
+        similarity) for the best match of text at or above threshold, or None
+        """
+        bins = signature(text)
+        if bins == None:
+            return None
+        return self.findSignature(bins)
+
+    def findSignature(self, bins, answer = None):
+        """
+        find for a signature; if answer, a normalized answer, is given only
+        questions with that answer are matched
+        """
+        candidates = set()
+        for key in band_keys(bins):
+            candidates.update(self.bands.find(key))
+        best = None
+        for question in candidates:
+            owner = self.owners[question]
+            if owner == None:
+                continue
+            score = self.similarity(bins, question)
+            if score < self.threshold or (best != None and score <= best[1]):
+                continue
+            if answer != None and normalize_answer(owner.getBack()) != answer:
+                continue
+            best = (owner, score)
+        return best
+
+    def add(self, text, card):
+        """
+        Indexes the question text, first added as card
+        """
+        self.addSignature(signature(text), card)
+
+    def addSignature(self, bins, card):
+        if bins == None:
+            return
+        question = len(self.owners)
+        self.owners.append(card)
+        self.positions[card] = question
+        self.signatures.extend(bins)
+        for key in band_keys(bins):
+            self.bands.add(key, question)
+
+    def check(self, questionsList, answer = None):
+        """
+        Looks up the question made of the clues in questionsList; a match is
+        added to reported
+        If answer is given, only a question with the same normalized answer
+        matches, so the parts of one bonus, which share its leadin, do not
+        Returns (first card of the question it duplicates or None, signature),
+        the signature to pass to addSignature once the question is added
+        """
+        bins = signature(" ".join(questionsList))
+        if bins == None:
+            return (None, None)
+        match = self.findSignature(bins, None if answer == None else normalize_answer(answer))
+        if match == None:
+            return (None, bins)
+        self.reported.append((questionsList[0], match[0]))
+        return (match[0], bins)
+
+    def removeCard(self, card):
+        """
+        Forgets the question first added as card, if any
+        """
+        question = self.positions.pop(card, None)
+        if question != None:
+            self.owners[question] = None
+
+    def report(self, limit = 10):
+        print("Found " + str(len(self.reported)) + " near duplicate questions.")
+        for clue, card in self.reported[:limit]:
+            print(SPACE + clue[:60] + " ... repeats ... " + card.getFront()[:60])
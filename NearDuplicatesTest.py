@@ -0,0 +1,93 @@
+from NearDuplicates import *
+from Flashcard import *
+
+MOONS = ("This planet's moon Titan has a thick nitrogen atmosphere and lakes of liquid methane. "
+         "Its rings were first seen by Galileo, who took them for ears. "
+         "For ten points, name this sixth planet from the sun.")
+MOONS_REWORDED = ("This planet's moon Titan has a thick nitrogen atmosphere and lakes of liquid methane. "
+                  "Its rings were first seen by Galileo, who took them for ears. "
+                  "For 10 points, name this sixth planet from the sun.")
+ELEMENT = ("This element's isotope with mass number fourteen is used to date organic remains. "
+           "Its allotropes include graphite and diamond. "
+           "For ten points, name this element with atomic number six.")
+
+
+def test_signature():
+    print("Testing minhash signatures")
+    assert shingles("One two three four") == {"one two three", "two three four"}
+    assert shingles("Hi there") == {"hi there"}
+    assert signature("...") == None
+    first = signature(MOONS)
+    assert len(first) == MINHASH_SIZE
+    assert signature(MOONS) == first
+    index = DuplicateIndex()
+    index.addSignature(first, "moons")
+    assert index.similarity(signature(MOONS), 0) == 1.0
+    assert index.similarity(signature(MOONS_REWORDED), 0) >= 0.6
+    assert index.similarity(signature(ELEMENT), 0) < 0.3
+    print("pass minhash signatures")
+
+
+def test_band_table():
+    print("Testing band table")
+    table = BandTable()
+    for question in range(3000):
+        table.add(question % 700, question)
+    assert len(table) == 3000
+    assert sorted(table.find(5)) == [question for question in range(3000) if question % 700 == 5]
+    assert table.find(701) == []
+    print("pass band table")
+
+
+def test_index():
+    print("Testing duplicate index")
+    index = DuplicateIndex(threshold = 0.6)
+    index.add(MOONS, "moons")
+    index.add(ELEMENT, "element")
+    assert index.find(MOONS) == ("moons", 1.0)
+    assert index.find(MOONS_REWORDED)[0] == "moons"
+    assert index.find("A completely different question about the French Revolution.") == None
+    index.removeCard("moons")
+    assert index.find(MOONS) == None
+    assert index.find(ELEMENT)[0] == "element"
+    assert len(index) == 2
+    # the best match with the same answer is found past a closer one with another answer
+    index = DuplicateIndex(threshold = 0.6)
+    jupiter = Card(front = MOONS, back = "Jupiter")
+    saturn = Card(front = MOONS_REWORDED, back = "Saturn")
+    index.add(MOONS, jupiter)
+    index.add(MOONS_REWORDED, saturn)
+    assert index.check([MOONS], "SATURN")[0] is saturn
+    assert index.check([MOONS], "Jupiter")[0] is jupiter
+    assert index.check([MOONS], "Neptune")[0] == None
+    assert index.check([MOONS])[0] is jupiter
+    print("pass duplicate index")
+
+
+def test_deck():
+    print("Testing duplicate checked decks")
+    d = Deck()
+    d.text_to_cards([([MOONS], "Saturn")])
+    d.setAsDuplicateChecked()
+    d.text_to_cards([([ELEMENT], "Carbon"), ([MOONS], "Saturn"), ([MOONS], "Jupiter")])
+    # the second MOONS is reported but kept; a different answer is not a duplicate
+    assert d.numMainCards == 4
+    assert len(d.duplicates.reported) == 1
+    assert d.duplicates.reported[0] == (MOONS, d.cardList[0])
+    d = Deck()
+    d.setAsDuplicateChecked(True)
+    first = d.add_question(([MOONS], "Saturn"))
+    assert d.add_question(([MOONS], "SATURN [or Saturnus]")) == None
+    assert d.numMainCards == 1 and d.numCards == 2
+    # once removed, a question no longer hides its duplicates
+    d.removeClues(*first)
+    assert d.numCards == 0
+    assert d.add_question(([MOONS], "Saturn")) != None
+    assert d.numMainCards == 1
+    print("pass duplicate checked decks")
+
+
+test_signature()
+test_band_table()
+test_index()
+test_deck()
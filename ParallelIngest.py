@@ -0,0 +1,102 @@
+"""
+Parallel import of large question files
+
+The file is cut into byte ranges that start and end on record boundaries
+(just after a '||', or at the numbered line opening a quizdb record), the
+ranges are parsed in a ProcessPoolExecutor and their tuples are handed back
+in file order, so the deck built from them is the same as a serial import.
+"""
+from Constants import *
+from TextReader import sourceFormat, source_records, parse_record, record_digest
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+import re
+
+BLOCK_BOUNDARY = re.compile(rb"\|\|")
+QUIZDB_BOUNDARY = re.compile(rb"\n\d+\.\r?\n")
+
+
+def next_boundary(fileObject, offset, fileFormat):
+    """
+    Returns the first record boundary at or after byte [offset] of the open
+    binary file, or the file size if there is none
+    """
+    pattern = BLOCK_BOUNDARY if fileFormat == BLOCK_FORMAT else QUIZDB_BOUNDARY
+    # start one byte back so a '||' or line break split by offset is still found
+    start = max(0, offset - 1)
+    while True:
+        fileObject.seek(start)
+        window = fileObject.read(BOUNDARY_WINDOW)
+        match = pattern.search(window)
+        if match != None:
+            if fileFormat == BLOCK_FORMAT:
+                return start + match.end()
+            return start + match.start() + 1
+        if len(window) < BOUNDARY_WINDOW:
+            return start + len(window)
+        # overlap windows so a boundary across two reads is not missed
+        start += BOUNDARY_WINDOW - 32
+
+
+def chunk_ranges(filename, fileFormat, chunkBytes = PARALLEL_CHUNK_BYTES):
+    """
+    Returns a list of (start, end) byte ranges covering [filename], each about
+    chunkBytes long and holding only whole records
+    """
+    size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, 'rb') as fileObject:
+        start = 0
+        while start < size:
+            end = size if start + chunkBytes >= size else next_boundary(fileObject, start + chunkBytes, fileFormat)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(task):
+    """
+    Worker: parses one byte range of a file
+    task is (filename, start, end, fileFormat, convertToSentences)
+    Returns a list with a (record_digest, list of question answer tuples)
+    pair for every record in the range
+    """
+    filename, start, end, fileFormat, convertToSentences = task
+    with open(filename, 'rb') as fileObject:
+        fileObject.seek(start)
+        data = fileObject.read(end - start)
+    # the same newline handling as opening the file in text mode
+    textObject = io.TextIOWrapper(io.BytesIO(data), encoding = 'utf-8')
+    return [(record_digest(record), parse_record(record, fileFormat, convertToSentences))
+            for record in source_records(textObject, fileFormat)]
+
+
+def parallel_records(filename, convertToSentences = True, workers = None, chunkBytes = PARALLEL_CHUNK_BYTES):
+    """
+    Returns a generator of the (record_digest, question answer tuples) pairs
+    of every record of [filename], in file order, parsed across [workers]
+    processes (one per core if None)
+    """
+    fileFormat = sourceFormat(filename)
+    tasks = [(filename, start, end, fileFormat, convertToSentences)
+             for start, end in chunk_ranges(filename, fileFormat, chunkBytes)]
+    executor = ProcessPoolExecutor(workers)
+    try:
+        # map hands results back in task order whatever order workers finish in
+        for records in executor.map(parse_range, tasks):
+            for record in records:
+                yield record
+    finally:
+        executor.shutdown()
+
+
+def parallel_stream(filename, convertToSentences = True, workers = None, chunkBytes = PARALLEL_CHUNK_BYTES):
+    """
+    Returns a generator of the question answer tuples of [filename], in file
+    order, see parallel_records
+    """
+    for digest, qaTuples in parallel_records(filename, convertToSentences, workers, chunkBytes):
+        for qaTuple in qaTuples:
+            yield qaTuple
+
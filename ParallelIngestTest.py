@@ -0,0 +1,52 @@
+from ParallelIngest import *
+from TextReader import *
+from Flashcard import *
+import os
+import tempfile
+
+QUIZDB_DUMP = "quizdb-20190909035459.txt"
+
+
+def write_blocks(n):
+    path = os.path.join(tempfile.mkdtemp(), "blocks.txt")
+    with open(path, 'w') as fileObject:
+        for i in range(n):
+            fileObject.write("QUESTION: Clue " + str(i) + " one. Clue " + str(i) + " two. ANSWER: Answer " + str(i) + " END ||\n")
+    return path
+
+
+def test_ranges():
+    print("Testing chunk ranges")
+    path = write_blocks(200)
+    ranges = chunk_ranges(path, BLOCK_FORMAT, 500)
+    assert len(ranges) > 5
+    assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(path)
+    with open(path, 'rb') as fileObject:
+        data = fileObject.read()
+    for (start, end), (nextStart, nextEnd) in zip(ranges, ranges[1:]):
+        assert end == nextStart
+        assert data[end - 2:end] == b"||"
+    ranges = chunk_ranges(QUIZDB_DUMP, QUIZDB_FORMAT, 100000)
+    with open(QUIZDB_DUMP, 'rb') as fileObject:
+        for start, end in ranges[1:]:
+            fileObject.seek(start)
+            assert fileObject.readline().strip().rstrip(b".").isdigit()
+    print("pass chunk ranges")
+
+
+def test_parallel_matches_serial():
+    print("Testing parallel ingest")
+    path = write_blocks(300)
+    assert list(parallel_stream(path, True, 2, 700)) == textReaderController(path, True)
+    assert list(parallel_stream(path, False, 2, 700)) == textReaderController(path, False)
+    serial = list(openQuestionFile(QUIZDB_DUMP, True))
+    assert list(parallel_stream(QUIZDB_DUMP, True, 2, 50000)) == serial
+    d = Deck()
+    d.text_to_cards(parallel_stream(path, True, 2, 700))
+    assert [card.getBack() for card in d.cardList] == ["Answer " + str(i) for i in range(300)]
+    print("pass parallel ingest")
+
+
+if __name__ == '__main__':
+    test_ranges()
+    test_parallel_matches_serial()
@@ -1,10 +1,13 @@
 from Flashcard import *
 from Constants import *
+from TermIndex import TermIndex
+from InvertedIndex import InvertedIndex
 # TODO: TARGETS: COMMANDS to implement
 #next, last, front, back, forward, rear
 # 
 
 def parser_driver(deck):
+    typedAnswers = False
     while(True):
         command = input("Please enter your command: \n").strip().lower()
         if command == "next":
@@ -23,11 +26,59 @@ def parser_driver(deck):
             deck.mainCard()
         elif command == "entire":
             deck.entireCard()
+        elif command == "due":
+            deck.getDueCard()
+        elif command == "random":
+            deck.getRandomCard()
+        elif command == "cluster":
+            deck.clusterCard()
+        elif command == SEARCH or command.startswith(SEARCH + SPACE):
+            query = command[len(SEARCH):].strip()
+            if query == "":
+                query = input("Please enter the words to search for: ").strip()
+            if deck.termIndex == None:
+                deck.setTermIndex(TermIndex())
+            deck.searchCard(query)
+        elif command == COMPLETE or command.startswith(COMPLETE + SPACE):
+            prefix = command[len(COMPLETE):].strip()
+            if prefix == "":
+                prefix = input("Please enter the start of a word: ").strip()
+            if deck.termIndex == None:
+                deck.setTermIndex(TermIndex())
+            deck.completeTerm(prefix)
+        elif command == QUERY or command.startswith(QUERY + SPACE):
+            query = command[len(QUERY):].strip()
+            if query == "":
+                query = input("Please enter a query, such as 'schubert and quintet not trout': ").strip()
+            if deck.invertedIndex == None:
+                deck.setInvertedIndex(InvertedIndex())
+            deck.queryCards(query)
+        elif command == "weighted":
+            if deck.getIsWeighted():
+                deck.setAsNotWeighted()
+                print("Random cards are now drawn uniformly.")
+            else:
+                deck.setAsWeighted()
+                print("Random cards are now drawn weighted by difficulty.")
         elif command == "rate":
             result = rate_Card()
             if result == QUIT:
                 return
             deck.rateCard(result)
+        elif command == TYPED:
+            typedAnswers = not typedAnswers
+            if typedAnswers:
+                print("Type your answers to be graded automatically when you enter 'correct'.")
+            else:
+                print("You will mark your answers correct or incorrect yourself.")
+        elif command == "correct" and typedAnswers:
+            result = type_Answer()
+            if result == QUIT:
+                return
+            if result == SKIP:
+                deck.correctCard(SKIP)
+            else:
+                deck.gradeAnswer(result)
         elif command == "correct":
             result = correct_Card()
             if result == QUIT:
@@ -41,6 +92,8 @@ def parser_driver(deck):
             deck.getRate()
         elif command == 'statistics':
             deck.getCorrect()
+        elif command == "accuracy":
+            deck.getDeckCorrect()
         elif command == "reset":
             deck.resetCard()
         elif command == "help":
@@ -117,6 +170,15 @@ def correct_Card():
         print(INVALID_COMMAND)
 
 
+def type_Answer():
+    result = input("Please type your answer, or 'skip' to skip, or 'quit' to quit: ").strip()
+    if result.lower() == QUIT:
+        return QUIT
+    if result.lower() == SKIP:
+        return SKIP
+    return result
+
+
 def rate_Card():
     while(True):
         result = input(
@@ -0,0 +1,232 @@
+"""
+Streaming reader for quizdb text exports
+
+A record of the export looks like
+
+    12.
+    ID: 118557  | Difficulty: Hard College | Category: Literature | Subcategory: None
+    Tournament: 2018 ACF Nationals | Round: 3 | Number: 9
+    TOSSUP: ...
+    ANSWER: ...
+
+and bonuses have a BONUS: leadin followed by [10] parts, each with its own
+ANSWER: line. The file is read one line at a time and every record is
+yielded as soon as it ends, as (questions list, answer, QuestionMetadata)
+tuples that Deck.text_to_cards takes directly. A tossup is one tuple; a
+bonus gives one tuple per part, whose first clue is the leadin.
+"""
+from Constants import *
+from SentenceSplitter import split_sentences
+import html
+import re
+import sys
+
+RECORD_NUMBER = re.compile(r"\d+\.$")
+PART = re.compile(r"\[\d+\]")
+# editor tags such as <American History> closing some answer lines, at
+# times cut short or followed by a stray word
+ANSWER_TAG = re.compile(r"\s*<[A-Z][^<>]*(>[^<>]*)?$")
+POWER = re.compile(r"\s*" + re.escape(POWER_MARK) + r"\s*")
+
+
+class QuestionMetadata:
+    """
+    Where a chain came from in a quizdb export
+    kind is TOSSUP or BONUS; part is the bonus part, counting from 1 (0 for tossups)
+    """
+    __slots__ = ("questionId", "kind", "part", "difficulty", "category", "subcategory",
+                 "tournament", "round", "number")
+
+    def __init__(self, kind, fields, part = 0):
+        self.kind = kind
+        self.part = part
+        self.questionId = fields.get("ID")
+        self.difficulty = fields.get("Difficulty")
+        self.category = fields.get("Category")
+        self.subcategory = fields.get("Subcategory")
+        self.tournament = fields.get("Tournament")
+        self.round = fields.get("Round")
+        self.number = fields.get("Number")
+
+    def __eq__(self, other):
+        if not isinstance(other, QuestionMetadata):
+            return False
+        return all(getattr(self, slot) == getattr(other, slot) for slot in QuestionMetadata.__slots__)
+
+    def __repr__(self):
+        return "QuestionMetadata(" + str(self.kind) + " " + str(self.questionId) + " part " + str(self.part) + ")"
+
+
+def skipped_line(line):
+    """
+    True for blank lines and the export's count and section header lines
+    """
+    return line == "" or line.startswith("## ") or (line.startswith("Number ") and " found: " in line)
+
+
+def header_fields(line, fields):
+    """
+    Adds the 'Key: value' pairs of a '|' separated header line to [fields]
+    Empty values, 'None' and '[missing]' are stored as None
+    """
+    for item in line.split("|"):
+        key, colon, value = item.partition(":")
+        value = value.strip()
+        # tournament, category and difficulty names repeat across the export
+        fields[key.strip()] = sys.intern(value) if value not in ("", "None", "[missing]") else None
+
+
+def clean_text(text):
+    text = html.unescape(text) if "&" in text else text
+    if POWER_MARK in text:
+        text = POWER.sub(" ", text)
+    return text.strip()
+
+
+def clean_answer(text):
+    return ANSWER_TAG.sub("", clean_text(text))
+
+
+def clue_list(text, convertToSentences):
+    if not convertToSentences:
+        return [text]
+    sentences = split_sentences(text)
+    return sentences if sentences != [] else [text]
+
+
+class QuizdbParser:
+    """
+    Line by line state machine over a quizdb export, see read_quizdb
+    """
+
+    def __init__(self, convertToSentences):
+        self.convertToSentences = convertToSentences
+        self.startRecord()
+
+    def startRecord(self):
+        self.fields = {}
+        self.kind = None
+        self.body = None  # tossup text or bonus leadin
+        self.parts = []  # [text, answer] of each bonus part
+        self.answer = None
+
+    def feed(self, line):
+        """
+        Takes the next line of the export
+        Returns the list of tuples finished by this line
+        """
+        line = line.strip()
+        if skipped_line(line):
+            return []
+        if RECORD_NUMBER.match(line):
+            finished = self.finish()
+            self.startRecord()
+            return finished
+        if line.startswith(QUIZDB_ID) or line.startswith(QUIZDB_TOURNAMENT):
+            header_fields(line, self.fields)
+        elif line.startswith(QUIZDB_TOSSUP):
+            self.kind = TOSSUP
+            self.body = clean_text(line[len(QUIZDB_TOSSUP):])
+        elif line.startswith(QUIZDB_BONUS):
+            self.kind = BONUS
+            self.body = clean_text(line[len(QUIZDB_BONUS):])
+        elif PART.match(line):
+            self.parts.append([clean_text(line[PART.match(line).end():]), None])
+        elif line.startswith(ANSWER):
+            answer = clean_answer(line[len(ANSWER):])
+            if self.kind == BONUS and self.parts != []:
+                self.parts[-1][1] = answer
+            else:
+                self.answer = answer
+        elif self.parts != []:
+            # wrapped lines continue whatever came before them
+            self.parts[-1][0] += " " + clean_text(line)
+        elif self.body != None:
+            self.body += " " + clean_text(line)
+        return []
+
+    def finish(self):
+        """
+        Returns the tuples of the record read so far; records with no text or
+        no answer are dropped
+        """
+        if self.kind == TOSSUP:
+            if self.body and self.answer:
+                metadata = QuestionMetadata(TOSSUP, self.fields)
+                return [(clue_list(self.body, self.convertToSentences), self.answer, metadata)]
+        elif self.kind == BONUS:
+            finished = []
+            for part in range(len(self.parts)):
+                text, answer = self.parts[part]
+                if text and answer:
+                    metadata = QuestionMetadata(BONUS, self.fields, part + 1)
+                    questions = clue_list(text, self.convertToSentences)
+                    if self.body:
+                        questions = [self.body] + questions
+                    finished.append((questions, answer, metadata))
+            return finished
+        return []
+
+
+def read_quizdb(file_object, convert_to_sentences = True):
+    """
+    Generator of (questions list, answer, QuestionMetadata) tuples over an
+    open quizdb export, holding one record in memory at a time
+    """
+    parser = QuizdbParser(convert_to_sentences)
+    for line in file_object:
+        for qaTuple in parser.feed(line):
+            yield qaTuple
+    for qaTuple in parser.finish():
+        yield qaTuple
+
+
+def read_quizdb_records(file_object):
+    """
+    Generator of the raw text of every record of an open quizdb export: its
+    stripped lines after the record number, joined by newlines
+    The number is left out so a record keeps the same text when the records
+    before it change
+    """
+    lines = []
+    for line in file_object:
+        line = line.strip()
+        if skipped_line(line):
+            continue
+        if RECORD_NUMBER.match(line):
+            if lines != []:
+                yield "\n".join(lines)
+            lines = []
+        else:
+            lines.append(line)
+    if lines != []:
+        yield "\n".join(lines)
+
+
+def parse_quizdb_record(record, convert_to_sentences = True):
+    """
+    Returns the tuples read_quizdb gives for one record from read_quizdb_records
+    """
+    parser = QuizdbParser(convert_to_sentences)
+    for line in record.split("\n"):
+        parser.feed(line)
+    return parser.finish()
+
+
+def is_quizdb(file_object):
+    """
+    True if the open text file starts like a quizdb export; the file is
+    rewound afterwards
+    """
+    firstLine = file_object.readline()
+    file_object.seek(0)
+    return firstLine.startswith(QUIZDB_HEADER)
+
+
+def quizdbReaderStream(filename, convertToSentences = True):
+    """
+    read_quizdb over the file at [filename], closing it once it is read
+    """
+    with open(filename, 'r', encoding = 'utf-8') as fileObject:
+        for qaTuple in read_quizdb(fileObject, convertToSentences):
+            yield qaTuple
@@ -0,0 +1,99 @@
+from QuizdbReader import *
+from Flashcard import *
+import io
+
+SAMPLE = """Number tossups found: 1 (questions limited)
+Number bonuses found: 1 (questions limited)
+
+## TOSSUPS
+
+1.
+ID: 123908  | Difficulty:  | Category: Geography | Subcategory: None
+Tournament: Unknown | Round: [missing] | Number: 9
+TOSSUP: Two snarling leopards appear on this city's coat of arms. The River Don and the River Dee lie on either side of, for 15 points, what (*) "Granite City" &amp; port in Scotland?
+ANSWER: Aberdeen &lt;European Geography&gt;
+
+
+## BONUSES
+
+1.
+ID: 221  | Difficulty: Regular College | Category: Geography | Subcategory: None
+Tournament: 2019 Terrapin | Round: 3 | Number: 14
+BONUS: The Straits of Malacca separate this island from the Malay Peninsula. For 10 points each:
+[10] Name this third Indonesian island. Its capital was Palembang.
+ANSWER: Sumatra
+[10] This special region forms the northern tip of Sumatra.
+ANSWER: Aceh
+"""
+
+
+def test_records():
+    print("Testing quizdb records")
+    tuples = list(read_quizdb(io.StringIO(SAMPLE)))
+    assert len(tuples) == 3
+    questions, answer, metadata = tuples[0]
+    assert questions == ["Two snarling leopards appear on this city's coat of arms.",
+                         'The River Don and the River Dee lie on either side of, for 15 points, what "Granite City" & port in Scotland?']
+    assert answer == "Aberdeen"
+    assert metadata.kind == TOSSUP and metadata.questionId == "123908"
+    assert metadata.category == "Geography" and metadata.subcategory == None
+    assert metadata.difficulty == None and metadata.round == None and metadata.number == "9"
+    questions, answer, metadata = tuples[1]
+    assert questions == ["The Straits of Malacca separate this island from the Malay Peninsula. For 10 points each:",
+                         "Name this third Indonesian island.", "Its capital was Palembang."]
+    assert answer == "Sumatra"
+    assert metadata.kind == BONUS and metadata.part == 1 and metadata.tournament == "2019 Terrapin"
+    assert tuples[2][1] == "Aceh" and tuples[2][2].part == 2
+    unsplit = list(read_quizdb(io.StringIO(SAMPLE), False))
+    assert len(unsplit[0][0]) == 1 and len(unsplit[1][0]) == 2
+    assert is_quizdb(io.StringIO(SAMPLE))
+    assert not is_quizdb(io.StringIO("QUESTION: q. ANSWER: a END ||"))
+    print("pass quizdb records")
+
+
+def test_deck_metadata():
+    print("Testing quizdb deck")
+    d = Deck()
+    d.text_to_cards(read_quizdb(io.StringIO(SAMPLE)))
+    assert d.numMainCards == 3
+    headers = [card.getChainHeader() for card in d.cardList]
+    assert [header.metadata.questionId for header in headers] == ["123908", "221", "221"]
+    assert d.cardList[0].getForward().getChainHeader().metadata.kind == TOSSUP
+    print("pass quizdb deck")
+
+
+def test_grouped_metadata():
+    print("Testing quizdb metadata grouped by answer")
+    d = Deck()
+    d.setAsAnswerGrouped()
+    tuples = read_quizdb(io.StringIO(SAMPLE))
+    again = list(read_quizdb(io.StringIO(SAMPLE.replace("ID: 123908", "ID: 555").replace("Unknown", "2020 ACF"))))
+    d.text_to_cards(tuples)
+    added = d.add_question(again[0])
+    header = added[0]
+    assert header.metadata.questionId == "123908"
+    assert header.questionMetadata(header.mainCard).questionId == "123908"
+    assert header.questionMetadata(added[1]).questionId == "555"
+    assert header.questionMetadata(added[2]).tournament == "2020 ACF"
+    assert header.questionMetadata(header.entireCard).questionId == "123908"
+    # removing the first question leaves the appended one's metadata on the chain
+    d.removeClues(header, header.mainCard, added[1].getRear())
+    assert header.metadata.questionId == "555" and header.segments == None
+    assert header.questionMetadata(header.mainCard).tournament == "2020 ACF"
+    print("pass quizdb metadata grouped by answer")
+
+
+def test_bundled_dump():
+    print("Testing bundled quizdb dump")
+    tuples = list(quizdbReaderStream("quizdb-20190909035459.txt"))
+    tossups = [qaTuple for qaTuple in tuples if qaTuple[2].kind == TOSSUP]
+    assert len(tossups) == 750
+    assert len(tuples) - len(tossups) == 2217
+    assert all(qaTuple[0] != [] and qaTuple[1] != "" for qaTuple in tuples)
+    print("pass bundled quizdb dump")
+
+
+test_records()
+test_deck_metadata()
+test_grouped_metadata()
+test_bundled_dump()
@@ -2,17 +2,16 @@ from Constants import *
 import Flashcard
 
 
-# TODO: Parse tools to clean out the document and insert it into
-# the tree
-
-
 class RedBlackTree:
     """
     Color Invariant: Color: Black is True, Red is False
     Class Invariant: The top node of every red back tree is always black,
     moreover, there are never two white nodes in a row. Finally, the number
     of black nodes from the root to ANY leaf is always the same
+    Nodes compare equal by shape and values, see __eq__, so the tree code
+    tells nodes apart with is
     """
+    __slots__ = ("nodeValue", "parentTree", "leftTree", "rightTree", "nodeColor", "cardList")
 
     def getValue(self):
         """
@@ -121,9 +120,10 @@ class RedBlackTree:
         Requires: [self] is non Null, so it is actually a [RedBlackTree] object
         Raises: AssertionError if [left] is not a [RedBlackTree] or if left is not None
         """
-        assert (isinstance(left, RedBlackTree)) or left == None
+        assert (isinstance(left, RedBlackTree)) or left is None
         self.leftTree = left
-        left.setParent(self)
+        if left is not None:
+            left.setParent(self)
 
     def addRightTree(self, right):
         """
@@ -132,112 +132,287 @@ class RedBlackTree:
         Requires: [self] is non Null, so it is actually a [RedBlackTree] object
         Raises: AssertionError if [right] is not a [RedBlackTree] or if right is not None
         """
-        assert isinstance(right, RedBlackTree) or right == None
-        right.setParent(self)
+        assert isinstance(right, RedBlackTree) or right is None
+        if right is not None:
+            right.setParent(self)
         self.rightTree = right
 
+    def getRoot(self):
+        """
+        Returns the root of the tree [self] is in
+        Rotations can move the root, so callers holding the old root use this
+        after an insert to find the new one
+        """
+        tree = self
+        while tree.parentTree is not None:
+            tree = tree.parentTree
+        return tree
+
+    def find(self, value):
+        """
+        Returns the node of the tree rooted at [self] holding [value], or None,
+        in O(log n)
+        """
+        tree = self
+        while tree is not None:
+            topValue = tree.nodeValue
+            if value < topValue:
+                tree = tree.leftTree
+            elif topValue < value:
+                tree = tree.rightTree
+            else:
+                return tree
+        return None
+
     def binaryInsert(self, value):
         """
         Inserts value into [self], the red black tree, following the binary tree
-        invariants, recursively
+        invariants, iteratively
         Returns: Tagged Union of where the value comes from: if added to right subtree, then tag (RIGHT, newRB)
-            else tag (LEFT, newRB)
+            else tag (LEFT, newRB); if value is already in the tree, (None, the node holding it)
         Requires: self is non empty [redblacktree]
         """
-        topValue = self.nodeValue
-        if value < topValue:
-            leftTree = self.getLeftTree()
-            if leftTree == None:
-                newRB = RedBlackTree(value)
-                self.addLeftTree(newRB)
-                return (LEFT, newRB)
+        tree = self
+        while True:
+            topValue = tree.nodeValue
+            if value < topValue:
+                if tree.leftTree is None:
+                    newRB = RedBlackTree(value)
+                    tree.addLeftTree(newRB)
+                    return (LEFT, newRB)
+                tree = tree.leftTree
+            elif topValue < value:
+                if tree.rightTree is None:
+                    newRB = RedBlackTree(value)
+                    tree.addRightTree(newRB)
+                    return (RIGHT, newRB)
+                tree = tree.rightTree
             else:
-                leftTree.binaryInsert(value)
-        else:
-            rightTree = self.getRightTree()
-            if rightTree == None:
-                newRB = RedBlackTree(value)
-                self.addRightTree(newRB)
-                return (RIGHT, newRB)
-            else:
-                rightTree.binaryInsert(value)
-                
-        
-        
+                return (None, tree)
+
     def redBlackInsert(self, value):
         """
         Inserts an tree into the given redblack tree [self] with node value [value]
         Invariants: keeps all the invariants of the RedBlackTree [self] true
-        Requires: self must be  non None RedbLackTree
-        """
-        node = self.binaryInsert(value)
-        direction = node[0]
-        tree = node[1]
-        # check if the node follows a black node
-            # change color to white
-            # finished
-        parent = tree.getParent()
-        if parent.getColor():
-            tree.setColor(False)
-            return
-        # check if the node follows on the left
-            # left rotate
-        if direction == LEFT:  # add on left, then need to rotate
-            tree.setColor(False)
-            parent.setColor(True)
-            parent.left_rotate()
-        
-        #if the node is top
-            #if top is white, then change it to black
-        # move current node pointer up one node
-        new_parent = tree.getParent()
-        # if no parent
-        if new_parent == None:
-            #if so, then change its color to black and return
-            tree.setColor(True)
-            return
-    
-        balance(tree, new_parent)
-    
-        
-    def balance(tree, child):
-        # is this the top node, e.g. no parent:
-        parent = tree.getParent()
-        
-        # if the current parent up is black, then stop
-        if parent.getColor():
-            return
-        parent_direction = parent.getDirection()
-        child_direction = LEFT if tree.getLeftTree() == child else RIGHT
-        # perform the appropriate rotation upwards
-            # by pattern match against four pattenrs
-        if parent_direction == RIGHT and child_direction == RIGHT:
-            child.setColor(False)
-            parent.right_rotate()
-        if parent_direction == RIGHT and child_direction == LEFT:
-            tree.right_rotate()
-            tree.getLeftTree().setColor(False)
-            parent.left_rotate()
-        if parent_direction == LEFT and child_direction == RIGHT:
-            tree.left_rotate()
-            tree.getRightTree().setColor(False)
-            parent.right_rotate()
-        if parent_direction == LEFT and child_direction == LEFT:
-            child.setColor(False)
-            parent.left_rotate()
-        
-        # move current node pointer up one node
-        new_parent = tree.getParent()
-        # if no parent
-        if new_parent == None:
-            #if so, then change its color to black and return
-            tree.setColor(True)
-            return
-        # recurse again upwards with balance
-        balance(new_parent, tree)
+        Requires: self must be  non None RedbLackTree, the root of its tree
+        Returns: the node holding value, new or already there
+        The root may move; see getRoot
+        """
+        direction, tree = self.binaryInsert(value)
+        if direction is None:
+            return tree
+        # new nodes start out white, and only a white parent breaks the invariants
+        tree.setColor(False)
+        tree.balance()
+        return tree
+
+    def balance(self):
+        """
+        Restores the color invariants after [self], a white node, was inserted,
+        recoloring and rotating upwards from it iteratively
+        """
+        child = self
+        parent = child.parentTree
+        while parent is not None and not parent.nodeColor:
+            # a white parent is never the root, so there is a grandparent
+            grandparent = parent.parentTree
+            if parent is grandparent.leftTree:
+                uncle = grandparent.rightTree
+                if uncle is not None and not uncle.nodeColor:
+                    parent.setColor(True)
+                    uncle.setColor(True)
+                    grandparent.setColor(False)
+                    child = grandparent
+                    parent = child.parentTree
+                    continue
+                if child is parent.rightTree:
+                    # bring child up so the white nodes line up on the left
+                    parent.right_rotate()
+                    child, parent = parent, child
+                parent.setColor(True)
+                grandparent.setColor(False)
+                grandparent.left_rotate()
+            else:
+                uncle = grandparent.leftTree
+                if uncle is not None and not uncle.nodeColor:
+                    parent.setColor(True)
+                    uncle.setColor(True)
+                    grandparent.setColor(False)
+                    child = grandparent
+                    parent = child.parentTree
+                    continue
+                if child is parent.leftTree:
+                    parent.left_rotate()
+                    child, parent = parent, child
+                parent.setColor(True)
+                grandparent.setColor(False)
+                grandparent.right_rotate()
+            break
+        child.getRoot().setColor(True)
 
     def redBlackDelete(self, value):
-        pass
+        """
+        Removes [value] from the tree rooted at [self], keeping all the
+        invariants of the RedBlackTree true
+        A node with two subtrees takes the value and cardList of the next
+        node in order, and that node is removed instead
+        Returns: the root of the tree afterwards, None if it is now empty; the
+            tree is unchanged if it does not hold value
+        """
+        tree = self.find(value)
+        if tree is None:
+            return self
+        if tree.leftTree is not None and tree.rightTree is not None:
+            successor = tree.rightTree
+            while successor.leftTree is not None:
+                successor = successor.leftTree
+            tree.nodeValue = successor.nodeValue
+            tree.cardList = successor.cardList
+            tree = successor
+        child = tree.leftTree if tree.leftTree is not None else tree.rightTree
+        parent = tree.parentTree
+        if parent is None:
+            if child is None:
+                return None
+            child.setParent(None)
+            child.setColor(True)
+            return child
+        if parent.leftTree is tree:
+            parent.addLeftTree(child)
+        else:
+            parent.addRightTree(child)
+        tree.setParent(None)
+        if tree.nodeColor:
+            # a black node is gone from every path through child
+            if child is not None and not child.nodeColor:
+                child.setColor(True)
+            else:
+                parent.deleteBalance(child)
+        return parent.getRoot()
+
+    def deleteBalance(self, child):
+        """
+        Restores the black counts below [self] after one black node was removed
+        from the paths through its subtree [child], which may be None, moving
+        the missing black node upwards iteratively
+        """
+        parent = self
+        while parent is not None:
+            if child is parent.leftTree:
+                sibling = parent.rightTree
+                if not sibling.nodeColor:
+                    sibling.setColor(True)
+                    parent.setColor(False)
+                    parent.right_rotate()
+                    sibling = parent.rightTree
+                if is_black(sibling.leftTree) and is_black(sibling.rightTree):
+                    sibling.setColor(False)
+                    if not parent.nodeColor:
+                        parent.setColor(True)
+                        return
+                    child = parent
+                    parent = child.parentTree
+                    continue
+                if is_black(sibling.rightTree):
+                    sibling.leftTree.setColor(True)
+                    sibling.setColor(False)
+                    sibling.left_rotate()
+                    sibling = parent.rightTree
+                sibling.setColor(parent.nodeColor)
+                parent.setColor(True)
+                sibling.rightTree.setColor(True)
+                parent.right_rotate()
+            else:
+                sibling = parent.leftTree
+                if not sibling.nodeColor:
+                    sibling.setColor(True)
+                    parent.setColor(False)
+                    parent.left_rotate()
+                    sibling = parent.leftTree
+                if is_black(sibling.leftTree) and is_black(sibling.rightTree):
+                    sibling.setColor(False)
+                    if not parent.nodeColor:
+                        parent.setColor(True)
+                        return
+                    child = parent
+                    parent = child.parentTree
+                    continue
+                if is_black(sibling.leftTree):
+                    sibling.rightTree.setColor(True)
+                    sibling.setColor(False)
+                    sibling.right_rotate()
+                    sibling = parent.leftTree
+                sibling.setColor(parent.nodeColor)
+                parent.setColor(True)
+                sibling.leftTree.setColor(True)
+                parent.left_rotate()
+            return
+        # the missing black node reached the root, so every path lost one
+        child.setColor(True)
+
+    def lowerBound(self, value):
+        """
+        Returns the node of the tree rooted at [self] holding the smallest
+        value >= [value], or None if there is none, in O(log n)
+        """
+        tree = self
+        found = None
+        while tree is not None:
+            if tree.nodeValue < value:
+                tree = tree.rightTree
+            else:
+                found = tree
+                tree = tree.leftTree
+        return found
+
+    def successor(self):
+        """
+        Returns the node holding the next value after [self]'s in order, or
+        None if [self] holds the largest, following parent links
+        """
+        tree = self.rightTree
+        if tree is not None:
+            while tree.leftTree is not None:
+                tree = tree.leftTree
+            return tree
+        tree = self
+        parent = tree.parentTree
+        while parent is not None and parent.rightTree is tree:
+            tree = parent
+            parent = tree.parentTree
+        return parent
+
+    def inOrder(self):
+        """
+        Generator over the nodes of the tree rooted at [self] in order of
+        their values
+        """
+        return self.range(None, None)
+
+    def __iter__(self):
+        """
+        Iterates over the values of the tree rooted at [self] in order
+        """
+        for tree in self.inOrder():
+            yield tree.nodeValue
+
+    def range(self, low, high):
+        """
+        Generator over the nodes of the tree rooted at [self] with low <=
+        value < high, in order; None for low or high leaves that end open
+        Nodes are found one at a time as the generator is advanced, so
+        stopping early never walks the rest of the range
+        The tree must not change while the generator is in use
+        """
+        if low is None:
+            tree = self
+            while tree.leftTree is not None:
+                tree = tree.leftTree
+        else:
+            tree = self.lowerBound(low)
+        while tree is not None and (high is None or tree.nodeValue < high):
+            yield tree
+            tree = tree.successor()
 
     def determineChild(self, child):
         """
@@ -246,7 +421,7 @@ class RedBlackTree:
         Requires: Self and Child are not None, and self is a parent node of child
         """
         assert isinstance(child, RedBlackTree)
-        return self.getRightTree() == child
+        return self.getRightTree() is child
 
     def left_rotate(self):
         """
@@ -302,21 +477,106 @@ class RedBlackTree:
 
 
     def __eq__(self, tree):
-        rightTree1 = self.getRightTree()
-        leftTree1 = self.getLeftTree()
-        rightTree2 = tree.getRightTree()
-        leftTree2 = tree.getLeftTree()
-        # leaf and not leaf - false
-        if (rightTree1 == None and rightTree2 == None and leftTree1 == None and leftTree2 == None):
-            return True
-        if (rightTree1 == None and rightTree2 != None):
-            return False
-        if (rightTree1 != None and rightTree2 == None):
-            return False
-        if (leftTree1 == None and leftTree2 != None):
-            return False
-        if (leftTree1 != None and leftTree2 == None):
-            return False
-        # not leaf and leaf - false
-        return rightTree1.__eq__(rightTree2) and leftTree1.__eq__(leftTree2)
-        
\ No newline at end of file
+        """
+        True if [tree] has the same shape as [self] and the same values in the
+        same places, compared iteratively
+        """
+        pairs = [(self, tree)]
+        while pairs != []:
+            first, second = pairs.pop()
+            if first is None or second is None:
+                if first is not second:
+                    return False
+                continue
+            if not isinstance(second, RedBlackTree) or first.nodeValue != second.nodeValue:
+                return False
+            pairs.append((first.leftTree, second.leftTree))
+            pairs.append((first.rightTree, second.rightTree))
+        return True
+
+
+def is_black(tree):
+    """
+    True if [tree] is black; empty trees count as black
+    """
+    return tree is None or tree.nodeColor
+
+
+def link_nodes(nodes):
+    """
+    Links [nodes], a list of RedBlackTrees sorted by value with no value
+    twice, into one perfectly balanced tree and returns its root, or None if
+    [nodes] is empty, in O(n)
+    Each node is the middle of its range, so every empty subtree is on one of
+    the last two levels; the last level is white and every other one black,
+    which gives every path the same number of black nodes with no white node
+    under a white one
+    The nodes keep their values and cardLists; their old links are dropped
+    """
+    if nodes == []:
+        return None
+    deepest = len(nodes).bit_length() - 1
+    root = None
+    # (low, high, parent, True for a right subtree, depth) of ranges to link
+    ranges = [(0, len(nodes), None, False, 0)]
+    while ranges != []:
+        low, high, parent, right, depth = ranges.pop()
+        middle = (low + high) // 2
+        tree = nodes[middle]
+        tree.parentTree = parent
+        tree.leftTree = None
+        tree.rightTree = None
+        tree.nodeColor = depth != deepest or depth == 0
+        if parent is None:
+            root = tree
+        elif right:
+            parent.rightTree = tree
+        else:
+            parent.leftTree = tree
+        if low < middle:
+            ranges.append((low, middle, tree, False, depth + 1))
+        if middle + 1 < high:
+            ranges.append((middle + 1, high, tree, True, depth + 1))
+    return root
+
+
+def build_tree(pairs):
+    """
+    Returns the root of a new tree holding the (value, cardList) [pairs],
+    sorted by value with no value twice, or None if there are none, in O(n)
+    rather than the O(n log n) of inserting them one at a time
+    """
+    nodes = []
+    for value, cardList in pairs:
+        tree = RedBlackTree(value)
+        tree.cardList = cardList
+        nodes.append(tree)
+    return link_nodes(nodes)
+
+
+def merge_tree(root, pairs):
+    """
+    Merges the (value, cardList) [pairs], sorted by value with no value twice,
+    into the tree rooted at [root], which may be None, relinking every node
+    in O(n + k) for k pairs
+    Returns: (the new root, the number of nodes in the tree)
+    A value already in the tree gets the pair's cards appended to its
+    cardList; the other pairs become new nodes
+    """
+    nodes = []
+    existing = iter([]) if root is None else root.inOrder()
+    tree = next(existing, None)
+    for value, cardList in pairs:
+        while tree is not None and tree.nodeValue < value:
+            nodes.append(tree)
+            tree = next(existing, None)
+        if tree is not None and not (value < tree.nodeValue):
+            tree.cardList.extend(cardList)
+            continue
+        newTree = RedBlackTree(value)
+        newTree.cardList = cardList
+        nodes.append(newTree)
+    while tree is not None:
+        nodes.append(tree)
+        tree = next(existing, None)
+    return (link_nodes(nodes), len(nodes))
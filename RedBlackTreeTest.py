@@ -1,4 +1,5 @@
 from RedBlackTree import *
+import random
 
 
 def simple_setup():
@@ -180,12 +181,149 @@ def test_right_rotate():
     print("pass right rotate")
 
 
+def check_invariants(root):
+    """
+    Asserts the ordering, parent links and color invariants of the tree at
+    [root] and returns its values in order
+    """
+    assert root.getColor() and root.getParent() is None
+    values = []
+    blackHeights = set()
+    stack = [(root, 1)]
+    while stack != []:
+        tree, blackNodes = stack.pop()
+        if not tree.getColor():
+            assert is_black(tree.getLeftTree()) and is_black(tree.getRightTree())
+        for child in (tree.getLeftTree(), tree.getRightTree()):
+            if child is None:
+                blackHeights.add(blackNodes)
+            else:
+                assert child.getParent() is tree
+                stack.append((child, blackNodes + (1 if child.getColor() else 0)))
+    assert len(blackHeights) == 1
+    tree = root
+    stack = []
+    while stack != [] or tree is not None:
+        while tree is not None:
+            stack.append(tree)
+            tree = tree.getLeftTree()
+        tree = stack.pop()
+        values.append(tree.getValue())
+        tree = tree.getRightTree()
+    assert values == sorted(values)
+    return values
+
+
 def test_add():
     print("testing add")
+    rb = RedBlackTree(0)
+    for value in range(1, 1000):
+        node = rb.redBlackInsert(value)
+        assert node.getValue() == value
+        rb = rb.getRoot()
+    assert check_invariants(rb) == list(range(1000))
+    # inserting a value already there gives back its node
+    node = rb.find(500)
+    node.getCardList().append("card")
+    assert rb.redBlackInsert(500) is node
+    assert rb.getRoot() is rb
+    assert rb.find(1000) is None
+    generator = random.Random(1)
+    values = generator.sample(range(100000), 5000)
+    rb = RedBlackTree(values[0])
+    for value in values[1:]:
+        rb.redBlackInsert(value)
+        rb = rb.getRoot()
+    assert check_invariants(rb) == sorted(values)
     print("pass add")
 
 
+def test_delete():
+    print("testing delete")
+    generator = random.Random(2)
+    values = generator.sample(range(1000), 300)
+    rb = RedBlackTree(values[0])
+    rb.getCardList().append(values[0])
+    for value in values[1:]:
+        rb.redBlackInsert(value).getCardList().append(value)
+        rb = rb.getRoot()
+    remaining = set(values)
+    for value in generator.sample(range(1000), 600):
+        rb = rb.redBlackDelete(value)
+        remaining.discard(value)
+        if rb is None:
+            assert remaining == set()
+            break
+        assert check_invariants(rb) == sorted(remaining)
+    # every value kept the card list it was inserted with
+    for value in remaining:
+        assert rb.find(value).getCardList() == [value]
+    rb = RedBlackTree(1)
+    assert rb.redBlackDelete(2) is rb
+    assert rb.redBlackDelete(1) is None
+    print("pass delete")
+
+
+def test_range():
+    print("testing range")
+    values = random.Random(3).sample(range(0, 2000, 2), 500)
+    rb = RedBlackTree(values[0])
+    for value in values[1:]:
+        rb.redBlackInsert(value)
+        rb = rb.getRoot()
+    assert list(rb) == sorted(values)
+    assert [tree.getValue() for tree in rb.inOrder()] == sorted(values)
+    assert [tree.getValue() for tree in rb.range(101, 121)] == [value for value in sorted(values) if 101 <= value < 121]
+    assert [tree.getValue() for tree in rb.range(None, 50)] == [value for value in sorted(values) if value < 50]
+    assert [tree.getValue() for tree in rb.range(1900, None)] == [value for value in sorted(values) if value >= 1900]
+    assert list(rb.range(5000, None)) == []
+    assert rb.lowerBound(5000) is None
+    # the scan goes one node at a time
+    scan = rb.range(None, None)
+    assert next(scan).getValue() == min(values)
+    assert next(scan).getValue() == sorted(values)[1]
+    words = RedBlackTree("schubert")
+    for word in ["schumann", "school", "schubertiade", "scriabin", "sch"]:
+        words.redBlackInsert(word)
+        words = words.getRoot()
+    assert [tree.getValue() for tree in words.range("schub", "schuc")] == ["schubert", "schubertiade"]
+    print("pass range")
+
+
+def test_build():
+    print("testing build and merge")
+    assert build_tree([]) is None
+    for size in list(range(1, 40)) + [1000, 1023, 1024]:
+        rb = build_tree([(value, [value]) for value in range(size)])
+        assert check_invariants(rb) == list(range(size))
+        assert rb.find(size - 1).getCardList() == [size - 1]
+        # inserts and deletes keep working on a built tree
+        rb.redBlackInsert(size)
+        rb = rb.getRoot()
+        rb = rb.redBlackDelete(0)
+        assert check_invariants(rb) == list(range(1, size + 1))
+    rb, size = merge_tree(None, [(2, ["b"]), (5, ["e"])])
+    assert size == 2 and check_invariants(rb) == [2, 5]
+    generator = random.Random(5)
+    old = generator.sample(range(0, 3000), 700)
+    rb = RedBlackTree(old[0])
+    for value in old[1:]:
+        rb.redBlackInsert(value)
+        rb = rb.getRoot()
+    for value in old:
+        rb.find(value).cardList.append("old")
+    new = sorted(generator.sample(range(0, 3000), 300))
+    rb, size = merge_tree(rb, [(value, ["new"]) for value in new])
+    assert check_invariants(rb) == sorted(set(old) | set(new)) and size == len(set(old) | set(new))
+    assert rb.find(new[0]).getCardList() == (["old", "new"] if new[0] in old else ["new"])
+    assert rb.find(old[0]).getCardList()[0] == "old"
+    print("pass build and merge")
+
+
 test_tree()
 test_left_rotate()
 test_right_rotate()
 test_add()
+test_delete()
+test_range()
+test_build()
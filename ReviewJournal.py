@@ -0,0 +1,193 @@
+from Constants import *
+import os
+import pickle
+import time
+
+
+class ReplayClock:
+    """
+    Stands in for the scheduler's clock while the journal is replayed, so
+    replayed reviews are scheduled from the time they originally happened
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def encode_event(seq, cardId, timestamp, kind, value):
+    return (str(seq) + "\t" + str(cardId) + "\t" + repr(timestamp) + "\t"
+            + kind + "\t" + str(value) + "\n").encode("utf-8")
+
+
+def decode_event(line):
+    """
+    Returns (seq, cardId, timestamp, kind, value) for one journal line
+    Raises: ValueError if the line is torn or malformed
+    """
+    fields = line.decode("utf-8").rstrip("\n").split("\t")
+    if len(fields) != 5:
+        raise ValueError("malformed journal line")
+    seq, cardId, timestamp, kind, value = fields
+    if kind == JOURNAL_RATE:
+        value = int(value)
+    elif kind == JOURNAL_CORRECT:
+        if value == "True":
+            value = True
+        elif value == "False":
+            value = False
+        elif value != SKIP:
+            raise ValueError("malformed journal answer")
+    elif kind == JOURNAL_RESET:
+        value = None
+    else:
+        raise ValueError("unknown journal event")
+    return (int(seq), int(cardId), float(timestamp), kind, value)
+
+
+class ReviewJournal:
+    """
+    Persists a Deck as a snapshot plus an append-only log of review events
+
+    Every rating, correctness answer and reset is appended to the log as one
+    line: sequence number, card id, timestamp, kind and value. Lines are
+    buffered and written with one fsync per batch of [batchSize] events, so a
+    crash loses at most the last batch. Every [snapshotInterval] events the
+    whole deck is pickled into a new snapshot, written to a temporary file
+    and renamed over the old one, and the log is started over.
+    On startup, load() reads the latest snapshot and replays only the log
+    events that came after it.
+    """
+
+    def __init__(self, snapshotPath=SNAPSHOT_FILE, logPath=JOURNAL_FILE,
+                 batchSize=JOURNAL_BATCH_SIZE, snapshotInterval=SNAPSHOT_INTERVAL, clock=time.time):
+        self.snapshotPath = snapshotPath
+        self.logPath = logPath
+        self.batchSize = batchSize
+        self.snapshotInterval = snapshotInterval
+        self.clock = clock
+        self.deck = None
+        self.logFile = None
+        self.pending = []
+        self.seq = 0
+        self.snapshotSeq = 0
+
+    def load(self):
+        """
+        Returns the Deck from the latest snapshot with the log tail replayed,
+        or None if there is no snapshot yet
+        """
+        if not os.path.exists(self.snapshotPath):
+            return None
+        fileObject = open(self.snapshotPath, 'rb')
+        self.snapshotSeq, deck = pickle.load(fileObject)
+        fileObject.close()
+        self.seq = self.snapshotSeq
+        self.replay(deck)
+        return deck
+
+    def replay(self, deck):
+        """
+        Applies every logged event newer than the snapshot to [deck]
+        A torn line at the end of the log, left by a crash mid-write, is
+        dropped along with anything after it
+        """
+        if not os.path.exists(self.logPath):
+            return
+        cardsById = {card.getId(): card for card in deck.allCards()}
+        scheduler = deck.scheduler
+        if scheduler != None:
+            realClock = scheduler.clock
+            scheduler.clock = ReplayClock()
+        fileObject = open(self.logPath, 'rb')
+        validLength = 0
+        for line in fileObject:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                seq, cardId, timestamp, kind, value = decode_event(line)
+            except ValueError:
+                break
+            validLength += len(line)
+            if seq <= self.seq:
+                continue
+            self.seq = seq
+            card = cardsById.get(cardId)
+            if card == None:
+                continue
+            if scheduler != None:
+                scheduler.clock.now = timestamp
+            deck.setCurrentCard(card)
+            if kind == JOURNAL_RATE:
+                deck.rateCard(value)
+            elif kind == JOURNAL_CORRECT:
+                deck.correctCard(value)
+            else:
+                deck.resetCard()
+        fileObject.close()
+        if scheduler != None:
+            scheduler.clock = realClock
+        if validLength < os.path.getsize(self.logPath):
+            fileObject = open(self.logPath, 'r+b')
+            fileObject.truncate(validLength)
+            fileObject.close()
+
+    def attach(self, deck):
+        """
+        Starts journaling every review made through [deck]
+        """
+        self.deck = deck
+        deck.journal = self
+        if self.logFile == None:
+            self.logFile = open(self.logPath, 'ab')
+
+    def record(self, card, kind, value=None):
+        """
+        Queues one review event for [card]; the batch is written out once it
+        holds [batchSize] events
+        """
+        self.seq += 1
+        self.pending.append(encode_event(self.seq, card.getId(), self.clock(), kind, value))
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+        if self.seq - self.snapshotSeq >= self.snapshotInterval:
+            self.writeSnapshot(self.deck)
+
+    def flush(self):
+        if self.pending == [] or self.logFile == None:
+            return
+        self.logFile.write(b"".join(self.pending))
+        self.logFile.flush()
+        os.fsync(self.logFile.fileno())
+        self.pending = []
+
+    def writeSnapshot(self, deck):
+        """
+        Pickles [deck] as the new snapshot and starts an empty log
+        The old snapshot is only replaced once the new one is safely on disk,
+        and events the new snapshot already covers are skipped on replay, so
+        a crash at any point leaves a loadable journal
+        """
+        self.flush()
+        temporaryPath = self.snapshotPath + ".tmp"
+        fileObject = open(temporaryPath, 'wb')
+        pickle.dump((self.seq, deck), fileObject)
+        fileObject.flush()
+        os.fsync(fileObject.fileno())
+        fileObject.close()
+        os.replace(temporaryPath, self.snapshotPath)
+        self.snapshotSeq = self.seq
+        if self.logFile != None:
+            self.logFile.close()
+        self.logFile = open(self.logPath, 'wb')
+
+    def close(self):
+        self.flush()
+        if self.logFile != None:
+            self.logFile.close()
+            self.logFile = None
+        if self.deck != None:
+            self.deck.journal = None
+            self.deck = None
@@ -0,0 +1,101 @@
+from ReviewJournal import *
+from Flashcard import *
+import os
+import tempfile
+
+
+def make_journal(directory, batchSize=4, snapshotInterval=10):
+    return ReviewJournal(os.path.join(directory, "deck.snapshot"), os.path.join(directory, "deck.journal"),
+                         batchSize, snapshotInterval)
+
+
+def make_deck(n):
+    d = Deck()
+    d.text_to_cards([([str(i) + " first clue.", str(i) + " second clue."], str(i)) for i in range(n)])
+    return d
+
+
+def test_event_lines():
+    print("Testing journal lines")
+    line = encode_event(7, 12, 1.5, JOURNAL_CORRECT, SKIP)
+    assert decode_event(line) == (7, 12, 1.5, JOURNAL_CORRECT, SKIP)
+    line = encode_event(8, 3, 2.25, JOURNAL_RATE, 4)
+    assert decode_event(line) == (8, 3, 2.25, JOURNAL_RATE, 4)
+    line = encode_event(9, 3, 2.25, JOURNAL_RESET, None)
+    assert decode_event(line) == (9, 3, 2.25, JOURNAL_RESET, None)
+    try:
+        decode_event(b"10\t3\t2.2")
+        assert False
+    except ValueError:
+        pass
+    print("pass journal lines")
+
+
+def test_large_deck_pickle():
+    print("Testing large deck pickling")
+    d = make_deck(5000)
+    d.setAsScheduled()
+    copy = pickle.loads(pickle.dumps(d))
+    assert copy.numCards == d.numCards
+    assert [card.getFront() for card in copy.allCards()] == [card.getFront() for card in d.allCards()]
+    assert copy.cardList[-1].getNext() is copy.cardList[0]
+    assert copy.cardList[3].getForward().getRear() is copy.cardList[3]
+    assert copy.scheduler.getState(copy.cardList[0]).card is copy.cardList[0]
+    print("pass large deck pickling")
+
+
+def test_replay():
+    print("Testing snapshot and replay")
+    directory = tempfile.mkdtemp()
+    journal = make_journal(directory)
+    d = make_deck(20)
+    journal.writeSnapshot(d)
+    journal.attach(d)
+    for i in range(13):
+        d.setCurrentCard(d.cardList[i])
+        d.correctCard(i % 2 == 0)
+        d.rateCard(i % 6)
+    d.setCurrentCard(d.cardList[0])
+    d.resetCard()
+    journal.close()
+
+    loaded = make_journal(directory).load()
+    assert loaded.cardList[0].getRate() == []
+    for i in range(1, 13):
+        assert loaded.cardList[i].getRate() == [i % 6]
+        assert list(loaded.cardList[i].statistics) == [i % 2 == 0]
+    assert loaded.statistics.getTotal() == 12
+    print("pass snapshot and replay")
+
+
+def test_crash():
+    print("Testing crash recovery")
+    directory = tempfile.mkdtemp()
+    journal = make_journal(directory, batchSize=4, snapshotInterval=1000)
+    d = make_deck(10)
+    journal.writeSnapshot(d)
+    journal.attach(d)
+    for i in range(10):
+        d.setCurrentCard(d.cardList[i])
+        d.rateCard(3)
+    # crash: the last two events never left the buffer, and half a line was written
+    journal.logFile.write(b"11\t4\t1.0\tra")
+    journal.logFile.close()
+
+    recovered = make_journal(directory)
+    loaded = recovered.load()
+    assert [card.getRate() for card in loaded.cardList] == [[3]] * 8 + [[]] * 2
+    assert recovered.seq == 8
+    recovered.attach(loaded)
+    loaded.setCurrentCard(loaded.cardList[9])
+    loaded.rateCard(1)
+    recovered.close()
+    again = make_journal(directory).load()
+    assert again.cardList[9].getRate() == [1]
+    print("pass crash recovery")
+
+
+test_event_lines()
+test_large_deck_pickle()
+test_replay()
+test_crash()
@@ -0,0 +1,165 @@
+from Constants import *
+import random
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over float weights at positions 0 .. n - 1
+    Point updates, prefix sums, appends and finding the position that holds
+    a given cumulative weight are all O(log n)
+    """
+
+    def __init__(self):
+        self.tree = [0.0]  # 1-based, tree[0] is unused
+        self.weights = []
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def getWeight(self, index):
+        return self.weights[index]
+
+    def prefixSum(self, count):
+        """
+        Returns the sum of the weights at positions 0 .. count - 1
+        """
+        result = 0.0
+        while count > 0:
+            result += self.tree[count]
+            count -= count & -count
+        return result
+
+    def append(self, weight):
+        """
+        Adds a new position at the end holding [weight], returns its index
+        """
+        assert weight >= 0
+        i = len(self.weights) + 1
+        # tree[i] covers positions (i - lowbit(i), i]
+        self.tree.append(weight + self.prefixSum(i - 1) - self.prefixSum(i - (i & -i)))
+        self.weights.append(weight)
+        self.total += weight
+        return i - 1
+
+    def update(self, index, weight):
+        """
+        Sets the weight at [index] to [weight]
+        """
+        assert weight >= 0
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        self.total += delta
+        i = index + 1
+        size = len(self.tree)
+        while i < size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """
+        Returns the first index whose cumulative weight exceeds [target]
+        Requires: 0 <= target < total
+        """
+        position = 0
+        remaining = target
+        step = 1
+        while step * 2 < len(self.tree):
+            step *= 2
+        while step > 0:
+            nextPosition = position + step
+            if nextPosition < len(self.tree) and self.tree[nextPosition] <= remaining:
+                position = nextPosition
+                remaining -= self.tree[position]
+            step //= 2
+        return min(position, len(self.weights) - 1)
+
+
+def card_weight(card):
+    """
+    Sampling weight of [card] from its recent difficulty ratings and how often
+    it was missed recently, so hard cards come up more often
+    Unseen cards sit in the middle of the range
+    """
+    ratings = card.getRate()[-WEIGHT_WINDOW:]
+    if ratings == []:
+        difficulty = DEFAULT_DIFFICULTY
+    else:
+        difficulty = sum(ratings) / len(ratings)
+    correct = 0
+    incorrect = 0
+    if card.statistics != None:
+        for answer in card.statistics.recent(WEIGHT_WINDOW):
+            if answer == True:
+                correct += 1
+            elif answer == False:
+                incorrect += 1
+    if correct + incorrect == 0:
+        missRate = DEFAULT_MISS_RATE
+    else:
+        missRate = incorrect / (correct + incorrect)
+    return 1 + difficulty + MISS_WEIGHT * missRate
+
+
+class WeightedSampler:
+    """
+    Draws main chain cards with probability proportional to card_weight
+    Each card owns a slot in a FenwickTree; slots of removed cards are set to
+    weight 0 and reused, so adding, removing, reweighting and drawing a card
+    are all O(log n)
+    [rng] is a random.Random to draw with, or None for the random module,
+    which is looked up at draw time so a deck with a sampler can be pickled
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng
+        self.fenwick = FenwickTree()
+        self.slots = {}
+        self.cards = []
+        self.freeSlots = []
+
+    def __len__(self):
+        return len(self.slots)
+
+    def addCard(self, card, weight=None):
+        if card in self.slots:
+            return
+        if weight == None:
+            weight = card_weight(card)
+        if self.freeSlots != []:
+            slot = self.freeSlots.pop()
+            self.cards[slot] = card
+            self.fenwick.update(slot, weight)
+        else:
+            slot = self.fenwick.append(weight)
+            self.cards.append(card)
+        self.slots[card] = slot
+
+    def removeCard(self, card):
+        slot = self.slots.pop(card, None)
+        if slot == None:
+            return
+        self.fenwick.update(slot, 0.0)
+        self.cards[slot] = None
+        self.freeSlots.append(slot)
+
+    def updateCard(self, card, weight):
+        slot = self.slots.get(card)
+        if slot != None:
+            self.fenwick.update(slot, weight)
+
+    def getWeight(self, card):
+        return self.fenwick.getWeight(self.slots[card])
+
+    def sample(self):
+        """
+        Returns a card drawn by weight, or None if there are no cards
+        """
+        if self.slots == {}:
+            return None
+        rng = random if self.rng == None else self.rng
+        while True:
+            slot = self.fenwick.find(rng.random() * self.fenwick.total)
+            # rounding can land on an empty slot at the very end, draw again
+            if self.cards[slot] != None:
+                return self.cards[slot]
@@ -0,0 +1,109 @@
+from Sampler import *
+from Flashcard import *
+from ReviewJournal import ReviewJournal
+import os
+import pickle
+import random
+import tempfile
+
+
+def test_fenwick():
+    print("Testing fenwick tree")
+    fenwick = FenwickTree()
+    weights = [3.0, 0.0, 1.0, 2.0, 5.0, 1.0, 4.0]
+    for weight in weights:
+        fenwick.append(weight)
+    for i in range(len(weights) + 1):
+        assert fenwick.prefixSum(i) == sum(weights[:i])
+    assert fenwick.find(0) == 0
+    assert fenwick.find(2.9) == 0
+    assert fenwick.find(3.0) == 2
+    assert fenwick.find(4.5) == 3
+    assert fenwick.find(15.9) == 6
+    fenwick.update(4, 0.5)
+    weights[4] = 0.5
+    for i in range(len(weights) + 1):
+        assert fenwick.prefixSum(i) == sum(weights[:i])
+    assert fenwick.total == sum(weights)
+    print("pass fenwick tree")
+
+
+def test_weight():
+    print("Testing card weight")
+    easy = Card()
+    hard = Card()
+    unseen = Card()
+    for i in range(5):
+        easy.setRate(0)
+        easy.addStatistic(True)
+        hard.setRate(5)
+        hard.addStatistic(False)
+    assert card_weight(easy) < card_weight(unseen) < card_weight(hard)
+    print("pass card weight")
+
+
+def test_sampler():
+    print("Testing weighted sampling")
+    sampler = WeightedSampler(random.Random(3110))
+    cards = [Card() for i in range(4)]
+    for card in cards:
+        sampler.addCard(card, 1.0)
+    sampler.updateCard(cards[0], 7.0)
+    sampler.removeCard(cards[3])
+    counts = {card: 0 for card in cards}
+    for i in range(10000):
+        counts[sampler.sample()] += 1
+    assert counts[cards[3]] == 0
+    assert 6500 < counts[cards[0]] < 8000
+    sampler.addCard(cards[3], 1.0)
+    assert len(sampler.cards) == 4
+    print("pass weighted sampling")
+
+
+def test_deck_weighted():
+    print("Testing weighted deck")
+    d = Deck()
+    d.text_to_cards([([str(i) + " clue."], str(i)) for i in range(20)])
+    d.setAsWeighted()
+    d.sampler.rng = random.Random(1)
+    hard = d.cardList[5]
+    d.setCurrentCard(hard.getRear())
+    for i in range(5):
+        d.rateCard(5)
+        d.correctCard(False)
+    assert d.sampler.getWeight(hard) == card_weight(hard.getRear())
+    draws = [d.getRandomCard() for i in range(2000)]
+    assert all(card.getMain() for card in draws)
+    assert draws.count(hard) > 2000 / 20
+    d.removeMainCard(hard)
+    assert hard not in [d.getRandomCard() for i in range(500)]
+    print("pass weighted deck")
+
+
+def test_weighted_snapshot():
+    print("Testing weighted deck snapshots")
+    d = Deck()
+    d.text_to_cards([([str(i) + " clue."], str(i)) for i in range(20)])
+    d.setAsWeighted()
+    copy = pickle.loads(pickle.dumps(d))
+    assert copy.getRandomCard().getMain()
+    directory = tempfile.mkdtemp()
+    journal = ReviewJournal(os.path.join(directory, "deck.snapshot"), os.path.join(directory, "deck.journal"), 4, 5)
+    journal.writeSnapshot(d)
+    journal.attach(d)
+    # the sixth event writes a snapshot
+    for i in range(6):
+        d.setCurrentCard(d.getRandomCard())
+        d.rateCard(2)
+    journal.close()
+    loaded = ReviewJournal(os.path.join(directory, "deck.snapshot"), os.path.join(directory, "deck.journal")).load()
+    assert sum(len(card.getRate()) for card in loaded.cardList) == 6
+    assert loaded.getRandomCard().getMain()
+    print("pass weighted deck snapshots")
+
+
+test_fenwick()
+test_weight()
+test_sampler()
+test_deck_weighted()
+test_weighted_snapshot()
@@ -0,0 +1,260 @@
+from Constants import *
+import time
+
+
+class ReviewState:
+    """
+    The SM-2 scheduling state of a single main chain card
+    Attributes:
+    card [Card] is the main chain card being scheduled
+    easiness [float] is the SM-2 easiness factor, never below MIN_EASINESS
+    repetitions [int] is the number of passing reviews in a row
+    interval [int] is the current review interval in days
+    due [float] is the clock time at which the card is next due
+    order [int] breaks ties between cards due at the same time, so new cards
+        come up in the order they were added to the deck
+    heapIndex [int] is the position of this state in the DueQueue heap, or -1
+        if it is not queued
+    backup [tuple]/[None] is (easiness, repetitions, interval) from before the
+        review that is still open, see Scheduler.reviewCard
+    answer [bool]/[None] and rating [int]/[None] are the signals given so far
+        for the open review
+    """
+    __slots__ = ("card", "easiness", "repetitions", "interval", "due", "order",
+                 "heapIndex", "backup", "answer", "rating")
+
+    def __init__(self, card, due, order):
+        self.card = card
+        self.easiness = DEFAULT_EASINESS
+        self.repetitions = 0
+        self.interval = 0
+        self.due = due
+        self.order = order
+        self.heapIndex = -1
+        self.backup = None
+        self.answer = None
+        self.rating = None
+
+    def __lt__(self, other):
+        return (self.due, self.order) < (other.due, other.order)
+
+
+class DueQueue:
+    """
+    Indexed binary min heap of ReviewStates ordered by due time
+    Every state remembers its own heap position, so changing the due time
+    of any queued card is O(log n) and nothing is ever scanned linearly
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def peek(self):
+        """
+        Returns the state due soonest, or None if the queue is empty
+        """
+        if self.heap == []:
+            return None
+        return self.heap[0]
+
+    def push(self, state):
+        assert state.heapIndex == -1
+        state.heapIndex = len(self.heap)
+        self.heap.append(state)
+        self.siftUp(state.heapIndex)
+
+    def remove(self, state):
+        """
+        Removes [state] from anywhere in the queue in O(log n)
+        """
+        index = state.heapIndex
+        assert 0 <= index < len(self.heap) and self.heap[index] is state
+        last = self.heap.pop()
+        state.heapIndex = -1
+        if last is state:
+            return
+        self.heap[index] = last
+        last.heapIndex = index
+        self.update(last)
+
+    def update(self, state):
+        """
+        Restores the heap invariant after the due time of [state] changed
+        """
+        index = state.heapIndex
+        if index > 0 and state < self.heap[(index - 1) // 2]:
+            self.siftUp(index)
+        else:
+            self.siftDown(index)
+
+    def siftUp(self, index):
+        heap = self.heap
+        state = heap[index]
+        while index > 0:
+            parentIndex = (index - 1) // 2
+            parent = heap[parentIndex]
+            if not state < parent:
+                break
+            heap[index] = parent
+            parent.heapIndex = index
+            index = parentIndex
+        heap[index] = state
+        state.heapIndex = index
+
+    def siftDown(self, index):
+        heap = self.heap
+        size = len(heap)
+        state = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < state:
+                break
+            heap[index] = heap[child]
+            heap[index].heapIndex = index
+            index = child
+        heap[index] = state
+        state.heapIndex = index
+
+
+def review_quality(answer, rating):
+    """
+    Converts the signals given for one look at a card into an SM-2 quality
+    answer [bool]/[None] is whether the card was answered correctly
+    rating [int]/[None] is the difficulty rating in RATE_SCALE_LIST, where
+        0 is easiest and 5 is hardest
+    Returns: [int] quality between 0 and 5, where PASSING_QUALITY and above
+        is a successful recall
+    """
+    if rating == None:
+        return CORRECT_QUALITY if answer else INCORRECT_QUALITY
+    quality = 5 - rating
+    if answer == True:
+        return max(PASSING_QUALITY, quality)
+    if answer == False:
+        return min(PASSING_QUALITY - 1, quality)
+    return quality
+
+
+class Scheduler:
+    """
+    SM-2 spaced repetition scheduler over the main chain cards of a Deck
+    Each scheduled card has a ReviewState kept in a DueQueue, so finding the
+    next due card and rescheduling a reviewed card are both O(log n)
+
+    A card's correctness answer and difficulty rating for the same look are
+    combined into one review: until another card is served or reviewed, a
+    second signal for the same card replaces the first instead of counting
+    as an extra repetition.
+    clock is a function returning the current time in seconds
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.queue = DueQueue()
+        self.states = {}
+        self.openState = None
+        self.order = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def addCard(self, card):
+        """
+        Schedules [card] as a new card, due immediately
+        """
+        if card in self.states:
+            return
+        state = ReviewState(card, self.clock(), self.order)
+        self.order += 1
+        self.states[card] = state
+        self.queue.push(state)
+
+    def removeCard(self, card):
+        state = self.states.pop(card, None)
+        if state == None:
+            return
+        if state is self.openState:
+            self.openState = None
+        self.queue.remove(state)
+
+    def getState(self, card):
+        return self.states.get(card)
+
+    def nextDueCard(self):
+        """
+        Returns the card due soonest, or None if nothing is scheduled
+        The card may not be due yet if the user is studying ahead
+        """
+        state = self.queue.peek()
+        if state == None:
+            return None
+        if state is not self.openState:
+            self.closeReview()
+        return state.card
+
+    def isDue(self, card):
+        state = self.states.get(card)
+        return state != None and state.due <= self.clock()
+
+    def closeReview(self):
+        if self.openState != None:
+            self.openState.backup = None
+            self.openState.answer = None
+            self.openState.rating = None
+            self.openState = None
+
+    def reviewCard(self, card, answer=None, rating=None):
+        """
+        Records a look at [card] and reschedules it
+        answer [bool]/[SKIP]/[None] is the correctness given, if any
+        rating [int]/[None] is the difficulty rating given, if any
+        A skipped card keeps its SM-2 state and is pushed back by SKIP_DELAY
+        """
+        state = self.states.get(card)
+        if state == None:
+            return
+        now = self.clock()
+        if answer == SKIP:
+            state.due = now + SKIP_DELAY
+            self.queue.update(state)
+            return
+        if state is self.openState:
+            state.easiness, state.repetitions, state.interval = state.backup
+        else:
+            self.closeReview()
+            state.backup = (state.easiness, state.repetitions, state.interval)
+            self.openState = state
+        if answer != None:
+            state.answer = answer
+        if rating != None:
+            state.rating = rating
+        self.applyQuality(state, review_quality(state.answer, state.rating))
+        state.due = now + state.interval * SECONDS_PER_DAY
+        self.queue.update(state)
+
+    def applyQuality(self, state, quality):
+        """
+        One SM-2 step: updates easiness, repetitions and interval of [state]
+        """
+        if quality >= PASSING_QUALITY:
+            if state.repetitions == 0:
+                state.interval = 1
+            elif state.repetitions == 1:
+                state.interval = 6
+            else:
+                state.interval = round(state.interval * state.easiness)
+            state.repetitions += 1
+        else:
+            state.repetitions = 0
+            state.interval = 1
+        miss = 5 - quality
+        state.easiness += 0.1 - miss * (0.08 + miss * 0.02)
+        if state.easiness < MIN_EASINESS:
+            state.easiness = MIN_EASINESS
@@ -0,0 +1,131 @@
+from Scheduler import *
+from Flashcard import *
+
+
+class FakeClock:
+    """
+    Clock that only moves when told to, for deterministic schedules
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advanceDays(self, days):
+        self.now += days * SECONDS_PER_DAY
+
+
+def make_deck(n, clock):
+    d = Deck()
+    d.text_to_cards([([str(i) + " clue."], str(i)) for i in range(n)])
+    d.setAsScheduled(clock)
+    return d
+
+
+def test_queue():
+    print("Testing due queue")
+    queue = DueQueue()
+    states = [ReviewState(None, due, order) for order, due in enumerate([5, 3, 9, 1, 7, 3])]
+    for state in states:
+        queue.push(state)
+    assert queue.peek() is states[3]
+    states[2].due = 0
+    queue.update(states[2])
+    assert queue.peek() is states[2]
+    queue.remove(states[2])
+    queue.remove(states[4])
+    order = []
+    while len(queue) > 0:
+        state = queue.peek()
+        order.append(state)
+        queue.remove(state)
+    assert order == [states[3], states[1], states[5], states[0]]
+    print("pass due queue")
+
+
+def test_quality():
+    print("Testing review quality")
+    assert review_quality(True, None) == CORRECT_QUALITY
+    assert review_quality(False, None) == INCORRECT_QUALITY
+    assert review_quality(None, 0) == 5
+    assert review_quality(True, 5) == PASSING_QUALITY
+    assert review_quality(False, 0) == PASSING_QUALITY - 1
+    print("pass review quality")
+
+
+def test_sm2():
+    print("Testing sm2 intervals")
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    card = Card()
+    scheduler.addCard(card)
+    state = scheduler.getState(card)
+    intervals = []
+    for i in range(4):
+        scheduler.nextDueCard()
+        scheduler.reviewCard(card, answer=True)
+        scheduler.closeReview()
+        intervals.append(state.interval)
+    assert intervals[:2] == [1, 6]
+    assert intervals[2] > 6 and intervals[3] > intervals[2]
+    scheduler.reviewCard(card, answer=False)
+    assert state.repetitions == 0 and state.interval == 1
+    assert state.easiness >= MIN_EASINESS
+    print("pass sm2 intervals")
+
+
+def test_combined_review():
+    print("Testing correctness and rating count as one review")
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    card = Card()
+    scheduler.addCard(card)
+    state = scheduler.getState(card)
+    scheduler.reviewCard(card, answer=True)
+    scheduler.reviewCard(card, rating=0)
+    assert state.repetitions == 1
+    assert state.interval == 1
+    assert state.easiness == DEFAULT_EASINESS + 0.1
+    scheduler.reviewCard(card, answer=SKIP)
+    assert state.due == SKIP_DELAY
+    print("pass combined review")
+
+
+def test_deck_due():
+    print("Testing deck due cards")
+    clock = FakeClock()
+    d = make_deck(50, clock)
+    first = d.getDueCard()
+    assert first is d.cardList[0]
+    assert d.correctCard(True)
+    second = d.getDueCard()
+    assert second is d.cardList[1]
+    assert d.correctCard(False)
+    seen = set()
+    for i in range(48):
+        card = d.getDueCard()
+        seen.add(card)
+        d.correctCard(True)
+    assert len(seen) == 48
+    assert first not in seen and second not in seen
+    # every card got a one day interval, so after a day they come back in order
+    clock.advanceDays(1)
+    assert d.getDueCard() is first
+
+    d.setCurrentCard(d.cardList[10].getRear())
+    d.rateCard(5)
+    assert d.scheduler.getState(d.cardList[10]).repetitions == 0
+
+    d.removeCard(0)
+    assert d.scheduler.getState(first) == None
+    assert len(d.scheduler) == 49
+    print("pass deck due cards")
+
+
+test_queue()
+test_quality()
+test_sm2()
+test_combined_review()
+test_deck_due()
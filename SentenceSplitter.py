@@ -0,0 +1,129 @@
+"""
+Single pass sentence splitter for question text
+
+A sentence ends at a run of '.', '?' or '!' (plus any closing quotes or
+brackets) followed by whitespace or the end of the text, unless the word
+before it is a known abbreviation ("Mr.", "St.", "e.g."), a dotted acronym
+("U.S."), "No." before a number ("No. 9"), or an initial. A single capital
+is taken as an initial ("J. S. Bach", "John F. Kennedy") unless it ends the
+text or is the letter of a label such as "Type A." or "Vitamin C." followed
+by a capitalized word.
+Decimals ("1.5") never end a sentence since no whitespace follows their
+period.
+"""
+import re
+
+# one match per candidate sentence end: the word before it and the terminator
+BOUNDARY = re.compile(r"(?<!\S)(\S*?)[.!?]+[\"'’”)\]]*(?=\s|$)")
+LEADING_PUNCTUATION = "\"'(‘“["
+ACRONYM = re.compile(r"(?:[A-Za-z]\.)+[A-Za-z]")
+# the word after a candidate sentence end
+NEXT_WORD = re.compile(r"\s+[\"'(‘“\[]*(\S+)")
+INITIAL = re.compile(r"[A-Z]\.")
+# the word before a single capital, looked for in the LABEL_LOOKBEHIND
+# characters before it
+PREVIOUS_WORD = re.compile(r"(\w+)\W*\s+$")
+LABEL_LOOKBEHIND = 24
+
+ABBREVIATIONS = frozenset("""
+mr mrs ms dr prof st jr sr rev fr gen col lt sgt capt cmdr adm gov sen rep pres
+mt ft ave blvd vol vols op ch fig pp pg vs etc approx ca cf esp incl
+jan feb mar apr jun jul aug sep sept oct nov dec
+""".split())
+# abbreviations only before a number, as "no" is also a word
+NUMBER_ABBREVIATIONS = frozenset(["no", "nos"])
+# words naming something by a letter, as in "Type A." or "Vitamin C."
+LETTER_LABELS = frozenset("""
+type vitamin group class grade plan model phase section part appendix exhibit
+category division block series blood hepatitis
+""".split())
+
+
+def is_abbreviation(word):
+    """
+    Returns True if a period after [word] does not end a sentence, for words
+    other than initials, see is_initial
+    """
+    word = word.lstrip(LEADING_PUNCTUATION)
+    return word.lower() in ABBREVIATIONS or ACRONYM.fullmatch(word) != None
+
+
+def is_initial(word):
+    """
+    Returns True if [word] is a single capital, which may be an initial
+    """
+    word = word.lstrip(LEADING_PUNCTUATION)
+    return len(word) == 1 and word.isupper()
+
+
+def is_letter_label(text, start):
+    """
+    Returns True if the single capital at [start] of [text] is the letter of
+    a label such as "Type A"
+    """
+    previous = PREVIOUS_WORD.search(text, max(0, start - LABEL_LOOKBEHIND), start)
+    return previous != None and previous.group(1).lower() in LETTER_LABELS
+
+
+def ends_sentence(text, match):
+    """
+    Returns True if the candidate sentence end [match] of [text] ends a
+    sentence
+    """
+    word = match.group(1)
+    if is_abbreviation(word):
+        return False
+    initial = is_initial(word)
+    if not initial and word.lstrip(LEADING_PUNCTUATION).lower() not in NUMBER_ABBREVIATIONS:
+        return True
+    following = NEXT_WORD.match(text, match.end())
+    if following == None:
+        return True
+    nextWord = following.group(1)
+    if not initial:
+        return not nextWord[0].isdigit()
+    # a middle initial unless there is a reason to think otherwise
+    if not nextWord[0].isupper() or INITIAL.fullmatch(nextWord) != None:
+        return False
+    return is_letter_label(text, match.start())
+
+
+def sentence_spans(text):
+    """
+    Returns a list of (start, end) pairs, one per sentence of [text], such
+    that text[start:end] is the sentence without surrounding whitespace
+    Text after the last sentence end is a sentence of its own
+    """
+    spans = []
+    start = 0
+    length = len(text)
+    for match in BOUNDARY.finditer(text):
+        if not ends_sentence(text, match):
+            continue
+        while start < length and text[start].isspace():
+            start += 1
+        spans.append((start, match.end()))
+        start = match.end()
+    while start < length and text[start].isspace():
+        start += 1
+    if start < length:
+        end = length
+        while text[end - 1].isspace():
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+def split_sentences(text):
+    """
+    Returns the list of sentences of [text]
+    """
+    return [text[start:end] for start, end in sentence_spans(text)]
+
+
+def split_blocks(blocks):
+    """
+    Batch version of split_sentences: returns one list of sentences per
+    string of [blocks]
+    """
+    return [split_sentences(block) for block in blocks]
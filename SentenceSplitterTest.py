@@ -0,0 +1,58 @@
+from SentenceSplitter import *
+
+
+def test_split():
+    print("Testing sentence splitter")
+    assert split_sentences("hi. My name is Jonathan. Lol.") == ['hi.', 'My name is Jonathan.', 'Lol.']
+    assert split_sentences("  llama ate cake.   haha. ") == ["llama ate cake.", "haha."]
+    assert split_sentences("") == []
+    assert split_sentences("no period at all ") == ["no period at all"]
+    assert split_sentences("Who wrote this? Name him!") == ["Who wrote this?", "Name him!"]
+    assert split_sentences('It is nicknamed the "Trout Quintet". Name it.') == ['It is nicknamed the "Trout Quintet".', 'Name it.']
+    print("pass sentence splitter")
+
+
+def test_abbreviations():
+    print("Testing abbreviations")
+    assert split_sentences("Mr. Smith met Dr. Jones on St. Helena. They talked.") == \
+        ["Mr. Smith met Dr. Jones on St. Helena.", "They talked."]
+    assert split_sentences("This piece by J. S. Bach is in B minor. Name it.") == \
+        ["This piece by J. S. Bach is in B minor.", "Name it."]
+    assert split_sentences("It weighs 1.5 kg. It left the U.S. in 1905. Name it.") == \
+        ["It weighs 1.5 kg.", "It left the U.S. in 1905.", "Name it."]
+    assert split_sentences("Some metals, e.g. tin, melt easily. Name one.") == \
+        ["Some metals, e.g. tin, melt easily.", "Name one."]
+    assert split_sentences("Asked to stay, he said no. The army left. Name him.") == \
+        ["Asked to stay, he said no.", "The army left.", "Name him."]
+    assert split_sentences("He wrote Symphony No. 9 in 1824. Name him.") == \
+        ["He wrote Symphony No. 9 in 1824.", "Name him."]
+    assert split_sentences("It causes diabetes of Type A. In mice it is rarer. Name it.") == \
+        ["It causes diabetes of Type A.", "In mice it is rarer.", "Name it."]
+    assert split_sentences("W. E. B. Du Bois founded it. Name it.") == \
+        ["W. E. B. Du Bois founded it.", "Name it."]
+    assert split_sentences("Its grade is an A. on a scale. It ends with A.") == \
+        ["Its grade is an A. on a scale.", "It ends with A."]
+    assert split_sentences("This man, John F. Kennedy, was shot. Name him.") == \
+        ["This man, John F. Kennedy, was shot.", "Name him."]
+    assert split_sentences("Ulysses S. Grant served before Harry S. Truman. Name them.") == \
+        ["Ulysses S. Grant served before Harry S. Truman.", "Name them."]
+    assert split_sentences("Scurvy comes from a lack of vitamin C. Sailors ate limes.") == \
+        ["Scurvy comes from a lack of vitamin C.", "Sailors ate limes."]
+    print("pass abbreviations")
+
+
+def test_spans():
+    print("Testing sentence spans")
+    text = " One. Two three.  Four"
+    spans = sentence_spans(text)
+    assert spans == [(1, 5), (6, 16), (18, 22)]
+    assert [text[start:end] for start, end in spans] == ["One.", "Two three.", "Four"]
+    assert split_blocks(["One. Two.", "", "Three"]) == [["One.", "Two."], [], ["Three"]]
+    # no recursion, so very long blocks are fine
+    assert len(split_sentences("Clue. " * 100000)) == 100000
+    print("pass sentence spans")
+
+
+test_split()
+test_abbreviations()
+test_spans()
@@ -0,0 +1,205 @@
+"""
+Headless study simulator for comparing how Deck chooses the next card
+
+Simulated users study a synthetic deck through the same Deck calls the
+parser makes (nextCard, getRandomCard, getDueCard, correctCard, rateCard),
+answering from a modelled memory instead of input(). Independent users run
+in a multiprocessing pool, one task per (policy, user).
+
+Run as: python Simulator.py --users 8 --cards 2000 --days 30
+"""
+from Constants import *
+from Flashcard import *
+import argparse
+import contextlib
+import math
+import multiprocessing
+import os
+import random
+import resource
+import time
+
+SEQUENTIAL = "sequential"
+RANDOM = "random"
+WEIGHTED = "weighted"
+SCHEDULED = "scheduled"
+POLICIES = [SEQUENTIAL, RANDOM, WEIGHTED, SCHEDULED]
+
+REVIEW_SECONDS = 10  # simulated time one review takes
+PRIOR_KNOWLEDGE = 0.2  # chance an easy card is known before it is ever studied
+FIRST_STABILITY = 3.0  # days a card is remembered after it is first learned
+MAX_GROWTH = 3.0  # stability multiplier of a success on the easiest card
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SimulatedUser:
+    """
+    Memory model of one user over a deck of [numCards] cards
+    Each card has a difficulty in [0, 1). Recall decays exponentially with
+    the days since the card was last seen, at a rate set by its stability;
+    a success grows the stability more for easier cards, a miss resets it
+    """
+
+    def __init__(self, numCards, rng):
+        self.rng = rng
+        self.difficulty = [rng.random() for i in range(numCards)]
+        self.stability = [0.0] * numCards
+        self.lastSeen = [0.0] * numCards
+
+    def recallProbability(self, index, now):
+        if self.stability[index] == 0:
+            return PRIOR_KNOWLEDGE * (1 - self.difficulty[index])
+        elapsedDays = (now - self.lastSeen[index]) / SECONDS_PER_DAY
+        return math.exp(-elapsedDays / self.stability[index])
+
+    def review(self, index, now):
+        """
+        Returns (recalled [bool], difficulty rating [int] in RATE_SCALE_LIST)
+        """
+        probability = self.recallProbability(index, now)
+        recalled = self.rng.random() < probability
+        difficulty = self.difficulty[index]
+        if recalled:
+            growth = 1 + (MAX_GROWTH - 1) * (1 - difficulty)
+            self.stability[index] = max(self.stability[index], FIRST_STABILITY) * growth
+        else:
+            self.stability[index] = FIRST_STABILITY * (1 - difficulty / 2)
+        self.lastSeen[index] = now
+        rating = min(5, int(6 * (1 - probability if recalled else 1)))
+        return (recalled, rating)
+
+    def retention(self, now):
+        """
+        Mean recall probability over every card of the deck at time [now]
+        """
+        total = 0.0
+        for index in range(len(self.stability)):
+            total += self.recallProbability(index, now)
+        return total / len(self.stability)
+
+
+def build_deck(numCards):
+    d = Deck()
+    d.text_to_cards([(["Simulated question " + str(i) + "."], "Answer " + str(i)) for i in range(numCards)])
+    return d
+
+
+def next_card(deck, policy):
+    """
+    Moves the deck to the next card under [policy]
+    Returns the card, or None when a scheduled user has nothing left due today
+    """
+    if policy == SEQUENTIAL:
+        deck.nextCard()
+        return deck.getCurrentCard()
+    if policy == SCHEDULED:
+        card = deck.getDueCard()
+        if not deck.scheduler.isDue(card):
+            return None
+        return card
+    return deck.getRandomCard()
+
+
+def simulate_user(task):
+    """
+    Runs one simulated user through [days] days of study under one policy
+    task is (policy, seed, numCards, days, reviewsPerDay)
+    Returns a dict of what happened, see report
+    """
+    policy, seed, numCards, days, reviewsPerDay = task
+    rng = random.Random(seed)
+    random.seed(seed)
+    memoryBefore = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    deck = build_deck(numCards)
+    indices = {}
+    for index, card in enumerate(deck.cardList):
+        indices[card] = index
+    user = SimulatedUser(numCards, rng)
+    clock = SimulatedClock()
+    if policy == SCHEDULED:
+        deck.setAsScheduled(clock)
+    elif policy == WEIGHTED:
+        deck.setAsWeighted()
+    deck.setCurrentCard(deck.cardList[-1])
+
+    reviews = 0
+    recalled = 0
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for day in range(days):
+            clock.now = day * SECONDS_PER_DAY
+            for i in range(reviewsPerDay):
+                card = next_card(deck, policy)
+                if card == None:
+                    break
+                success, rating = user.review(indices[card], clock.now)
+                deck.correctCard(success)
+                deck.rateCard(rating)
+                reviews += 1
+                recalled += success
+                clock.now += REVIEW_SECONDS
+    elapsed = time.perf_counter() - start
+    memoryAfter = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"policy": policy,
+            "reviews": reviews,
+            "recalled": recalled,
+            "seconds": elapsed,
+            "memoryKB": memoryAfter - memoryBefore,
+            "retention": user.retention(days * SECONDS_PER_DAY)}
+
+
+def run(users, numCards, days, reviewsPerDay, policies=POLICIES, processes=None):
+    """
+    Simulates [users] independent users for every policy in [policies] across
+    a pool of [processes] workers (one per core if None)
+    Returns a dict from policy to its summed results
+    """
+    tasks = [(policy, seed, numCards, days, reviewsPerDay) for policy in policies for seed in range(users)]
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(simulate_user, tasks)
+    finally:
+        pool.close()
+        pool.join()
+    summary = {}
+    for policy in policies:
+        mine = [result for result in results if result["policy"] == policy]
+        summary[policy] = {"users": len(mine),
+                           "reviews": sum(result["reviews"] for result in mine),
+                           "recalled": sum(result["recalled"] for result in mine),
+                           "seconds": sum(result["seconds"] for result in mine),
+                           "memoryKB": max(result["memoryKB"] for result in mine),
+                           "retention": sum(result["retention"] for result in mine) / len(mine)}
+    return summary
+
+
+def report(summary):
+    print("policy".ljust(12) + "reviews".rjust(10) + "reviews/s".rjust(12) + "accuracy".rjust(10)
+          + "retention".rjust(11) + "mem KB".rjust(10))
+    for policy in summary:
+        result = summary[policy]
+        reviews = result["reviews"]
+        rate = reviews / result["seconds"] if result["seconds"] > 0 else 0.0
+        accuracy = result["recalled"] / reviews if reviews > 0 else 0.0
+        print(policy.ljust(12) + str(reviews).rjust(10) + ("%.0f" % rate).rjust(12)
+              + ("%.3f" % accuracy).rjust(10) + ("%.3f" % result["retention"]).rjust(11)
+              + str(result["memoryKB"]).rjust(10))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare card selection policies on simulated users")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--reviews-per-day", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--policies", nargs="+", default=POLICIES, choices=POLICIES)
+    args = parser.parse_args()
+    report(run(args.users, args.cards, args.days, args.reviews_per_day, args.policies, args.processes))
@@ -0,0 +1,45 @@
+from Simulator import *
+import random
+
+
+def test_user_model():
+    print("Testing simulated user")
+    user = SimulatedUser(10, random.Random(0))
+    assert user.recallProbability(0, 0) <= PRIOR_KNOWLEDGE
+    user.stability[0] = 2.0
+    user.lastSeen[0] = 0.0
+    assert user.recallProbability(0, 0) == 1.0
+    assert abs(user.recallProbability(0, 2 * SECONDS_PER_DAY) - math.exp(-1)) < 1e-9
+    recalled, rating = user.review(1, 0)
+    assert rating in RATE_SCALE_LIST
+    assert user.stability[1] > 0
+    print("pass simulated user")
+
+
+def test_simulate_user():
+    print("Testing one simulated user per policy")
+    for policy in POLICIES:
+        result = simulate_user((policy, 1, 50, 5, 20))
+        assert result["policy"] == policy
+        assert 0 < result["reviews"] <= 100
+        assert 0 <= result["recalled"] <= result["reviews"]
+        assert 0 <= result["retention"] <= 1
+    # the same seed gives the same run
+    assert simulate_user((SCHEDULED, 3, 50, 5, 20))["recalled"] == simulate_user((SCHEDULED, 3, 50, 5, 20))["recalled"]
+    print("pass one simulated user per policy")
+
+
+def test_pool():
+    print("Testing simulator pool")
+    summary = run(2, 30, 3, 10, [RANDOM, SCHEDULED], processes=2)
+    assert list(summary) == [RANDOM, SCHEDULED]
+    assert summary[RANDOM]["users"] == 2
+    assert summary[RANDOM]["reviews"] == 60
+    report(summary)
+    print("pass simulator pool")
+
+
+if __name__ == '__main__':
+    test_user_model()
+    test_simulate_user()
+    test_pool()
@@ -0,0 +1,96 @@
+from Constants import *
+
+# 2 bit codes for each answer in an AnswerHistory, 0 is never stored
+CORRECT_CODE = 1
+INCORRECT_CODE = 2
+SKIP_CODE = 3
+
+ANSWER_TO_CODE = {True: CORRECT_CODE, False: INCORRECT_CODE, SKIP: SKIP_CODE}
+CODE_TO_ANSWER = {CORRECT_CODE: True, INCORRECT_CODE: False, SKIP_CODE: SKIP}
+
+
+class AnswerHistory:
+    """
+    Every answer given for one card, oldest first, packed four to a byte
+    Running counts of correct, incorrect and skipped answers are kept as
+    answers are appended, so summaries never walk the history
+    An answer is [True] for correct, [False] for incorrect or [SKIP]
+    """
+    __slots__ = ("buffer", "length", "correct", "incorrect", "skip")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.length = 0
+        self.correct = 0
+        self.incorrect = 0
+        self.skip = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, answer):
+        assert (type(answer) == bool or answer == SKIP)
+        code = ANSWER_TO_CODE[answer]
+        byteIndex, shift = divmod(self.length, 4)
+        if byteIndex == len(self.buffer):
+            self.buffer.append(0)
+        self.buffer[byteIndex] |= code << (2 * shift)
+        self.length += 1
+        if code == CORRECT_CODE:
+            self.correct += 1
+        elif code == INCORRECT_CODE:
+            self.incorrect += 1
+        else:
+            self.skip += 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("answer history index out of range")
+        byteIndex, shift = divmod(index, 4)
+        return CODE_TO_ANSWER[(self.buffer[byteIndex] >> (2 * shift)) & 3]
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self[i]
+
+    def recent(self, count):
+        """
+        Returns a list of the last [count] answers, oldest first
+        """
+        start = max(0, self.length - count)
+        return [self[i] for i in range(start, self.length)]
+
+
+class DeckStatistics:
+    """
+    Answer counts summed over every card of a Deck, kept up to date by the
+    Deck as answers are recorded and cards are reset, so deck accuracy is O(1)
+    """
+
+    def __init__(self):
+        self.correct = 0
+        self.incorrect = 0
+        self.skip = 0
+
+    def getTotal(self):
+        return self.correct + self.incorrect + self.skip
+
+    def addAnswer(self, answer):
+        if answer == SKIP:
+            self.skip += 1
+        elif answer:
+            self.correct += 1
+        else:
+            self.incorrect += 1
+
+    def removeHistory(self, history):
+        """
+        Takes the counts of an AnswerHistory that is being cleared back out
+        """
+        if history == None:
+            return
+        self.correct -= history.correct
+        self.incorrect -= history.incorrect
+        self.skip -= history.skip
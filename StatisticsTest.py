@@ -0,0 +1,48 @@
+from Statistics import *
+from Flashcard import *
+
+
+def test_history():
+    print("Testing answer history")
+    history = AnswerHistory()
+    answers = [True, False, SKIP, True, True, False, SKIP, True, False]
+    for answer in answers:
+        history.append(answer)
+    assert len(history) == 9
+    assert len(history.buffer) == 3
+    assert list(history) == answers
+    assert history[-1] == False
+    assert history.recent(3) == [SKIP, True, False]
+    assert history.recent(20) == answers
+    assert (history.correct, history.incorrect, history.skip) == (4, 3, 2)
+    try:
+        history[9]
+        assert False
+    except IndexError:
+        pass
+    print("pass answer history")
+
+
+def test_deck_statistics():
+    print("Testing deck statistics")
+    d = Deck()
+    d.text_to_cards([(["First clue.", "Second clue."], "One"), (["Other clue."], "Two")])
+    first = d.cardList[0]
+    d.setCurrentCard(first)
+    d.correctCard(True)
+    d.correctCard(False)
+    d.setCurrentCard(first.getForward())
+    d.correctCard(True)
+    d.correctCard(SKIP)
+    assert d.statistics.getTotal() == 4
+    assert (d.statistics.correct, d.statistics.incorrect, d.statistics.skip) == (2, 1, 1)
+    assert d.getDeckCorrect()
+    d.setCurrentCard(first)
+    d.resetCard()
+    assert first.statistics == None
+    assert (d.statistics.correct, d.statistics.incorrect, d.statistics.skip) == (1, 0, 1)
+    print("pass deck statistics")
+
+
+test_history()
+test_deck_statistics()
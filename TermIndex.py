@@ -0,0 +1,158 @@
+"""
+Term index of a deck: a RedBlackTree from every word on the cards to the
+cards it is on
+
+Words are lower cased and stripped of accents, so "Dvořák" is found as
+"dvorak". Every node's cardList holds the cards with its word, in the order
+they were added. Entire question cards are left out, as their text is
+already on the chain's other cards.
+Tree nodes are compared with is, as RedBlackTree.__eq__ compares whole trees.
+"""
+from Constants import *
+from RedBlackTree import RedBlackTree, merge_tree
+from AnswerNormalizer import strip_accents
+import re
+
+WORD = re.compile(r"\w+")
+
+
+def terms(text):
+    """
+    Returns the set of normalized words of [text]
+    """
+    if text == None:
+        return set()
+    return set(WORD.findall(strip_accents(text.lower())))
+
+
+def card_terms(card):
+    """
+    Returns the set of normalized words on the front and back of [card], or
+    an empty set for an entire question card
+    """
+    header = card.getChainHeader()
+    if header != None and header.entireCard is card:
+        return set()
+    return terms(card.getFront()) | terms(card.getBack())
+
+
+class TermIndex:
+    """
+    root [RedBlackTree] is the root of the tree, None while the index is empty
+    numTerms is the number of words in the tree
+    """
+
+    def __init__(self):
+        self.root = None
+        self.numTerms = 0
+
+    def __len__(self):
+        return self.numTerms
+
+    def insert(self, term):
+        """
+        Returns the node of [term], inserting it if the index does not have it
+        """
+        if self.root is None:
+            self.root = RedBlackTree(term)
+            node = self.root
+            self.numTerms += 1
+        else:
+            node = self.root.redBlackInsert(term)
+            if node.cardList == []:
+                self.numTerms += 1
+            self.root = self.root.getRoot()
+        return node
+
+    def add(self, term, card):
+        # card_terms gives each word once per card, so the linear membership
+        # check of appendCardList is not needed
+        self.insert(term).cardList.append(card)
+
+    def addCard(self, card):
+        for term in card_terms(card):
+            self.add(term, card)
+
+    def addCards(self, cards):
+        """
+        Adds the words of every card of [cards], in order, as one batch
+        A batch of at least 1/MERGE_RATIO as many words as the index has is
+        merged in by rebuilding the tree in O(n + k) for k words, see
+        RedBlackTree.merge_tree; a smaller one is inserted word by word in
+        O(k log n)
+        """
+        batch = {}
+        for card in cards:
+            for term in card_terms(card):
+                cardList = batch.get(term)
+                if cardList is None:
+                    batch[term] = [card]
+                else:
+                    cardList.append(card)
+        if batch == {}:
+            return
+        if len(batch) * MERGE_RATIO >= self.numTerms:
+            self.root, self.numTerms = merge_tree(self.root, sorted(batch.items()))
+            return
+        for term, cardList in batch.items():
+            self.insert(term).cardList.extend(cardList)
+
+    def removeCard(self, card):
+        """
+        Takes [card] out of the postings of its words, dropping words no card
+        has any more
+        """
+        for term in card_terms(card):
+            node = None if self.root is None else self.root.find(term)
+            if node is None:
+                continue
+            node.deleteCard(card)
+            if node.cardList == []:
+                self.root = self.root.redBlackDelete(term)
+                self.numTerms -= 1
+
+    def lookup(self, term):
+        """
+        Returns the list of cards with the word [term], in O(log n) for n words
+        """
+        normalized = terms(term)
+        if len(normalized) != 1 or self.root is None:
+            return []
+        node = self.root.find(normalized.pop())
+        return [] if node is None else list(node.cardList)
+
+    def complete(self, prefix, limit = COMPLETIONS):
+        """
+        Returns up to [limit] (word, number of cards) pairs for the words
+        starting with the last word of [prefix], in alphabetical order
+        Scans the tree in order from the prefix, stopping at the first word
+        past it, so it costs O(log n + limit) whatever the number of matches
+        """
+        words = WORD.findall(strip_accents(prefix.lower()))
+        if words == [] or self.root is None:
+            return []
+        start = words[-1]
+        completions = []
+        for node in self.root.range(start, None):
+            if len(completions) >= limit or not node.nodeValue.startswith(start):
+                break
+            completions.append((node.nodeValue, len(node.cardList)))
+        return completions
+
+    def search(self, query):
+        """
+        Returns the list of cards with every word of [query], in the order
+        they were added
+        """
+        words = terms(query)
+        if words == set() or self.root is None:
+            return []
+        postings = []
+        for word in words:
+            node = self.root.find(word)
+            if node is None:
+                return []
+            postings.append(node.cardList)
+        postings.sort(key = len)
+        others = [set(cards) for cards in postings[1:]]
+        return [card for card in postings[0] if all(card in cards for cards in others)]
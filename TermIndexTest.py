@@ -0,0 +1,136 @@
+from TermIndex import *
+from Flashcard import *
+from IncrementalImport import import_source
+from RedBlackTree import is_black
+import os
+import tempfile
+
+
+def test_terms():
+    print("Testing terms")
+    assert terms("Dvořák wrote the New World Symphony.") == {"dvorak", "wrote", "the", "new", "world", "symphony"}
+    assert terms(None) == set()
+    card = Card()
+    card.addFront("This composer wrote the Trout Quintet.")
+    card.addBack("Franz SCHUBERT")
+    assert "schubert" in card_terms(card) and "trout" in card_terms(card)
+    print("pass terms")
+
+
+def test_deck_index():
+    print("Testing deck term index")
+    d = Deck()
+    d.text_to_cards([(["Trout clue.", "Quintet clue."], "Franz Schubert")])
+    d.setTermIndex(TermIndex())
+    second = d.add_question((["This Hungarian rebel fought the Habsburgs."], "Imre Thokoly"))
+    third = d.add_question((["Schubert wrote this Unfinished symphony."], "Symphony No. 8"))
+    schubert = d.cardList[0]
+    assert d.termIndex.lookup("TROUT") == [schubert]
+    # the answer line is on every clue card of the chain, but not the entire card
+    assert d.termIndex.lookup("schubert") == [schubert, schubert.getForward(), third[1]]
+    assert d.termIndex.search("schubert quintet") == [schubert.getForward()]
+    assert d.termIndex.search("schubert missing") == []
+    assert d.searchCard("hungarian")
+    assert d.getCurrentCard() is second[1]
+    assert not d.searchCard("nothing")
+    d.removeClues(*third)
+    assert d.termIndex.lookup("unfinished") == []
+    assert d.termIndex.lookup("schubert") == [schubert, schubert.getForward()]
+    numTerms = len(d.termIndex)
+    d.removeChain(second[0])
+    assert d.termIndex.lookup("habsburgs") == []
+    assert len(d.termIndex) == numTerms - 8
+    print("pass deck term index")
+
+
+def test_complete():
+    print("Testing term completion")
+    d = Deck()
+    d.setTermIndex(TermIndex())
+    d.text_to_cards([(["Schubert wrote this quintet.", "Schumann wrote about it."], "Trout Quintet"),
+                     (["The Schubertiade was held for this composer."], "Franz Schubert")])
+    assert d.termIndex.complete("schub") == [("schubert", 2), ("schubertiade", 1)]
+    assert d.termIndex.complete("SCHU") == [("schubert", 2), ("schubertiade", 1), ("schumann", 1)]
+    assert d.termIndex.complete("franz schu", 2) == [("schubert", 2), ("schubertiade", 1)]
+    assert d.termIndex.complete("schz") == [] and d.termIndex.complete("") == []
+    assert d.completeTerm("quin")
+    assert not d.completeTerm("zebra")
+    print("pass term completion")
+
+
+def check_invariants(root):
+    """
+    Asserts the color invariants of the term tree at [root]
+    """
+    assert root.getColor()
+    blackHeights = set()
+    stack = [(root, 1)]
+    while stack != []:
+        tree, blackNodes = stack.pop()
+        if not tree.getColor():
+            assert is_black(tree.getLeftTree()) and is_black(tree.getRightTree())
+        for child in (tree.getLeftTree(), tree.getRightTree()):
+            if child is None:
+                blackHeights.add(blackNodes)
+            else:
+                assert child.getParent() is tree
+                stack.append((child, blackNodes + (1 if child.getColor() else 0)))
+    assert len(blackHeights) == 1
+
+
+def postings(index):
+    return [(node.getValue(), list(node.getCardList())) for node in index.root.inOrder()]
+
+
+def test_bulk():
+    print("Testing bulk term index builds")
+    d = Deck()
+    d.text_to_cards([(["Clue " + str(i) + " about word" + str(i % 40) + "."], "Answer " + str(i % 7)) for i in range(300)])
+    one = TermIndex()
+    for card in d.allCards():
+        one.addCard(card)
+    bulk = TermIndex()
+    d.setTermIndex(bulk)
+    check_invariants(bulk.root)
+    assert len(bulk) == len(one) and postings(bulk) == postings(one)
+    # a small batch is inserted, a large one merged in by a rebuild
+    second = d.add_question((["A new clue about word3."], "Answer 2"))
+    assert d.termIndex.lookup("new") == [second[1]]
+    assert d.termIndex.lookup("word3")[-1] is second[1]
+    large = Deck()
+    large.text_to_cards([(["Fresh clue " + str(i) + " of term" + str(i) + "."], "Answer 1") for i in range(200)])
+    bulk.addCards(large.allCards())
+    for card in large.allCards():
+        one.addCard(card)
+    one.addCard(second[1])
+    check_invariants(bulk.root)
+    assert len(bulk) == len(one)
+    assert dict(postings(bulk)).keys() == dict(postings(one)).keys()
+    assert bulk.lookup("term150") == one.lookup("term150")
+    assert bulk.lookup("answer") == d.termIndex.lookup("answer")
+    print("pass bulk term index builds")
+
+
+def test_import_index():
+    print("Testing term index of an import")
+    path = os.path.join(tempfile.mkdtemp(), "questions.txt")
+    with open(path, 'w') as fileObject:
+        fileObject.write("".join("QUESTION: Clue " + str(i) + " one. Clue " + str(i) + " two. ANSWER: Answer " + str(i) + " END ||\n" for i in range(50)))
+    d = Deck()
+    d.setTermIndex(TermIndex())
+    import_source(d, path)
+    check_invariants(d.termIndex.root)
+    assert len(d.termIndex.lookup("answer")) == 100
+    assert [card.getFront() for card in d.termIndex.lookup("49")] == ["Clue 49 one.", "Clue 49 two."]
+    with open(path, 'a') as fileObject:
+        fileObject.write("QUESTION: Clue fifty one. ANSWER: Answer 50 END ||\n")
+    import_source(d, path)
+    assert [card.getFront() for card in d.termIndex.lookup("fifty")] == ["Clue fifty one."]
+    print("pass term index of an import")
+
+
+test_terms()
+test_deck_index()
+test_complete()
+test_bulk()
+test_import_index()
@@ -3,13 +3,68 @@
 #PROPERLY. I WANT TO CREATE THINGS THAT ARE COOL FOR MYSELF WHILE CHALLENGING MYSELF
 
 from Constants import *
+from SentenceSplitter import split_sentences
+from QuizdbReader import is_quizdb, quizdbReaderStream, read_quizdb_records, parse_quizdb_record
+import hashlib
 
 def textReaderDriver():
+    """
+    Returns a generator of question answer tuples read from the file the
+    user names, see stream_text; quizdb exports are read with QuizdbReader
+    """
     try:
         filename = enterFileName()
-        return textReaderController(filename, True)
+        return openQuestionFile(filename, True)
     except IOError as e:
         print("IO ERROR - no such txt file in your current directory - quitting program")
+        return None
+
+
+def sourceFormat(filename):
+    """
+    QUIZDB_FORMAT if filename is a quizdb export, else BLOCK_FORMAT
+    """
+    with open(filename, 'r') as fileObject:
+        return QUIZDB_FORMAT if is_quizdb(fileObject) else BLOCK_FORMAT
+
+
+def source_records(file_object, file_format):
+    """
+    Generator of the raw records of an open file: '||' blocks, or whole
+    quizdb records, see QuizdbReader.read_quizdb_records
+    """
+    if file_format == QUIZDB_FORMAT:
+        return read_quizdb_records(file_object)
+    return stream_blocks(file_object)
+
+
+def parse_record(record, file_format, convert_to_sentences):
+    """
+    Returns the list of question answer tuples of one record from source_records
+    """
+    if file_format == QUIZDB_FORMAT:
+        return parse_quizdb_record(record, convert_to_sentences)
+    return [format_block(record, convert_to_sentences)]
+
+
+def record_digest(record):
+    """
+    Content hash of a record from source_records, blind to the whitespace around it
+    """
+    return hashlib.sha1(record.strip().encode("utf-8")).digest()
+
+
+def openQuestionFile(filename, convertToSentences):
+    """
+    Returns a generator of question answer tuples read from [filename], either
+    a quizdb export or QUESTION: ... ANSWER: ... END || blocks
+    Raises: IOError if the file cannot be opened
+    """
+    fileObject = open(filename, 'r')
+    if is_quizdb(fileObject):
+        fileObject.close()
+        return quizdbReaderStream(filename, convertToSentences)
+    return stream_file(fileObject, convertToSentences)
         
     
 
@@ -17,8 +72,7 @@ def textReaderController(filename, convertToSentences ):
     """
     Header function, to be used with other modules
     """
-    fileString = readDocument(filename)
-    return format_text(fileString, convertToSentences)
+    return list(textReaderStream(filename, convertToSentences))
 
 def enterFileName(): # NOT TESTED YET
     print("Please navigate to the correct directory where you want to run this program. ")
@@ -33,8 +87,8 @@ def readDocument(filename):
         File must be in the following format: question \n ANSWER: answer \n \n next Question Answer cycle, etc END
     Reads the file, searching for "ANSWER"
     """
-    f = open(filename, 'r')
-    fileString = f.read()
+    with open(filename, 'r') as f:
+        fileString = f.read()
     return fileString
 
 
@@ -51,38 +105,89 @@ def format_text(string_text, convert_to_sentences):
         question clues and the second is a string and is the answerline
     """
     listOfQuestionBlocks = convert_text_to_block(string_text)
-    questionAnswerTuples = []
-    for question in listOfQuestionBlocks:
-        if not convert_to_sentences:
-            pair = question_answer(question)
-            questionAnswerTuples.append(([pair[0]], pair[1]))
-        else:
-            questionAnswerTuples.append(question_answer(question))
+    return [format_block(question, convert_to_sentences) for question in listOfQuestionBlocks]
+
+
+def format_block(single_block, convert_to_sentences):
+    """
+    Formats one QUESTION: ... ANSWER: ... END block into the tuple format_text
+    gives for it: the list of question clues and the answerline
+    """
+    pair = question_answer(single_block)
     if not convert_to_sentences:
-        return questionAnswerTuples
-    finalQuestionAnswerList = []
-    for qaTuple in questionAnswerTuples:
-        questionBlock = qaTuple[0]
-        questionAnswer = qaTuple[1]
-        questionList = convert_block_to_list(questionBlock)
-        newTuple = (questionList, questionAnswer)
-        finalQuestionAnswerList.append(newTuple)
-    return finalQuestionAnswerList
+        return ([pair[0]], pair[1])
+    return (convert_block_to_list(pair[0]), pair[1])
+
+
+def stream_text(file_object, convert_to_sentences, chunk_size = STREAM_CHUNK_SIZE):
+    """
+    Generator version of format_text over an open text file object
+    Reads the file chunk_size characters at a time and yields the same tuples
+    format_text returns, one block at a time, holding at most one chunk and
+    one partial block in memory
+    Raises: ValueError if the file has text after its last '||'
+    """
+    for block in stream_blocks(file_object, chunk_size):
+        yield format_block(block, convert_to_sentences)
+
+
+def stream_blocks(file_object, chunk_size = STREAM_CHUNK_SIZE):
+    """
+    Generator of the raw text of every '||' ended block of an open text file,
+    see stream_text
+    Only each new chunk and the one character before it are searched for
+    '||', so a long block, or a file with no '||' at all, takes linear time
+    """
+    # the text after the last '||' is pieces followed by tail, its last
+    # character, which may be the first bar of a '||' split across chunks
+    pieces = []
+    tail = ""
+    while True:
+        chunk = file_object.read(chunk_size)
+        if chunk == "":
+            break
+        blocks = (tail + chunk).split('||')
+        last = blocks.pop()
+        if blocks != []:
+            pieces.append(blocks[0])
+            yield "".join(pieces)
+            for block in blocks[1:]:
+                yield block
+            pieces = []
+        pieces.append(last[:-1])
+        tail = last[-1:]
+    remainder = "".join(pieces) + tail
+    if remainder.strip() != "":
+        raise ValueError("every block must be ended by '||'")
+
+
+def stream_file(file_object, convert_to_sentences):
+    """
+    stream_text that closes file_object once every block has been read
+    """
+    with file_object:
+        for qaTuple in stream_text(file_object, convert_to_sentences):
+            yield qaTuple
+
+
+def textReaderStream(filename, convertToSentences):
+    """
+    Streaming counterpart of textReaderController
+    """
+    return stream_file(open(filename, 'r'), convertToSentences)
 
         
 
 def convert_text_to_block(string_text, list_of_blocks = []):
     """
-    tail recursive
     every block of string must be ended by '||', and moreover, the string_text must end in '||' as well.
+    whitespace after the last '||', such as a final newline, is ignored
+    Raises: ValueError if there is other text after the last '||'
     """
-    if string_text == '':
-        return list_of_blocks
-    newLinePos = string_text.index('||')
-    beforeNewLines = string_text[:newLinePos]
-    afterNewLines = string_text[newLinePos + 2:] # plus one plus two more for both new lines
-    newListOfBlocks = list_of_blocks + [beforeNewLines]
-    return convert_text_to_block(afterNewLines, newListOfBlocks)
+    blocks = string_text.split('||')
+    if blocks.pop().strip() != '':
+        raise ValueError("every block must be ended by '||'")
+    return list_of_blocks + blocks
     
     
 def question_answer(single_block):
@@ -99,15 +204,17 @@ def question_answer(single_block):
 def convert_block_to_list(string_block):
     """
     Wrapper Function
-    PostCondition: Returns a block of string into a list of strings
+    PostCondition: Returns a block of string into a list of strings, split into
+                sentences by SentenceSplitter
     PreCondition: The block of strings has at least one period, with a period ending the string block.
                 String_block is not an empty string and is [str]
     """
     stringLen = len(string_block)
-    if string_block[stringLen - 1] != '.':
+    if string_block[stringLen - 1] not in '.?!':
         string_block = string_block + '.'
-    newList = [element.strip() for element in block_to_sentence(string_block)]
-    return [element for element in newList if element != '.']
+    return [element for element in split_sentences(string_block) if element != '.']
+
+##########DEAD OR DEPRECATED CODE. ONLY FIND PERIODS WAS TESTED#########
 
 def block_to_sentence(string_block, sentence_list = []):
     """
@@ -123,10 +230,7 @@ def block_to_sentence(string_block, sentence_list = []):
     afterPeriod = string_block[p + 1:]
     newSentenceList = sentence_list + [beforePeriod]
     return block_to_sentence(afterPeriod, newSentenceList)
-    
-
 
-##########DEAD OR DEPRECATED CODE. ONLY FIND PERIODS WAS TESTED#########
 
 def find_periods(string_block, period_list = []):
     """
@@ -1,4 +1,6 @@
 from TextReader import *
+from Flashcard import *
+import io
 
 def test_find_period():
     print("test period")
@@ -49,6 +51,29 @@ def test_format():
     sentences = False
     assert format_text(text2, sentences) == [(["this man was imre thokoly. this man was imre thokoly."], "IMRE THOKOLY"), (["This hungarian rebel."], "Ferenc Rakoszi")]
     print("Pass format")
+def test_stream():
+    print("Test stream")
+    text = "QUESTION: this man was imre thokoly. this man was imre thokoly. ANSWER: IMRE THOKOLY END || QUESTION: This hungarian rebel. ANSWER: Ferenc Rakoszi END ||\n"
+    for sentences in [True, False]:
+        expected = format_text(text, sentences)
+        # chunk boundaries fall inside blocks and between the two bars of '||'
+        for chunkSize in [1, 2, 7, 64, 1 << 16]:
+            assert list(stream_text(io.StringIO(text), sentences, chunkSize)) == expected
+    assert list(stream_text(io.StringIO(""), True)) == []
+    # blocks split across chunks, and runs of bars, split as str.split does
+    for raw in ["a||b||", "a|||b||", "a||||", "|a||b|c||", "x" * 50 + "||" + "y" * 30 + "|||z||"]:
+        for chunkSize in [1, 2, 3, 5, 64]:
+            assert list(stream_blocks(io.StringIO(raw), chunkSize)) == raw.split('||')[:-1]
+    try:
+        list(stream_text(io.StringIO(text + "QUESTION: no end"), True, 8))
+        assert False
+    except ValueError:
+        pass
+    d = Deck()
+    d.text_to_cards(stream_text(io.StringIO(text), True))
+    assert d.numMainCards == 2
+    assert [card.getBack() for card in d.cardList] == ["IMRE THOKOLY", "Ferenc Rakoszi"]
+    print("Pass stream")
 def test_controller():
     print("Test controller")
     filename = "Test.txt"
@@ -61,4 +86,5 @@ test_block_sentence()
 test_blocks()
 test_q_a()
 test_format()
+test_stream()
 test_controller()
\ No newline at end of file
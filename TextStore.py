@@ -0,0 +1,262 @@
+"""
+Card text kept on disk instead of in memory
+
+A text store hands out an int ref for every string added to it and gives
+the string back from text(ref). Cards built while a deck has a store hold
+these refs in place of their front and back text, see Deck.setTextStore.
+MappedTextStore keeps the text on disk, CompressedTextStore keeps it in
+memory, compressed.
+"""
+from Constants import *
+from array import array
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+import mmap
+import os
+import zlib
+
+
+class MappedTextStore:
+    """
+    Strings written one after another, UTF-8 encoded, to the file at textPath
+    and read back through an mmap of it, so only the pages being read are
+    resident
+    offsets [array of unsigned 64 bit int] has one entry more than there are
+    strings: string i is the bytes offsets[i] to offsets[i + 1] of the file
+    The offset table is saved to offsetPath whenever the store is pickled
+    with its deck, and loaded from there when the deck is unpickled; text
+    written after that save is cut off the file then
+    """
+
+    def __init__(self, textPath = TEXT_STORE_FILE, offsetPath = OFFSET_FILE):
+        self.textPath = textPath
+        self.offsetPath = offsetPath
+        self.offsets = array('Q', [0])
+        # a new store starts from an empty text file
+        open(textPath, 'wb').close()
+        self.writer = None
+        self.mapped = None
+        self.mappedSize = 0
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def add(self, text):
+        """
+        Appends [text] to the store and returns its ref
+        """
+        data = text.encode("utf-8")
+        if self.writer == None:
+            self.writer = open(self.textPath, 'ab')
+        self.writer.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        return len(self.offsets) - 2
+
+    def text(self, ref):
+        start = self.offsets[ref]
+        end = self.offsets[ref + 1]
+        if start == end:
+            return ""
+        if end > self.mappedSize:
+            self.remap()
+        return self.mapped[start:end].decode("utf-8")
+
+    def remap(self):
+        """
+        Maps the whole text file again, after strings were added past the end
+        of the current map
+        """
+        if self.writer != None:
+            self.writer.flush()
+        if self.mapped != None:
+            self.mapped.close()
+        with open(self.textPath, 'rb') as fileObject:
+            self.mapped = mmap.mmap(fileObject.fileno(), 0, access = mmap.ACCESS_READ)
+        self.mappedSize = len(self.mapped)
+
+    def save(self):
+        """
+        Flushes the text file and writes the offset table next to it
+        """
+        if self.writer != None:
+            self.writer.flush()
+            os.fsync(self.writer.fileno())
+        temporaryPath = self.offsetPath + ".tmp"
+        with open(temporaryPath, 'wb') as fileObject:
+            self.offsets.tofile(fileObject)
+            fileObject.flush()
+            os.fsync(fileObject.fileno())
+        os.replace(temporaryPath, self.offsetPath)
+
+    def close(self):
+        if self.writer != None:
+            self.writer.close()
+            self.writer = None
+        if self.mapped != None:
+            self.mapped.close()
+            self.mapped = None
+            self.mappedSize = 0
+
+    def __getstate__(self):
+        self.save()
+        return {"textPath": self.textPath, "offsetPath": self.offsetPath}
+
+    def __setstate__(self, state):
+        self.textPath = state["textPath"]
+        self.offsetPath = state["offsetPath"]
+        self.offsets = array('Q')
+        with open(self.offsetPath, 'rb') as fileObject:
+            self.offsets.frombytes(fileObject.read())
+        # text added after the offsets were saved has no ref any more, and
+        # new text has to start where the saved offsets end
+        if os.path.getsize(self.textPath) > self.offsets[-1]:
+            os.truncate(self.textPath, self.offsets[-1])
+        self.writer = None
+        self.mapped = None
+        self.mappedSize = 0
+
+
+def train_dictionary(samples, size = DICTIONARY_BYTES):
+    """
+    Returns a zlib preset dictionary of at most [size] bytes for text like
+    [samples], a list of UTF-8 encoded strings: the word runs of up to three
+    words that would save the most bytes, most useful last, as zlib finds
+    the end of the dictionary with the shortest distances
+    """
+    counts = Counter()
+    for data in samples:
+        words = data.split()
+        for length in (1, 2, 3):
+            for i in range(len(words) - length + 1):
+                counts[b" ".join(words[i:i + length])] += 1
+    ranked = sorted((gram for gram in counts if counts[gram] > 1 and len(gram) > 3),
+                    key = lambda gram: counts[gram] * len(gram), reverse = True)
+    chosen = []
+    total = 0
+    for gram in ranked:
+        if total + len(gram) + 1 > size:
+            break
+        chosen.append(gram)
+        total += len(gram) + 1
+    chosen.reverse()
+    return b" ".join(chosen) + b" "
+
+
+class CompressedTextStore:
+    """
+    Strings kept in memory, UTF-8 encoded and zlib compressed in blocks of
+    about blockBytes, with a preset dictionary trained on the first
+    TRAINING_BYTES of text added, so even short blocks compress well
+    Until the dictionary is trained, and for the last block after that,
+    strings wait uncompressed in pending
+    blocks [list of bytes] are the compressed blocks; blockStarts [array of
+    unsigned int] is the ref of the first string of each block and ends
+    [array of unsigned int] the end of every string compressed so far within
+    its block
+    The last cacheBlocks blocks read are kept decompressed in cache, an LRU
+    of block number to bytes, so flipping through a chain of cards
+    decompresses its block once
+    """
+
+    def __init__(self, cacheBlocks = CACHE_BLOCKS, blockBytes = COMPRESSED_BLOCK_BYTES):
+        self.cacheBlocks = cacheBlocks
+        self.blockBytes = blockBytes
+        self.dictionary = None
+        self.blocks = []
+        self.blockStarts = array('I')
+        self.ends = array('I')
+        self.pending = []
+        self.pendingBytes = 0
+        self.cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.ends) + len(self.pending)
+
+    def add(self, text):
+        """
+        Appends [text] to the store and returns its ref
+        """
+        data = text.encode("utf-8")
+        ref = len(self)
+        self.pending.append(data)
+        self.pendingBytes += len(data)
+        if self.dictionary == None:
+            if self.pendingBytes >= TRAINING_BYTES:
+                self.train()
+        elif self.pendingBytes >= self.blockBytes:
+            self.compressPending()
+        return ref
+
+    def train(self):
+        """
+        Builds the dictionary from the strings added so far and compresses them
+        """
+        self.dictionary = train_dictionary(self.pending)
+        self.compressPending()
+
+    def compressPending(self):
+        """
+        Compresses the pending strings into blocks of about blockBytes
+        """
+        group = []
+        groupBytes = 0
+        for data in self.pending:
+            group.append(data)
+            groupBytes += len(data)
+            if groupBytes >= self.blockBytes:
+                self.compressBlock(group)
+                group = []
+                groupBytes = 0
+        if group != []:
+            self.compressBlock(group)
+        self.pending = []
+        self.pendingBytes = 0
+
+    def compressBlock(self, group):
+        self.blockStarts.append(len(self.ends))
+        end = 0
+        for data in group:
+            end += len(data)
+            self.ends.append(end)
+        compressor = zlib.compressobj(9, zdict = self.dictionary)
+        self.blocks.append(compressor.compress(b"".join(group)) + compressor.flush())
+
+    def block(self, number):
+        """
+        Returns the decompressed bytes of block [number], through the cache
+        """
+        data = self.cache.get(number)
+        if data != None:
+            self.cache.move_to_end(number)
+            return data
+        data = zlib.decompressobj(zdict = self.dictionary).decompress(self.blocks[number])
+        self.cache[number] = data
+        if len(self.cache) > self.cacheBlocks:
+            self.cache.popitem(last = False)
+        return data
+
+    def text(self, ref):
+        compressed = len(self.ends)
+        if ref >= compressed:
+            return self.pending[ref - compressed].decode("utf-8")
+        number = bisect_right(self.blockStarts, ref) - 1
+        start = 0 if ref == self.blockStarts[number] else self.ends[ref - 1]
+        return self.block(number)[start:self.ends[ref]].decode("utf-8")
+
+    def residentBytes(self):
+        """
+        Returns the bytes of text held, compressed or pending, and of the
+        dictionary and tables, leaving out the cache
+        """
+        total = sum(len(block) for block in self.blocks) + self.pendingBytes
+        total += len(self.dictionary) if self.dictionary != None else 0
+        return total + self.blockStarts.itemsize * len(self.blockStarts) + self.ends.itemsize * len(self.ends)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["cache"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = OrderedDict()
@@ -0,0 +1,110 @@
+from TextStore import *
+from Flashcard import *
+import os
+import pickle
+import tempfile
+
+
+def make_store():
+    directory = tempfile.mkdtemp()
+    return MappedTextStore(os.path.join(directory, "deck.text"), os.path.join(directory, "deck.offsets"))
+
+
+def test_store():
+    print("Testing mapped text store")
+    store = make_store()
+    first = store.add("Schubert wrote the Trout Quintet.")
+    empty = store.add("")
+    accented = store.add("Dvořák wrote the New World Symphony.")
+    assert len(store) == 3
+    assert store.text(first) == "Schubert wrote the Trout Quintet."
+    assert store.text(empty) == ""
+    assert store.text(accented) == "Dvořák wrote the New World Symphony."
+    # strings added after the file was mapped are still found
+    later = store.add("Later clue.")
+    assert store.text(later) == "Later clue."
+    copy = pickle.loads(pickle.dumps(store))
+    assert os.path.exists(store.offsetPath)
+    assert copy.offsets == store.offsets
+    assert copy.text(accented) == "Dvořák wrote the New World Symphony."
+    # text added after a snapshot is dropped when the snapshot is loaded
+    store = make_store()
+    hello = store.add("hello")
+    snapshot = pickle.dumps(store)
+    store.add("lost after snapshot")
+    store.close()
+    reloaded = pickle.loads(snapshot)
+    world = reloaded.add("world")
+    assert reloaded.text(hello) == "hello" and reloaded.text(world) == "world"
+    assert os.path.getsize(reloaded.textPath) == len("helloworld")
+    print("pass mapped text store")
+
+
+def test_deck_store():
+    print("Testing deck text in a store")
+    d = Deck()
+    d.setTextStore(make_store())
+    d.text_to_cards([(["Clue one.", "Clue two."], "Answer A"), (["Only clue."], "Answer B")])
+    first = d.cardList[0]
+    assert type(first.frontText) == int
+    assert first.getFront() == "Clue one."
+    assert first.getBack() == "Answer A"
+    assert first.getForward().getFront() == "Clue two."
+    assert first.getRear().getFront() == "Clue one.Clue two."
+    assert d.cardList[1].getRear().getBack() == "Answer B"
+    copy = pickle.loads(pickle.dumps(d))
+    assert [card.getFront() for card in copy.allCards()] == [card.getFront() for card in d.allCards()]
+    assert copy.cardList[1].getBack() == "Answer B"
+    print("pass deck text in a store")
+
+
+def test_compressed_store():
+    print("Testing compressed text store")
+    store = CompressedTextStore(cacheBlocks = 2, blockBytes = 256)
+    clues = ["Clue number " + str(i) + " about the Trout Quintet by Schubert." for i in range(200)]
+    refs = [store.add(clue) for clue in clues]
+    empty = store.add("")
+    accented = store.add("Dvořák wrote the New World Symphony.")
+    # nothing is compressed before the dictionary is trained
+    assert store.blocks == [] and store.text(refs[5]) == clues[5]
+    store.train()
+    assert len(store.dictionary) <= DICTIONARY_BYTES
+    assert len(store.blocks) > 1 and store.pending == []
+    assert store.residentBytes() < sum(len(clue) for clue in clues)
+    later = store.add("Later clue.")
+    assert store.text(later) == "Later clue."
+    assert [store.text(ref) for ref in refs] == clues
+    assert store.text(empty) == ""
+    assert store.text(accented) == "Dvořák wrote the New World Symphony."
+    assert len(store.cache) == 2
+    assert len(store) == 203
+    copy = pickle.loads(pickle.dumps(store))
+    assert len(copy.cache) == 0
+    assert [copy.text(ref) for ref in refs] == clues
+    assert copy.text(later) == "Later clue."
+    print("pass compressed text store")
+
+
+def test_deck_compressed_store():
+    print("Testing deck text in a compressed store")
+    d = Deck()
+    d.setTextStore(CompressedTextStore())
+    questions = [(["Clue " + str(i) + " one.", "Clue " + str(i) + " two."], "Answer " + str(i)) for i in range(10000)]
+    d.text_to_cards(questions)
+    assert d.textStore.dictionary != None
+    last = d.cardList[-1]
+    assert type(last.frontText) == int
+    assert last.getFront() == "Clue 9999 one."
+    assert last.getBack() == "Answer 9999"
+    assert last.getForward().getFront() == "Clue 9999 two."
+    assert last.getRear().getFront() == "Clue 9999 one.Clue 9999 two."
+    assert d.cardList[0].getRear().getBack() == "Answer 0"
+    copy = pickle.loads(pickle.dumps(d))
+    assert [card.getFront() for card in copy.allCards()] == [card.getFront() for card in d.allCards()]
+    print("pass deck text in a compressed store")
+
+
+test_store()
+test_deck_store()
+test_compressed_store()
+test_deck_compressed_store()